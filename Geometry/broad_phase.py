@@ -0,0 +1,286 @@
+"""Broad-phase culling of element pairs before the exact clash test."""
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from Geometry.element import Element, pack_bounds
+
+# Upper bound on the number of box comparisons evaluated in one batch. Each
+# comparison touches a handful of booleans, so this keeps a batch in the tens of MB.
+DEFAULT_MAX_CHUNK_CELLS = 1 << 22
+MAX_CHUNK_ROWS = 1 << 16
+
+
+class BroadPhaseStats(NamedTuple):
+    """Summary of how many element pairs the broad phase removed."""
+
+    total_pairs: int
+    candidate_pairs: int
+
+    @property
+    def pruned_pairs(self) -> int:
+        return self.total_pairs - self.candidate_pairs
+
+    @property
+    def pruned_ratio(self) -> float:
+        return self.pruned_pairs / self.total_pairs if self.total_pairs else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"Broad phase kept {self.candidate_pairs} of {self.total_pairs} pairs "
+            f"({self.pruned_pairs} pruned, {self.pruned_ratio:.1%})."
+        )
+
+
+class SweepIndex(NamedTuple):
+    """Boxes of one set pre-sorted along every axis, reusable across sweeps."""
+
+    valid: np.ndarray  # indices of the finite, non-inverted boxes
+    orders: np.ndarray  # (3, len(valid)) order of the valid boxes by min corner per axis
+
+
+def inflate_bounds(bounds: np.ndarray, margin: float) -> np.ndarray:
+    """Grow packed (..., 2, 3) boxes by `margin` on every side."""
+    if not margin:
+        return bounds
+    return bounds + np.array([[-margin] * 3, [margin] * 3])
+
+
+def _valid(bounds: np.ndarray) -> np.ndarray:
+    """Indices of boxes that are finite and not inverted."""
+    return np.flatnonzero(
+        np.all(np.isfinite(bounds), axis=(1, 2)) & np.all(bounds[:, 0] <= bounds[:, 1], axis=1)
+    )
+
+
+def _sweep_axis(*bounds: np.ndarray) -> int:
+    """Pick the axis along which the box centres are spread the most."""
+    centres = np.concatenate([(b[:, 0] + b[:, 1]) / 2 for b in bounds])
+    return int(np.argmax(centres.var(axis=0)))
+
+
+def sweep_index(bounds: np.ndarray) -> SweepIndex:
+    """
+    Sort a set of boxes along all three axes once, for `overlapping_pairs`.
+
+    Growing every box by the same margin keeps the index valid.
+    """
+    valid = _valid(bounds)
+    orders = np.argsort(bounds[valid, 0], axis=0, kind="stable").T
+    return SweepIndex(valid, np.ascontiguousarray(orders, dtype=np.int64))
+
+
+def overlapping_pairs(
+    reference_bounds: np.ndarray,
+    latest_bounds: np.ndarray,
+    max_chunk_cells: int = DEFAULT_MAX_CHUNK_CELLS,
+    reference_index: Optional[SweepIndex] = None,
+    latest_index: Optional[SweepIndex] = None,
+) -> np.ndarray:
+    """
+    Find all reference/latest pairs whose bounding boxes overlap.
+
+    Both sets are sorted along the axis of largest spread. For every latest box the
+    reference boxes that can reach it along that axis form a contiguous window of
+    the sorted reference set, so consecutive latest boxes are compared against their
+    shared window in one broadcast comparison. Batches are sized so that no more
+    than `max_chunk_cells` box comparisons are materialised at once.
+
+    Args:
+        reference_bounds (np.ndarray): (N, 2, 3) packed boxes of the reference set.
+        latest_bounds (np.ndarray): (M, 2, 3) packed boxes of the latest set.
+        max_chunk_cells (int): Maximum number of box comparisons per batch.
+        reference_index (Optional[SweepIndex]): Prebuilt `sweep_index` of the
+            reference boxes, which saves sorting them.
+        latest_index (Optional[SweepIndex]): Prebuilt `sweep_index` of the latest boxes.
+
+    Returns:
+        np.ndarray: A (K, 2) integer array of (reference index, latest index) pairs.
+    """
+    ref_valid = reference_index.valid if reference_index else _valid(reference_bounds)
+    latest_valid = latest_index.valid if latest_index else _valid(latest_bounds)
+    if len(ref_valid) == 0 or len(latest_valid) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    ref = reference_bounds[ref_valid]
+    latest = latest_bounds[latest_valid]
+    axis = _sweep_axis(ref, latest)
+
+    if reference_index:
+        ref_order = reference_index.orders[axis]
+    else:
+        ref_order = np.argsort(ref[:, 0, axis], kind="stable")
+    ref = ref[ref_order]
+    ref_min = ref[:, 0, axis]
+    reach = float(np.max(ref[:, 1, axis] - ref_min))
+
+    if latest_index:
+        latest_order = latest_index.orders[axis]
+    else:
+        latest_order = np.argsort(latest[:, 0, axis], kind="stable")
+    latest = latest[latest_order]
+
+    # Window [lo, hi) of sorted reference boxes that can overlap each latest box.
+    lo = np.searchsorted(ref_min, latest[:, 0, axis] - reach, side="left")
+    hi = np.maximum.accumulate(np.searchsorted(ref_min, latest[:, 1, axis], side="right"))
+
+    pairs = []
+    start, count = 0, len(latest)
+    while start < count:
+        rows = np.arange(1, min(count - start, MAX_CHUNK_ROWS) + 1)
+        cells = rows * np.maximum(hi[start: start + len(rows)] - lo[start], 0)
+        end = start + max(1, int(np.searchsorted(cells, max_chunk_cells, side="right")))
+
+        window = slice(lo[start], hi[end - 1])
+        chunk = latest[start:end]
+        candidates = ref[window]
+        overlap = np.all(chunk[:, None, 0] <= candidates[None, :, 1], axis=2) & np.all(
+            candidates[None, :, 0] <= chunk[:, None, 1], axis=2
+        )
+        latest_hits, ref_hits = np.nonzero(overlap)
+        if len(latest_hits):
+            pairs.append(
+                np.column_stack(
+                    (
+                        ref_valid[ref_order[ref_hits + window.start]],
+                        latest_valid[latest_order[latest_hits + start]],
+                    )
+                )
+            )
+        start = end
+
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.concatenate(pairs).astype(np.int64, copy=False)
+
+
+def self_overlapping_pairs(
+    bounds: np.ndarray,
+    max_chunk_cells: int = DEFAULT_MAX_CHUNK_CELLS,
+    index: Optional[SweepIndex] = None,
+) -> np.ndarray:
+    """
+    Find all pairs of distinct boxes of one set that overlap, each pair once.
+
+    The set is swept against itself: after sorting along the axis of largest spread,
+    a box can only overlap the boxes after it that start before it ends, so every
+    unordered pair is compared once and no box is compared with itself.
+
+    Args:
+        bounds (np.ndarray): (N, 2, 3) packed boxes.
+        max_chunk_cells (int): Maximum number of box comparisons per batch.
+        index (Optional[SweepIndex]): Prebuilt `sweep_index` of the boxes.
+
+    Returns:
+        np.ndarray: A (K, 2) integer array of (i, j) index pairs with i < j.
+    """
+    valid = index.valid if index else _valid(bounds)
+    if len(valid) < 2:
+        return np.empty((0, 2), dtype=np.int64)
+
+    boxes = bounds[valid]
+    axis = _sweep_axis(boxes)
+    order = index.orders[axis] if index else np.argsort(boxes[:, 0, axis], kind="stable")
+    boxes = boxes[order]
+    box_min = boxes[:, 0, axis]
+
+    # Sorted boxes (k, hi[k]) are the ones after box k that can overlap it.
+    hi = np.maximum.accumulate(np.searchsorted(box_min, boxes[:, 1, axis], side="right"))
+
+    pairs = []
+    start, count = 0, len(boxes)
+    while start < count:
+        rows = np.arange(1, min(count - start, MAX_CHUNK_ROWS) + 1)
+        cells = rows * np.maximum(hi[start: start + len(rows)] - start - 1, 0)
+        end = start + max(1, int(np.searchsorted(cells, max_chunk_cells, side="right")))
+
+        window = slice(start + 1, hi[end - 1])
+        chunk = boxes[start:end]
+        candidates = boxes[window]
+        overlap = (
+            np.all(chunk[:, None, 0] <= candidates[None, :, 1], axis=2)
+            & np.all(candidates[None, :, 0] <= chunk[:, None, 1], axis=2)
+            & (np.arange(window.start, window.stop)[None, :] > np.arange(start, end)[:, None])
+        )
+        chunk_hits, candidate_hits = np.nonzero(overlap)
+        if len(chunk_hits):
+            first = valid[order[chunk_hits + start]]
+            second = valid[order[candidate_hits + window.start]]
+            pairs.append(
+                np.column_stack((np.minimum(first, second), np.maximum(first, second)))
+            )
+        start = end
+
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.concatenate(pairs).astype(np.int64, copy=False)
+
+
+def _packed(elements: Union[List[Element], np.ndarray]) -> np.ndarray:
+    return elements if isinstance(elements, np.ndarray) else pack_bounds(elements)
+
+
+def broad_phase(
+    reference_elements: Union[List[Element], np.ndarray],
+    latest_elements: Union[List[Element], np.ndarray],
+    margin: float = 0.0,
+    reference_index: Optional[SweepIndex] = None,
+    latest_index: Optional[SweepIndex] = None,
+) -> Tuple[np.ndarray, BroadPhaseStats]:
+    """
+    Reduce the full reference × latest product to pairs with overlapping bounds.
+
+    Args:
+        reference_elements (Union[List[Element], np.ndarray]): Elements from the
+            reference model, or their already packed (N, 2, 3) bounds.
+        latest_elements (Union[List[Element], np.ndarray]): Elements from the latest
+            model, or their packed bounds.
+        margin (float): Reference boxes are grown by this much, so pairs closer than
+            the margin are kept as well.
+        reference_index (Optional[SweepIndex]): Prebuilt index of the reference bounds.
+        latest_index (Optional[SweepIndex]): Prebuilt index of the latest bounds.
+
+    Returns:
+        Tuple[np.ndarray, BroadPhaseStats]: Candidate (K, 2) index pairs and a
+            summary of how many pairs were pruned.
+    """
+    pairs = overlapping_pairs(
+        inflate_bounds(_packed(reference_elements), margin),
+        _packed(latest_elements),
+        reference_index=reference_index,
+        latest_index=latest_index,
+    )
+    stats = BroadPhaseStats(
+        total_pairs=len(reference_elements) * len(latest_elements),
+        candidate_pairs=len(pairs),
+    )
+    return pairs, stats
+
+
+def self_broad_phase(
+    elements: Union[List[Element], np.ndarray],
+    margin: float = 0.0,
+    index: Optional[SweepIndex] = None,
+) -> Tuple[np.ndarray, BroadPhaseStats]:
+    """
+    Reduce all unordered pairs of one set of elements to those with overlapping bounds.
+
+    Args:
+        elements (Union[List[Element], np.ndarray]): The elements, or their packed
+            (N, 2, 3) bounds.
+        margin (float): Pairs closer than the margin are kept as well. Every box is
+            grown by half of it.
+        index (Optional[SweepIndex]): Prebuilt index of the bounds.
+
+    Returns:
+        Tuple[np.ndarray, BroadPhaseStats]: Candidate (K, 2) index pairs (i < j) and
+            a summary of how many pairs were pruned.
+    """
+    pairs = self_overlapping_pairs(
+        inflate_bounds(_packed(elements), margin / 2), index=index
+    )
+    stats = BroadPhaseStats(
+        total_pairs=len(elements) * (len(elements) - 1) // 2,
+        candidate_pairs=len(pairs),
+    )
+    return pairs, stats
@@ -0,0 +1,165 @@
+"""Bounding volume hierarchy over the triangles of a single mesh."""
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from Geometry.distance import triangle_distances
+
+DEFAULT_LEAF_SIZE = 8
+# Number of triangle pairs gathered before they are evaluated in one batch.
+DEFAULT_PAIR_BATCH = 4096
+
+
+class TriangleBVH:
+    def __init__(
+        self, vertices: np.ndarray, faces: np.ndarray, leaf_size: int = DEFAULT_LEAF_SIZE
+    ):
+        """
+        Build a BVH over the triangles of a mesh by median splits.
+
+        Nodes are stored in flat arrays. A leaf owns the triangles
+        `triangles[node_start[n]:node_start[n] + node_count[n]]`; inner nodes have
+        `node_count[n] == 0` and two children.
+
+        Args:
+        vertices (np.ndarray): (V, 3) vertex positions.
+        faces (np.ndarray): (F, 3) triangle vertex indices.
+        leaf_size (int): Maximum number of triangles in a leaf.
+        """
+        triangles = np.asarray(vertices, dtype=float)[np.asarray(faces)]
+        triangle_min = triangles.min(axis=1)
+        triangle_max = triangles.max(axis=1)
+        centroids = triangles.mean(axis=1)
+
+        order = np.arange(len(triangles))
+        bounds, starts, counts, left, right = [], [], [], [], []
+        stack = [(0, len(triangles), -1, False)]
+
+        while stack:
+            start, end, parent, is_right = stack.pop()
+            node = len(bounds)
+            if parent >= 0:
+                (right if is_right else left)[parent] = node
+
+            members = order[start:end]
+            bounds.append(
+                [triangle_min[members].min(axis=0), triangle_max[members].max(axis=0)]
+                if len(members)
+                else [np.full(3, np.inf), np.full(3, -np.inf)]
+            )
+            left.append(-1)
+            right.append(-1)
+
+            if end - start <= leaf_size:
+                starts.append(start)
+                counts.append(end - start)
+                continue
+
+            starts.append(start)
+            counts.append(0)
+
+            spread = centroids[members].max(axis=0) - centroids[members].min(axis=0)
+            axis = int(np.argmax(spread))
+            middle = (end - start) // 2
+            split = np.argpartition(centroids[members, axis], middle)
+            order[start:end] = members[split]
+
+            stack.append((start + middle, end, node, True))
+            stack.append((start, start + middle, node, False))
+
+        self.triangles = triangles[order]
+        self.node_bounds = np.array(bounds, dtype=float).reshape(-1, 2, 3)
+        self.node_start = np.array(starts, dtype=np.int64)
+        self.node_count = np.array(counts, dtype=np.int64)
+        self.node_left = np.array(left, dtype=np.int64)
+        self.node_right = np.array(right, dtype=np.int64)
+
+    @property
+    def nbytes(self) -> int:
+        return self.triangles.nbytes + self.node_bounds.nbytes + 4 * self.node_start.nbytes
+
+    def is_leaf(self, node: int) -> bool:
+        return self.node_left[node] < 0
+
+    def leaf_triangles(self, node: int) -> np.ndarray:
+        start = self.node_start[node]
+        return np.arange(start, start + self.node_count[node])
+
+
+def box_distance(a: np.ndarray, b: np.ndarray) -> float:
+    """Euclidean distance between two (2, 3) axis-aligned boxes, 0 if they overlap."""
+    gap = np.maximum(0.0, np.maximum(a[0] - b[1], b[0] - a[1]))
+    return float(np.sqrt(np.dot(gap, gap)))
+
+
+def candidate_triangle_pairs(
+    a: TriangleBVH, b: TriangleBVH, distance: float, batch_size: int = DEFAULT_PAIR_BATCH
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Traverse two BVHs together and yield triangle pairs whose boxes are close.
+
+    Node pairs whose boxes are further apart than `distance` are pruned. Leaf pairs
+    are gathered and yielded in batches of at least `batch_size` triangle pairs,
+    so callers can evaluate them with array operations and stop early.
+
+    Args:
+        a (TriangleBVH): The first hierarchy.
+        b (TriangleBVH): The second hierarchy.
+        distance (float): Pairs whose boxes are further apart are never yielded.
+        batch_size (int): Minimum number of pairs per batch, except the last.
+
+    Yields:
+        Tuple[np.ndarray, np.ndarray]: Indices into `a.triangles` and `b.triangles`.
+    """
+    if len(a.triangles) == 0 or len(b.triangles) == 0:
+        return
+
+    pending_a, pending_b, pending = [], [], 0
+    stack = [(0, 0)]
+    while stack:
+        node_a, node_b = stack.pop()
+        if box_distance(a.node_bounds[node_a], b.node_bounds[node_b]) > distance:
+            continue
+
+        leaf_a, leaf_b = a.is_leaf(node_a), b.is_leaf(node_b)
+        if leaf_a and leaf_b:
+            triangles_a = a.leaf_triangles(node_a)
+            triangles_b = b.leaf_triangles(node_b)
+            pending_a.append(np.repeat(triangles_a, len(triangles_b)))
+            pending_b.append(np.tile(triangles_b, len(triangles_a)))
+            pending += len(triangles_a) * len(triangles_b)
+            if pending >= batch_size:
+                yield np.concatenate(pending_a), np.concatenate(pending_b)
+                pending_a, pending_b, pending = [], [], 0
+            continue
+
+        # Descend into the inner node with the larger box, or the only inner node.
+        extent_a = np.ptp(a.node_bounds[node_a], axis=0).sum()
+        extent_b = np.ptp(b.node_bounds[node_b], axis=0).sum()
+        if leaf_b or (not leaf_a and extent_a >= extent_b):
+            stack.append((a.node_left[node_a], node_b))
+            stack.append((a.node_right[node_a], node_b))
+        else:
+            stack.append((node_a, b.node_left[node_b]))
+            stack.append((node_a, b.node_right[node_b]))
+
+    if pending:
+        yield np.concatenate(pending_a), np.concatenate(pending_b)
+
+
+def within_distance(a: TriangleBVH, b: TriangleBVH, distance: float) -> bool:
+    """
+    Test whether two meshes come closer than `distance` anywhere.
+
+    Args:
+        a (TriangleBVH): The first mesh.
+        b (TriangleBVH): The second mesh.
+        distance (float): The clearance to test against.
+
+    Returns:
+        bool: True as soon as one triangle pair is found within the distance.
+    """
+    for indices_a, indices_b in candidate_triangle_pairs(a, b, distance):
+        if np.any(triangle_distances(a.triangles[indices_a], b.triangles[indices_b]) <= distance):
+            return True
+    return False
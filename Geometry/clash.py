@@ -1,6 +1,10 @@
-from collections import defaultdict
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from typing import List, Tuple, Any, Optional
+import time
+from collections import Counter
+from contextlib import ExitStack
+from enum import Enum
+from typing import Dict, List, NamedTuple, Tuple, Optional, Union
+
+import numpy as np
 
 try:
     import pymesh
@@ -11,8 +15,79 @@ except ImportError:
 
 from speckle_automate import AutomationContext
 
+from Geometry.broad_phase import (
+    broad_phase,
+    inflate_bounds,
+    overlapping_pairs,
+    self_broad_phase,
+)
+from Geometry.bvh import TriangleBVH, within_distance
+from Geometry.clustering import clash_locations
+from Geometry.diagnostics import PairProfile, PairSample
 from Geometry.element import Element
-from Geometry.mesh import cast
+from Geometry.intersection import meshes_intersect, meshes_nested
+from Geometry.mesh import cast, conversion_cache, form_pymesh
+from Geometry.prefilter import (
+    convex_hulls_intersect,
+    obb_overlap,
+    oriented_bounds,
+    transform_obb,
+)
+from Geometry.reporting import DEFAULT_MAX_REPORTED_GROUPS, report_clashes
+from Geometry.result_store import ClashResultStore
+from Geometry.scheduler import BatchResult, create_pool, map_batches
+from Geometry.store import GeometryStore, PackedModel, pack_model
+from Utilities import instrumentation
+
+
+class ClashMode(str, Enum):
+    """How mesh pairs that pass the bounding box test are checked."""
+
+    HARD = "hard"  # triangle intersection straight after the AABB test
+    STAGED = "staged"  # AABB, then OBB, then convex hull (GJK), then triangles
+    CLEARANCE = "clearance"  # closer than the tolerance, by triangle distance
+
+
+class ClashSettings(NamedTuple):
+    """Options of one detection run, shared with every worker."""
+
+    mode: ClashMode = ClashMode.HARD
+    tolerance: float = 0.0  # clearance in model units, used by ClashMode.CLEARANCE
+    require_volume: bool = False  # confirm intersections with a pymesh boolean
+    touching: bool = False  # also report meshes that touch without overlapping
+
+
+# Report labels of the per-stage counters of mesh pairs.
+STAGE_LABELS = {
+    "stage_aabb": "passed AABB",
+    "stage_obb": "passed OBB",
+    "stage_gjk": "passed convex hull",
+    "stage_triangles": "intersect",
+    "stage_boolean": "with volume",
+    "stage_distance": "within clearance",
+}
+
+# The stages each mode runs, in pipeline order.
+MODE_STAGES = {
+    ClashMode.HARD: ("stage_aabb", "stage_triangles"),
+    ClashMode.STAGED: ("stage_aabb", "stage_obb", "stage_gjk", "stage_triangles"),
+    ClashMode.CLEARANCE: ("stage_aabb", "stage_distance"),
+}
+
+
+def clash_stages(settings: ClashSettings) -> Tuple[str, ...]:
+    """The stage counters a detection run with these settings fills, in order."""
+    stages = MODE_STAGES[settings.mode]
+    if settings.require_volume and settings.mode != ClashMode.CLEARANCE:
+        stages += ("stage_boolean",)
+    return stages
+
+# Geometry of the running detection, installed in every pool worker once by
+# `_init_clash_worker` so batches only need to carry index pairs, with the triangle
+# counts of the elements of both stores for the pair cost samples.
+_worker_state: Optional[
+    Tuple[GeometryStore, GeometryStore, ClashSettings, List[int], List[int]]
+] = None
 
 
 def detect_clashes_old(
@@ -30,121 +105,657 @@ def detect_clashes_old(
         List[Tuple[str, str]]: List of tuples indicating clashes, with each tuple
                                containing the IDs of the clashing elements.
     """
-    # TODO: Spatial partitioning to reduce number of comparisons
     # TODO: Tolerance
     # TODO: parallel processing
 
+    candidate_pairs, _ = broad_phase(reference_elements, latest_elements)
+
     clashes = []
-    for ref_element in reference_elements:
-        for latest_element in latest_elements:
-            for ref_mesh in ref_element.meshes:
-                for latest_mesh in latest_element.meshes:
-                    # Convert Trimesh meshes to Pymesh if necessary
-                    ref_pymesh: pymesh.Mesh = cast(ref_mesh, pymesh.Mesh)
-                    latest_pymesh: pymesh.Mesh = cast(latest_mesh, pymesh.Mesh)
-
-                    if not ref_pymesh or not latest_pymesh:
-                        continue
-
-                    intersection = pymesh.boolean(
-                        latest_pymesh, ref_pymesh, operation="intersection"
+    for ref_index, latest_index in candidate_pairs.tolist():
+        ref_element = reference_elements[ref_index]
+        latest_element = latest_elements[latest_index]
+        for ref_mesh in ref_element.transformed_meshes():
+            for latest_mesh in latest_element.transformed_meshes():
+                # Convert Trimesh meshes to Pymesh if necessary
+                ref_pymesh: pymesh.Mesh = cast(ref_mesh, pymesh.Mesh)
+                latest_pymesh: pymesh.Mesh = cast(latest_mesh, pymesh.Mesh)
+
+                if not ref_pymesh or not latest_pymesh:
+                    continue
+
+                intersection = pymesh.boolean(
+                    latest_pymesh, ref_pymesh, operation="intersection"
+                )
+
+                if (
+                        intersection and intersection.volume > 0
+                ):  # TODO: could tolerance relate to this?
+                    severity = intersection.volume / min(
+                        ref_pymesh.volume, latest_pymesh.volume
                     )
-
-                    if (
-                            intersection and intersection.volume > 0
-                    ):  # TODO: could tolerance relate to this?
-                        severity = intersection.volume / min(
-                            ref_pymesh.volume, latest_pymesh.volume
-                        )
-                        clashes.append((ref_element.id, latest_element.id, severity))
-                        break
+                    clashes.append((ref_element.id, latest_element.id, severity))
+                    break
 
     return clashes
 
 
+def _mesh_bvh(store: GeometryStore, mesh_index: int) -> TriangleBVH:
+    vertices, faces = store.mesh(mesh_index)
+    return conversion_cache.get(
+        ("bvh", store.token, mesh_index),
+        lambda: TriangleBVH(vertices, faces),
+        # Dominated by the (F, 3, 3) triangle soup.
+        3 * faces.shape[0] * 3 * vertices.itemsize,
+    )
+
+
+def _mesh_obb(store: GeometryStore, mesh_index: int) -> np.ndarray:
+    # Only the staged mode tests oriented boxes, so they are fitted on first use.
+    def fit() -> np.ndarray:
+        geometry = store.mesh_geometry[mesh_index]
+        start, end = store.geometry_vertex_offsets[geometry: geometry + 2]
+        return transform_obb(
+            oriented_bounds(store.vertices[start:end]), store.mesh_transforms[mesh_index]
+        )
+
+    return conversion_cache.get(("obb", store.token, mesh_index), fit, 5 * 3 * 8)
+
+
+def _boolean_volume(
+        reference: GeometryStore, ref_mesh_index: int, latest: GeometryStore, latest_mesh_index: int
+) -> bool:
+    ref_pymesh = form_pymesh(
+        (reference.token, ref_mesh_index), *reference.mesh(ref_mesh_index)
+    )
+    latest_pymesh = form_pymesh(
+        (latest.token, latest_mesh_index), *latest.mesh(latest_mesh_index)
+    )
+
+    if not ref_pymesh or not latest_pymesh:
+        return False
+
+    intersection = pymesh.boolean(latest_pymesh, ref_pymesh, operation="intersection")
+
+    return bool(intersection and intersection.volume > 0)
+
+
 def check_for_clash(
-        ref_element: Element, latest_element: Element
-) -> Optional[tuple[Any, Any]]:
+        reference: GeometryStore,
+        ref_index: int,
+        latest: GeometryStore,
+        latest_index: int,
+        settings: ClashSettings = ClashSettings(),
+        counters: Optional[Counter] = None,
+) -> bool:
     """
-    Check for a clash between two elements and calculate the severity of the clash.
+    Check for a clash between two elements held in geometry stores.
+
+    Mesh pairs go through the stages of the chosen mode in order of cost and stop at
+    the first stage that rules out a clash. Intersections are decided on the
+    triangles themselves, and meshes that only touch are not clashes unless
+    `settings.touching` asks for them; the much slower pymesh boolean only runs
+    when `settings.require_volume` asks for a positive intersection volume.
 
     Args:
-        ref_element (Element): An element from the reference model.
-        latest_element (Element): An element from the latest model.
+        reference (GeometryStore): The store of the reference model.
+        ref_index (int): Index of the element in the reference store.
+        latest (GeometryStore): The store of the latest model.
+        latest_index (int): Index of the element in the latest store.
+        settings (ClashSettings): Options of the detection run.
+        counters (Optional[Counter]): Receives the number of mesh pairs reaching
+            each stage, see `clash_stages`, and the nanoseconds spent in booleans
+            under "boolean_ns".
 
     Returns:
-        Tuple[str, str, float]: A tuple containing the IDs of the clashing elements and the severity, if a clash is found.
+        bool: True if any mesh of one element intersects a mesh of the other or, in
+            clearance mode, comes closer than the tolerance or lies inside it.
     """
+    ref_meshes = reference.element_mesh_indices(ref_index)
+    latest_meshes = latest.element_mesh_indices(latest_index)
+    clearance = settings.mode == ClashMode.CLEARANCE
+    margin = settings.tolerance if clearance else 0.0
+
+    # Only mesh pairs whose own (grown) bounds overlap can clash.
+    mesh_pairs = overlapping_pairs(
+        inflate_bounds(reference.mesh_bounds[ref_meshes.start: ref_meshes.stop], margin),
+        latest.mesh_bounds[latest_meshes.start: latest_meshes.stop],
+    )
+
+    counters = Counter() if counters is None else counters
+    counters["stage_aabb"] += len(mesh_pairs)
+
+    for ref_mesh_index, latest_mesh_index in mesh_pairs.tolist():
+        ref_mesh_index = ref_meshes[ref_mesh_index]
+        latest_mesh_index = latest_meshes[latest_mesh_index]
+
+        if clearance:
+            ref_bvh = _mesh_bvh(reference, ref_mesh_index)
+            latest_bvh = _mesh_bvh(latest, latest_mesh_index)
+            close = within_distance(ref_bvh, latest_bvh, settings.tolerance)
+            # A mesh deep inside the other is far from its surface, yet still clashes.
+            if close or meshes_nested(ref_bvh, latest_bvh):
+                counters["stage_distance"] += 1
+                return True
+            continue
 
-    for ref_mesh in ref_element.meshes:
-        for latest_mesh in latest_element.meshes:
-            ref_pymesh = cast(ref_mesh, pymesh.Mesh)
-            latest_pymesh = cast(latest_mesh, pymesh.Mesh)
+        if settings.mode == ClashMode.STAGED:
+            if not obb_overlap(
+                    _mesh_obb(reference, ref_mesh_index), _mesh_obb(latest, latest_mesh_index)
+            ):
+                continue
+            counters["stage_obb"] += 1
 
-            if not ref_pymesh or not latest_pymesh:
+            if not convex_hulls_intersect(
+                    reference.mesh(ref_mesh_index)[0], latest.mesh(latest_mesh_index)[0]
+            ):
                 continue
+            counters["stage_gjk"] += 1
 
-            intersection = pymesh.boolean(latest_pymesh, ref_pymesh, operation="intersection")
+        if not meshes_intersect(
+                _mesh_bvh(reference, ref_mesh_index),
+                _mesh_bvh(latest, latest_mesh_index),
+                settings.touching,
+        ):
+            continue
+        counters["stage_triangles"] += 1
 
-            if intersection and intersection.volume > 0:
+        if settings.require_volume:
+            boolean_start = time.perf_counter_ns()
+            has_volume = _boolean_volume(reference, ref_mesh_index, latest, latest_mesh_index)
+            counters["boolean_ns"] += time.perf_counter_ns() - boolean_start
+            if not has_volume:
+                continue
+            counters["stage_boolean"] += 1
+        return True
+    return False
+
+
+def _init_clash_worker(
+        reference: GeometryStore, latest: GeometryStore, settings: ClashSettings
+) -> None:
+    global _worker_state
+    _worker_state = (
+        reference,
+        latest,
+        settings,
+        reference.element_face_counts().tolist(),
+        latest.element_face_counts().tolist(),
+    )
+
+
+def _check_clash_batch(pairs: np.ndarray) -> BatchResult:
+    """Run `check_for_clash` in a worker on a batch of (reference, latest) index pairs."""
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    cache_before = conversion_cache.stats()
+    reference, latest, settings, ref_faces, latest_faces = _worker_state
+    counters = Counter()
+    profile = PairProfile()
+
+    clashes = []
+    for ref_index, latest_index in pairs.tolist():
+        boolean_before = counters["boolean_ns"]
+        pair_start = time.perf_counter()
+        clash = check_for_clash(reference, ref_index, latest, latest_index, settings, counters)
+        profile.record(
+            PairSample(
+                time.perf_counter() - pair_start,
+                ref_index,
+                latest_index,
+                ref_faces[ref_index] + latest_faces[latest_index],
+                (counters["boolean_ns"] - boolean_before) / 1e9,
+                clash,
+            )
+        )
+        if clash:
+            clashes.append((ref_index, latest_index))
+    counters.update(
+        {
+            f"conversion_cache_{name}": value - cache_before[name]
+            for name, value in conversion_cache.stats().items()
+            if name in ("hits", "misses", "evictions")
+        }
+    )
+    counters["worker_cpu_ms"] += int((time.process_time() - cpu_start) * 1000)
+
+    return BatchResult(
+        clashes=np.array(clashes, dtype=np.int64).reshape(-1, 2),
+        pair_count=len(pairs),
+        elapsed=time.perf_counter() - start,
+        counters=dict(counters),
+        profile=profile,
+    )
 
-                return ref_element.id, latest_element.id
-    return None
+
+def stage_report(counters: Counter, stages: Tuple[str, ...]) -> str:
+    """Describe how many mesh pairs passed each stage of the narrow phase."""
+    parts = [f"{counters[stages[0]]} {STAGE_LABELS[stages[0]]}"]
+    for previous, stage in zip(stages, stages[1:]):
+        rate = counters[stage] / counters[previous] if counters[previous] else 0.0
+        parts.append(f"{counters[stage]} {STAGE_LABELS[stage]} ({rate:.1%})")
+    return "Mesh pairs: " + ", ".join(parts) + "."
 
 
 def detect_clashes(
-        reference_elements: List[Element], latest_elements: List[Element], _tolerance: float
+        reference_elements: Union[List[Element], PackedModel],
+        latest_elements: Union[List[Element], PackedModel],
+        tolerance: float,
+        mode: ClashMode = ClashMode.HARD,
+        chunk_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        require_volume: bool = False,
+        touching: bool = False,
+        reference_changed: Optional[np.ndarray] = None,
+        latest_changed: Optional[np.ndarray] = None,
 ) -> List[Tuple[str, str]]:
     """
     Detect clashes between two sets of mesh elements using parallel processing.
 
+    The meshes of both sets are packed into shared memory geometry stores that the
+    workers map without copying; candidate pairs are then sent as batches of
+    index pairs.
+
     Args:
-        reference_elements (List[Element]): Elements from the reference model.
-        latest_elements (List[Element]): Elements from the latest model.
-        _tolerance (float): Tolerance value for clash detection. TODO: how to implement this?
+        reference_elements (Union[List[Element], PackedModel]): Elements from the
+            reference model, possibly already packed (e.g. from the model cache).
+        latest_elements (Union[List[Element], PackedModel]): Elements from the
+            latest model.
+        tolerance (float): Clearance in model units. Only used by
+            ClashMode.CLEARANCE, where pairs closer than this are clashes.
+        mode (ClashMode): Which narrow phase stages run on each mesh pair.
+        chunk_size (Optional[int]): Fixed number of pairs per batch. By default the
+            batch size is adapted to the measured cost per pair.
+        max_workers (Optional[int]): Number of worker processes, defaults to the CPU count.
+        require_volume (bool): Only report intersections whose pymesh boolean has
+            a positive volume. Slow.
+        touching (bool): Also report elements that touch without overlapping, such
+            as flush-mounted ones. Only used by the hard and staged modes.
+        reference_changed (Optional[np.ndarray]): Boolean mask over the reference
+            elements. When given with `latest_changed`, only candidate pairs with
+            at least one changed side are evaluated.
+        latest_changed (Optional[np.ndarray]): Boolean mask over the latest elements.
 
     Returns:
         List[Tuple[str, str, float]]: A list of tuples indicating clashes.
     """
+    settings = ClashSettings(
+        mode=mode,
+        tolerance=tolerance if mode == ClashMode.CLEARANCE else 0.0,
+        require_volume=require_volume,
+        touching=touching,
+    )
+    with instrumentation.span("pack"):
+        reference_model = pack_model(reference_elements)
+        latest_model = pack_model(latest_elements)
+
+    with instrumentation.span("broad phase") as span:
+        candidate_pairs, stats = broad_phase(
+            reference_model.bounds,
+            latest_model.bounds,
+            settings.tolerance,
+            reference_model.index,
+            latest_model.index,
+        )
+        span.count("candidate_pairs", stats.candidate_pairs)
+    print(stats)
+
+    if reference_changed is not None and latest_changed is not None:
+        candidate_pairs = candidate_pairs[
+            reference_changed[candidate_pairs[:, 0]] | latest_changed[candidate_pairs[:, 1]]
+        ]
+        print(f"{len(candidate_pairs)} candidate pairs involve new or changed elements.")
+
+    return [
+        (reference_model.ids[ref_index], latest_model.ids[latest_index])
+        for ref_index, latest_index in narrow_phase(
+            reference_model, latest_model, candidate_pairs, settings, max_workers, chunk_size
+        )
+    ]
+
+
+def detect_self_clashes(
+        elements: Union[List[Element], PackedModel],
+        tolerance: float,
+        mode: ClashMode = ClashMode.HARD,
+        chunk_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        require_volume: bool = False,
+        touching: bool = False,
+        changed: Optional[np.ndarray] = None,
+) -> List[Tuple[str, str]]:
+    """
+    Detect clashes among the elements of one set, such as ducts against pipes of
+    the same MEP model.
+
+    The set is indexed once and swept against itself, so every unordered pair of
+    elements with overlapping bounds is evaluated exactly once. Parts of the same
+    block instance are never clashes.
+
+    Args:
+        elements (Union[List[Element], PackedModel]): The elements to clash.
+        tolerance (float): Clearance in model units, see `detect_clashes`.
+        mode (ClashMode): Which narrow phase stages run on each mesh pair.
+        chunk_size (Optional[int]): Fixed number of pairs per batch.
+        max_workers (Optional[int]): Number of worker processes.
+        require_volume (bool): See `detect_clashes`.
+        touching (bool): See `detect_clashes`.
+        changed (Optional[np.ndarray]): Boolean mask over the elements. When given,
+            only pairs with at least one changed element are evaluated.
+
+    Returns:
+        List[Tuple[str, str]]: Clashing id pairs, each ordered by id.
+    """
+    settings = ClashSettings(
+        mode=mode,
+        tolerance=tolerance if mode == ClashMode.CLEARANCE else 0.0,
+        require_volume=require_volume,
+        touching=touching,
+    )
+    with instrumentation.span("pack"):
+        model = pack_model(elements)
+
+    with instrumentation.span("broad phase") as span:
+        candidate_pairs, stats = self_broad_phase(model.bounds, settings.tolerance, model.index)
+        span.count("candidate_pairs", stats.candidate_pairs)
+    print(stats)
+
+    # The sweep never pairs an element with itself. Placements of one definition
+    # share its id but not their group, so they are still clashed with each other.
+    groups = model.store.element_groups
+    first, second = candidate_pairs[:, 0], candidate_pairs[:, 1]
+    related = (groups[first] == groups[second]) & (groups[first] >= 0)
+    candidate_pairs = candidate_pairs[~related]
+    print(f"Skipped {related.sum()} pairs within one block instance.")
+
+    if changed is not None:
+        candidate_pairs = candidate_pairs[
+            changed[candidate_pairs[:, 0]] | changed[candidate_pairs[:, 1]]
+        ]
+        print(f"{len(candidate_pairs)} candidate pairs involve new or changed elements.")
+
+    return [
+        tuple(sorted((model.ids[first_index], model.ids[second_index])))
+        for first_index, second_index in narrow_phase(
+            model, model, candidate_pairs, settings, max_workers, chunk_size
+        )
+    ]
+
+
+def narrow_phase(
+        reference_model: PackedModel,
+        latest_model: PackedModel,
+        candidate_pairs: np.ndarray,
+        settings: ClashSettings = ClashSettings(),
+        max_workers: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+) -> List[Tuple[int, int]]:
+    """
+    Check candidate pairs in a worker pool and return the clashing index pairs.
+
+    Args:
+        reference_model (PackedModel): The reference elements.
+        latest_model (PackedModel): The latest elements, or `reference_model` again
+            to clash one set against itself.
+        candidate_pairs (np.ndarray): (P, 2) element index pairs, as returned by
+            `broad_phase`.
+        settings (ClashSettings): Options of the detection run.
+        max_workers (Optional[int]): Number of worker processes, defaults to the CPU count.
+        chunk_size (Optional[int]): Fixed number of pairs per batch, adapted to the
+            measured cost per pair by default.
+
+    Returns:
+        List[Tuple[int, int]]: The clashing (reference index, latest index) pairs.
+    """
     clashes = []
-    with ProcessPoolExecutor() as executor:
-        future_clash = {
-            executor.submit(check_for_clash, ref, latest): (ref, latest)
-            for ref in reference_elements
-            for latest in latest_elements
-        }
-        for future in as_completed(future_clash):
-            result = future.result()
-            if result:
-                clashes.append(result)
+    if len(candidate_pairs) == 0:
+        return clashes
+
+    counters = Counter()
+    profile = PairProfile()
+
+    with ExitStack() as stack:
+        span = stack.enter_context(instrumentation.span("narrow phase"))
+        reference = stack.enter_context(reference_model.store.share())
+        # A model clashed against itself is shared once, under one token.
+        latest = (
+            reference
+            if latest_model is reference_model
+            else stack.enter_context(latest_model.store.share())
+        )
+        executor = stack.enter_context(
+            create_pool(max_workers, _init_clash_worker, (reference, latest, settings))
+        )
+        for result in map_batches(
+                executor, _check_clash_batch, candidate_pairs, max_workers, chunk_size
+        ):
+            clashes.extend(map(tuple, result.clashes.tolist()))
+            counters.update(result.counters or {})
+            if result.profile is not None:
+                profile.merge(result.profile)
+        span.count("pairs", len(candidate_pairs))
+        span.count("clashes", len(clashes))
+    instrumentation.merge(counters)
+
+    print(stage_report(counters, clash_stages(settings)))
+    print(
+        f"Mesh conversion cache: {counters['conversion_cache_hits']} hits, "
+        f"{counters['conversion_cache_misses']} misses, "
+        f"{counters['conversion_cache_evictions']} evictions."
+    )
+    print(profile.report(reference_model.ids, latest_model.ids))
+    instrumentation.detail(
+        "pair costs", profile.to_dict(reference_model.ids, latest_model.ids)
+    )
 
     return clashes
 
 
-def detect_and_report_clashes(
-        reference_elements: list[Element],
-        latest_elements: list[Element],
+def detect_clashes_incremental(
+        reference_elements: Union[List[Element], PackedModel],
+        latest_elements: Optional[Union[List[Element], PackedModel]],
         tolerance: float,
-        automate_context: AutomationContext,
-) -> list[tuple[str, str]]:
+        result_store: ClashResultStore,
+        scope: str,
+        mode: ClashMode = ClashMode.HARD,
+        require_volume: bool = False,
+        touching: bool = False,
+) -> List[Tuple[str, str]]:
+    """
+    Detect clashes, reusing the results of the previous run stored under `scope`.
 
-    clashes = detect_clashes(reference_elements, latest_elements, tolerance)
+    Every pair between elements that were both part of the previous run has
+    already been evaluated; its outcome is taken from the store. Only pairs with
+    a new or changed element on at least one side go through the narrow phase.
+    Elements are matched across runs by `PackedModel.placement_keys`, so a moved
+    block instance counts as changed although its id is that of its definition.
 
-    grouped_clashes = defaultdict(list)
+    Args:
+        reference_elements (Union[List[Element], PackedModel]): Elements from the
+            reference model.
+        latest_elements (Optional[Union[List[Element], PackedModel]]): Elements
+            from the latest model, or None to clash the reference elements against
+            each other with `detect_self_clashes`.
+        tolerance (float): Clearance in model units, see `detect_clashes`.
+        result_store (ClashResultStore): Holds the results of earlier runs.
+        scope (str): Identifies the models compared; the settings are added to it.
+        mode (ClashMode): Which narrow phase stages run on each mesh pair.
+        require_volume (bool): See `detect_clashes`.
+        touching (bool): See `detect_clashes`.
 
-    for ref, latest in clashes:
-        if not latest:
-            continue
-        grouped_clashes[ref].append(latest)
+    Returns:
+        List[Tuple[str, str]]: All clashing (reference id, latest id) pairs.
+    """
+    reference_model, latest_model, object_ids = _keyed_by_placement(
+        reference_elements, latest_elements
+    )
+    clashes = _detect_keyed_clashes_incremental(
+        reference_model,
+        latest_model,
+        tolerance,
+        result_store,
+        scope,
+        mode,
+        require_volume,
+        touching,
+    )
+    return _clashes_by_id(clashes, object_ids, latest_elements is None)
+
+
+def _keyed_by_placement(
+        reference_elements: Union[List[Element], PackedModel],
+        latest_elements: Optional[Union[List[Element], PackedModel]],
+) -> Tuple[PackedModel, Optional[PackedModel], Dict[str, str]]:
+    """Pack both sides with `PackedModel.placement_keys` as ids, mapped to object ids."""
+    with instrumentation.span("pack"):
+        reference_packed = pack_model(reference_elements)
+        latest_packed = None if latest_elements is None else pack_model(latest_elements)
+
+    reference_model = reference_packed.keyed_by_placement()
+    object_ids = dict(zip(reference_model.ids, reference_packed.ids))
+    latest_model = None
+    if latest_packed is not None:
+        latest_model = latest_packed.keyed_by_placement()
+        object_ids.update(zip(latest_model.ids, latest_packed.ids))
+    return reference_model, latest_model, object_ids
+
+
+def _clashes_by_id(
+        clashes: List[Tuple[str, str]], object_ids: Dict[str, str], self_clash: bool
+) -> List[Tuple[str, str]]:
+    """Map clashes between placement keys back to object ids."""
+    clashes = [(object_ids[first], object_ids[second]) for first, second in clashes]
+    # Self clashes are ordered by id, like those of `detect_self_clashes`.
+    return [tuple(sorted(clash)) for clash in clashes] if self_clash else clashes
+
+
+def _detect_keyed_clashes_incremental(
+        reference_model: PackedModel,
+        latest_model: Optional[PackedModel],
+        tolerance: float,
+        result_store: ClashResultStore,
+        scope: str,
+        mode: ClashMode,
+        require_volume: bool,
+        touching: bool,
+) -> List[Tuple[str, str]]:
+    """`detect_clashes_incremental` on models keyed by placement, returning keys."""
+    scope = f"{scope}|{mode.value}|{tolerance}|{require_volume}|{touching}"
+    with instrumentation.span("result store"):
+        previous = result_store.load(scope)
+
+    self_clash = latest_model is None
+    latest_model = reference_model if self_clash else latest_model
+
+    reference_changed = np.array(
+        [key not in previous.reference_ids for key in reference_model.ids], dtype=bool
+    )
+    latest_changed = np.array(
+        [key not in previous.latest_ids for key in latest_model.ids], dtype=bool
+    )
+    print(
+        f"Incremental run: {reference_changed.sum()} of {len(reference_model)} "
+        f"reference and {latest_changed.sum()} of {len(latest_model)} latest "
+        f"elements are new or changed."
+    )
+
+    reference_keys, latest_keys = set(reference_model.ids), set(latest_model.ids)
+    cached = [
+        (ref_key, latest_key)
+        for ref_key, latest_key in sorted(previous.clashes)
+        if ref_key in reference_keys and latest_key in latest_keys
+    ]
+
+    clashes = cached
+    if self_clash and reference_changed.any():
+        clashes = cached + detect_self_clashes(
+            reference_model,
+            tolerance,
+            mode,
+            require_volume=require_volume,
+            touching=touching,
+            changed=reference_changed,
+        )
+    elif not self_clash and (reference_changed.any() or latest_changed.any()):
+        clashes = cached + detect_clashes(
+            reference_model,
+            latest_model,
+            tolerance,
+            mode,
+            require_volume=require_volume,
+            touching=touching,
+            reference_changed=reference_changed,
+            latest_changed=latest_changed,
+        )
+    print(f"Reused {len(cached)} cached clashes.")
+    instrumentation.count("reused_clashes", len(cached))
 
-    for group_number, clashing_objects in enumerate(grouped_clashes.items(), start=1):
+    with instrumentation.span("result store"):
+        result_store.save(scope, reference_keys, latest_keys, clashes)
+    return clashes
 
-        ref_id, latest_elements = clashing_objects
 
-        all_clashing_objects = [ref_id] + [element_id for element_id in  latest_elements]
+def detect_and_report_clashes(
+        reference_elements: Union[list[Element], PackedModel],
+        latest_elements: Optional[Union[list[Element], PackedModel]],
+        tolerance: float,
+        automate_context: AutomationContext,
+        mode: ClashMode = ClashMode.HARD,
+        require_volume: bool = False,
+        touching: bool = False,
+        result_store: Optional[ClashResultStore] = None,
+        scope: str = "",
+        category: str = "Clash",
+        max_reported_groups: Optional[int] = DEFAULT_MAX_REPORTED_GROUPS,
+        group_distance: float = 0.0,
+) -> list[tuple[str, str]]:
 
-        automate_context.attach_error_to_objects(
-            category="Clash", object_ids=all_clashing_objects, message=str(group_number)
+    # Placements of one definition share its id, so clashes are detected, located
+    # and grouped by placement key and only reported by object id.
+    reference_model, latest_model, object_ids = _keyed_by_placement(
+        reference_elements, latest_elements
+    )
+
+    # Without latest elements the reference elements are clashed among themselves.
+    if result_store is not None:
+        clashes = _detect_keyed_clashes_incremental(
+            reference_model,
+            latest_model,
+            tolerance,
+            result_store,
+            scope,
+            mode,
+            require_volume,
+            touching,
+        )
+    elif latest_model is None:
+        clashes = detect_self_clashes(
+            reference_model, tolerance, mode, require_volume=require_volume, touching=touching
+        )
+    else:
+        clashes = detect_clashes(
+            reference_model,
+            latest_model,
+            tolerance,
+            mode,
+            require_volume=require_volume,
+            touching=touching,
         )
 
-    return clashes
+    # Clashes sharing an element are reported as one group, and so are clashes
+    # closer than `group_distance` to each other.
+    locations = None
+    if group_distance > 0:
+        located = reference_model if latest_model is None else latest_model
+        locations = clash_locations(
+            clashes, reference_model.ids, reference_model.bounds, located.ids, located.bounds
+        )
+    report_clashes(
+        clashes,
+        automate_context,
+        category,
+        max_reported_groups,
+        locations,
+        group_distance,
+        object_ids,
+    )
+    return _clashes_by_id(clashes, object_ids, latest_model is None)
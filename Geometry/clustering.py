@@ -0,0 +1,123 @@
+"""Clustering of clash pairs into connected groups of elements."""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from Geometry.broad_phase import self_overlapping_pairs
+
+ClashGroup = List[Tuple[str, str]]
+
+
+class UnionFind:
+    def __init__(self, size: int):
+        """
+        Initialize a UnionFind over the integers 0 to `size` - 1, each its own set.
+
+        Sets are merged by size and paths are halved on lookup, so a sequence of
+        operations runs in near-linear time.
+
+        Args:
+        size (int): Number of items.
+        """
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, item: int) -> int:
+        """The representative of the set holding `item`."""
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, first: int, second: int) -> int:
+        """Merge the sets of two items and return the representative of the result."""
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return first
+        if self.size[first] < self.size[second]:
+            first, second = second, first
+        self.parent[second] = first
+        self.size[first] += self.size[second]
+        return first
+
+
+def clash_locations(
+    clashes: List[Tuple[str, str]],
+    reference_ids: Sequence[str],
+    reference_bounds: np.ndarray,
+    latest_ids: Sequence[str],
+    latest_bounds: np.ndarray,
+) -> np.ndarray:
+    """
+    Locate every clash at the centre of the overlap of its two elements' bounds.
+
+    Elements are looked up by id, so placements of one definition need distinct
+    ids, such as `PackedModel.placement_keys`.
+
+    Returns:
+        np.ndarray: (K, 3) clash locations, in the order of `clashes`.
+    """
+    if not clashes:
+        return np.empty((0, 3))
+    reference_index = {object_id: index for index, object_id in enumerate(reference_ids)}
+    latest_index = {object_id: index for index, object_id in enumerate(latest_ids)}
+    reference = reference_bounds[[reference_index[ref_id] for ref_id, _ in clashes]]
+    latest = latest_bounds[[latest_index[latest_id] for _, latest_id in clashes]]
+    lower = np.maximum(reference[:, 0], latest[:, 0])
+    upper = np.minimum(reference[:, 1], latest[:, 1])
+    return (lower + upper) / 2
+
+
+def cluster_clashes(
+    clashes: List[Tuple[str, str]],
+    locations: Optional[np.ndarray] = None,
+    merge_distance: float = 0.0,
+) -> List[ClashGroup]:
+    """
+    Group clashes into the connected components of the clash graph.
+
+    Elements are the nodes and every clash is an edge, so a duct crossing ten beams
+    forms one group with all of them instead of appearing in ten groups. Nodes are
+    told apart by id only: placements of one definition must be given distinct
+    ids, such as `PackedModel.placement_keys`, or they join unrelated clashes. With
+    `locations`, groups whose clashes lie within `merge_distance` of each other along
+    every axis are merged as well; these close pairs are found by sweeping boxes of
+    that size around the locations.
+
+    Args:
+        clashes (List[Tuple[str, str]]): (reference id, latest id) pairs.
+        locations (Optional[np.ndarray]): (K, 3) location of every clash, see
+            `clash_locations`.
+        merge_distance (float): Clashes closer than this are grouped. Only used with
+            `locations`.
+
+    Returns:
+        List[ClashGroup]: The clashes of every group, groups and clashes in the order
+            of their first clash.
+    """
+    codes: Dict[str, int] = {}
+    edges = [
+        (codes.setdefault(ref_id, len(codes)), codes.setdefault(latest_id, len(codes)))
+        for ref_id, latest_id in clashes
+    ]
+
+    components = UnionFind(len(codes))
+    for first, second in edges:
+        components.union(first, second)
+
+    if locations is not None and merge_distance > 0 and len(clashes) > 1:
+        half = merge_distance / 2
+        boxes = np.stack([locations - half, locations + half], axis=1)
+        for first, second in self_overlapping_pairs(boxes).tolist():
+            components.union(edges[first][0], edges[second][0])
+
+    groups: Dict[int, ClashGroup] = {}
+    for clash, (first, _) in zip(clashes, edges):
+        groups.setdefault(components.find(first), []).append(clash)
+    return list(groups.values())
+
+
+def group_objects(group: ClashGroup) -> List[str]:
+    """The distinct elements of a group, in order of appearance."""
+    return list(dict.fromkeys(object_id for clash in group for object_id in clash))
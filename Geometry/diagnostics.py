@@ -0,0 +1,166 @@
+"""Per-pair cost sampling of the narrow phase, to find the pairs that stall the pool."""
+import heapq
+import math
+from collections import Counter
+from typing import List, NamedTuple, Optional, Sequence
+
+DEFAULT_HOT_PAIR_COUNT = 10
+
+# Histogram columns are decades of pair time, the first one holding everything
+# faster than 10 ** (FASTEST_TIME_DECADE + 1) seconds.
+FASTEST_TIME_DECADE = -5
+
+
+class PairSample(NamedTuple):
+    """Cost and outcome of checking one element pair. Samples order by time."""
+
+    seconds: float
+    ref_index: int
+    latest_index: int
+    triangles: int  # of both elements together
+    boolean_seconds: float  # spent in pymesh booleans, if the mode runs them
+    clash: bool
+
+
+def triangle_decade(triangles: int) -> int:
+    """Histogram row of a triangle count: 0 for 0-9 triangles, 1 for 10-99 and so on."""
+    return len(str(max(triangles, 0))) - 1
+
+
+def time_decade(seconds: float) -> int:
+    """Histogram column of a pair time, see `FASTEST_TIME_DECADE`."""
+    if seconds <= 0:
+        return FASTEST_TIME_DECADE
+    return max(math.floor(math.log10(seconds)), FASTEST_TIME_DECADE)
+
+
+def _time_label(decade: int) -> str:
+    """Upper limit of a histogram column, such as "<10ms"."""
+    limit = 10.0 ** (decade + 1)
+    if limit < 1e-3:
+        return f"<{limit * 1e6:g}us"
+    if limit < 1:
+        return f"<{limit * 1e3:g}ms"
+    return f"<{limit:g}s"
+
+
+def _pair_names(
+    sample: PairSample,
+    reference_ids: Optional[Sequence[str]],
+    latest_ids: Optional[Sequence[str]],
+) -> tuple:
+    """The ids of the elements of a pair, or their indices when no ids are given."""
+    return (
+        reference_ids[sample.ref_index] if reference_ids else sample.ref_index,
+        latest_ids[sample.latest_index] if latest_ids else sample.latest_index,
+    )
+
+
+class PairProfile:
+    def __init__(self, top_count: int = DEFAULT_HOT_PAIR_COUNT):
+        """
+        Collect the cost of the pairs checked in the narrow phase.
+
+        Every pair goes into a histogram of triangle count against time, and only the
+        `top_count` slowest pairs are kept in full, so a worker sends back a profile
+        of constant size however many pairs its batch holds.
+
+        Args:
+        top_count (int): Number of slowest pairs to keep.
+        """
+        self.top_count = top_count
+        self.slowest: List[PairSample] = []  # min-heap on time
+        self.histogram: Counter = Counter()  # (triangle decade, time decade) -> pairs
+        self.pair_count = 0
+        self.seconds = 0.0
+        self.boolean_seconds = 0.0
+
+    def record(self, sample: PairSample) -> None:
+        self.pair_count += 1
+        self.seconds += sample.seconds
+        self.boolean_seconds += sample.boolean_seconds
+        self.histogram[triangle_decade(sample.triangles), time_decade(sample.seconds)] += 1
+        self._keep(sample)
+
+    def merge(self, other: "PairProfile") -> None:
+        """Add the pairs of another profile, such as one batch of a worker."""
+        self.pair_count += other.pair_count
+        self.seconds += other.seconds
+        self.boolean_seconds += other.boolean_seconds
+        self.histogram.update(other.histogram)
+        for sample in other.slowest:
+            self._keep(sample)
+
+    def _keep(self, sample: PairSample) -> None:
+        """Keep `sample` if it is among the `top_count` slowest seen so far."""
+        if len(self.slowest) < self.top_count:
+            heapq.heappush(self.slowest, sample)
+        elif sample > self.slowest[0]:
+            heapq.heapreplace(self.slowest, sample)
+
+    def hot_pairs(self) -> List[PairSample]:
+        """The slowest pairs, slowest first."""
+        return sorted(self.slowest, reverse=True)
+
+    def report(
+        self,
+        reference_ids: Optional[Sequence[str]] = None,
+        latest_ids: Optional[Sequence[str]] = None,
+    ) -> str:
+        """Describe the slowest pairs and the histogram, naming elements by id if given."""
+        if not self.pair_count:
+            return "Pair costs: no pairs checked."
+
+        lines = [
+            f"Pair costs: {self.pair_count} pairs in {self.seconds:.3f}s, "
+            f"{self.boolean_seconds:.3f}s of them in booleans. Slowest pairs:"
+        ]
+        for sample in self.hot_pairs():
+            ref, latest = _pair_names(sample, reference_ids, latest_ids)
+            lines.append(
+                f"  {sample.seconds:.4f}s {ref} x {latest}: {sample.triangles} triangles, "
+                f"boolean {sample.boolean_seconds:.4f}s, "
+                f"{'clash' if sample.clash else 'no clash'}"
+            )
+
+        rows = sorted({row for row, _ in self.histogram})
+        columns = range(FASTEST_TIME_DECADE, max(column for _, column in self.histogram) + 1)
+        lines.append(
+            "  triangles " + " ".join(f"{_time_label(column):>8}" for column in columns)
+        )
+        for row in rows:
+            lines.append(
+                f"  {'>=' + str(10 ** row) if row else '<10':>9} "
+                + " ".join(f"{self.histogram[row, column]:>8}" for column in columns)
+            )
+        return "\n".join(lines)
+
+    def to_dict(
+        self,
+        reference_ids: Optional[Sequence[str]] = None,
+        latest_ids: Optional[Sequence[str]] = None,
+    ) -> dict:
+        slowest = []
+        for sample in self.hot_pairs():
+            ref, latest = _pair_names(sample, reference_ids, latest_ids)
+            slowest.append(
+                {
+                    "reference": ref,
+                    "latest": latest,
+                    "seconds": round(sample.seconds, 6),
+                    "triangles": sample.triangles,
+                    "boolean_seconds": round(sample.boolean_seconds, 6),
+                    "clash": sample.clash,
+                }
+            )
+        return {
+            "pairs": self.pair_count,
+            "seconds": round(self.seconds, 6),
+            "boolean_seconds": round(self.boolean_seconds, 6),
+            "slowest_pairs": slowest,
+            # Rows are decades of the triangle count, columns decades of seconds.
+            "histogram": [
+                {"triangle_decade": row, "time_decade": column, "pairs": pairs}
+                for (row, column), pairs in sorted(self.histogram.items())
+            ],
+        }
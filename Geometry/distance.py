@@ -0,0 +1,203 @@
+"""Vectorized distance queries between batches of triangles."""
+import numpy as np
+
+# Squared lengths and determinants below this are treated as degenerate.
+DISTANCE_EPSILON = 1e-12
+
+# Vertex index pairs of the three edges of a triangle.
+TRIANGLE_EDGES = ((0, 1), (1, 2), (2, 0))
+
+
+def _dot(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.einsum("...k,...k->...", a, b)
+
+
+def point_segment_distance(
+    points: np.ndarray, starts: np.ndarray, ends: np.ndarray
+) -> np.ndarray:
+    """
+    Distance from each point to the matching segment.
+
+    Args:
+        points (np.ndarray): (K, 3) points.
+        starts (np.ndarray): (K, 3) segment start points.
+        ends (np.ndarray): (K, 3) segment end points.
+
+    Returns:
+        np.ndarray: (K,) distances.
+    """
+    direction = ends - starts
+    length_squared = _dot(direction, direction)
+    t = np.divide(
+        _dot(points - starts, direction),
+        length_squared,
+        out=np.zeros_like(length_squared),
+        where=length_squared > DISTANCE_EPSILON,
+    )
+    closest = starts + np.clip(t, 0.0, 1.0)[..., None] * direction
+    return np.linalg.norm(points - closest, axis=-1)
+
+
+def point_triangle_distance(points: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+    """
+    Distance from each point to the matching triangle.
+
+    A point whose projection falls inside the triangle is as far away as the
+    triangle's plane; otherwise the closest point lies on one of the edges.
+
+    Args:
+        points (np.ndarray): (K, 3) points.
+        triangles (np.ndarray): (K, 3, 3) triangle vertices.
+
+    Returns:
+        np.ndarray: (K,) distances.
+    """
+    v0, v1, v2 = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+    normal = np.cross(v1 - v0, v2 - v0)
+    normal_squared = _dot(normal, normal)
+    valid = normal_squared > DISTANCE_EPSILON
+
+    # Signed edge tests against the normal tell whether the projection is inside.
+    inside = valid.copy()
+    for a, b in ((v0, v1), (v1, v2), (v2, v0)):
+        inside &= _dot(np.cross(b - a, points - a), normal) >= 0
+
+    plane_distance = np.abs(
+        np.divide(
+            _dot(points - v0, normal),
+            np.sqrt(normal_squared),
+            out=np.zeros_like(normal_squared),
+            where=valid,
+        )
+    )
+    edge_distance = np.minimum.reduce(
+        [point_segment_distance(points, a, b) for a, b in ((v0, v1), (v1, v2), (v2, v0))]
+    )
+    return np.where(inside, plane_distance, edge_distance)
+
+
+def segment_segment_distance(
+    p1: np.ndarray, q1: np.ndarray, p2: np.ndarray, q2: np.ndarray
+) -> np.ndarray:
+    """
+    Distance between each pair of segments p1-q1 and p2-q2.
+
+    Follows the clamped closest-point construction from Ericson, Real-Time
+    Collision Detection, section 5.1.9, with the degenerate cases resolved by masks.
+
+    Returns:
+        np.ndarray: (K,) distances.
+    """
+    d1, d2, r = q1 - p1, q2 - p2, p1 - p2
+    a, e, f = _dot(d1, d1), _dot(d2, d2), _dot(d2, r)
+    c, b = _dot(d1, r), _dot(d1, d2)
+    denominator = a * e - b * b
+
+    a_valid = a > DISTANCE_EPSILON
+    e_valid = e > DISTANCE_EPSILON
+
+    s = np.where(
+        denominator > DISTANCE_EPSILON,
+        np.clip(
+            np.divide(
+                b * f - c * e,
+                denominator,
+                out=np.zeros_like(a),
+                where=denominator > DISTANCE_EPSILON,
+            ),
+            0.0,
+            1.0,
+        ),
+        0.0,
+    )
+    t = np.divide(b * s + f, e, out=np.zeros_like(a), where=e_valid)
+
+    below, above = t < 0.0, t > 1.0
+    s = np.where(
+        below,
+        np.clip(np.divide(-c, a, out=np.zeros_like(a), where=a_valid), 0.0, 1.0),
+        s,
+    )
+    s = np.where(
+        above,
+        np.clip(np.divide(b - c, a, out=np.zeros_like(a), where=a_valid), 0.0, 1.0),
+        s,
+    )
+    t = np.clip(t, 0.0, 1.0)
+
+    # A first segment that is a point is closest to the clamped projection on the other.
+    s = np.where(a_valid, s, 0.0)
+    t = np.where(
+        a_valid, t, np.clip(np.divide(f, e, out=np.zeros_like(a), where=e_valid), 0.0, 1.0)
+    )
+
+    closest_1 = p1 + s[..., None] * d1
+    closest_2 = p2 + t[..., None] * d2
+    return np.linalg.norm(closest_1 - closest_2, axis=-1)
+
+
+def segment_triangle_intersect(
+    starts: np.ndarray, ends: np.ndarray, triangles: np.ndarray
+) -> np.ndarray:
+    """
+    Test whether each segment crosses the matching triangle (Möller-Trumbore).
+
+    Args:
+        starts (np.ndarray): (K, 3) segment start points.
+        ends (np.ndarray): (K, 3) segment end points.
+        triangles (np.ndarray): (K, 3, 3) triangle vertices.
+
+    Returns:
+        np.ndarray: (K,) booleans.
+    """
+    v0, v1, v2 = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+    direction = ends - starts
+    edge_1, edge_2 = v1 - v0, v2 - v0
+
+    h = np.cross(direction, edge_2)
+    determinant = _dot(edge_1, h)
+    valid = np.abs(determinant) > DISTANCE_EPSILON
+    inverse = np.divide(1.0, determinant, out=np.zeros_like(determinant), where=valid)
+
+    offset = starts - v0
+    u = inverse * _dot(offset, h)
+    q = np.cross(offset, edge_1)
+    v = inverse * _dot(direction, q)
+    t = inverse * _dot(edge_2, q)
+
+    return valid & (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= 0) & (t <= 1)
+
+
+def triangle_distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Minimum distance between each pair of triangles.
+
+    Two triangles that do not intersect are closest either between a vertex and the
+    other triangle or between two edges. Intersecting triangles are at distance 0,
+    which is detected by an edge of one crossing the other.
+
+    Args:
+        a (np.ndarray): (K, 3, 3) first triangles.
+        b (np.ndarray): (K, 3, 3) second triangles.
+
+    Returns:
+        np.ndarray: (K,) distances.
+    """
+    if len(a) == 0:
+        return np.empty(0)
+
+    candidates = [point_triangle_distance(a[:, i], b) for i in range(3)]
+    candidates += [point_triangle_distance(b[:, i], a) for i in range(3)]
+    candidates += [
+        segment_segment_distance(a[:, i], a[:, j], b[:, k], b[:, m])
+        for i, j in TRIANGLE_EDGES
+        for k, m in TRIANGLE_EDGES
+    ]
+    distance = np.minimum.reduce(candidates)
+
+    crossing = np.zeros(len(a), dtype=bool)
+    for first, second in ((a, b), (b, a)):
+        for i, j in TRIANGLE_EDGES:
+            crossing |= segment_triangle_intersect(first[:, i], first[:, j], second)
+
+    return np.where(crossing, 0.0, distance)
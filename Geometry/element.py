@@ -1,49 +1,162 @@
-from typing import Tuple, Optional, List
+from typing import Dict, Tuple, Optional, List, Union
 
 import numpy as np
 import trimesh
-from specklepy.objects import Base
 from specklepy.objects.geometry import Mesh as SpeckleMesh
-from specklepy.objects.other import Transform
+from specklepy.objects.units import Units, get_scale_factor_from_string
 
-from Geometry.helpers import combine_transform_matrices
+from Geometry.helpers import combine_transform_matrices, transform_bounds
 from Geometry.mesh import speckle_mesh_to_trimesh
 
 
+EMPTY_BOUNDS = np.array([[np.inf, np.inf, np.inf], [-np.inf, -np.inf, -np.inf]])
+
+
 class Element:
-    def __init__(self, id, meshes):
+    def __init__(self, id, meshes, units=None, transforms=None, group=None):
         """
         Initialize an Element object with an ID and a list of meshes.
 
+        The bounds of every mesh and of the element as a whole are computed once
+        here, so the broad phase never has to touch the mesh objects.
+
+        Meshes of block instances are shared between all placements of their
+        definition and stay in definition coordinates; `transforms` places them.
+
         Args:
         id (str): The ID of the Element.
         meshes (List[Trimesh]): List of trimesh Mesh objects.
+        units (Optional[str]): Units of the mesh coordinates, if known.
+        transforms (Optional[np.ndarray]): (M, 4, 4) placement of each mesh,
+            identity when not given.
+        group (Optional[str]): Id of the block instance the element is part of.
+            Elements of one instance are never clashed against each other.
         """
         self.id = id
         self.meshes = meshes
+        self.units = units
+        self.group = group
+        self.transforms = (
+            np.asarray(transforms, dtype=float).reshape(-1, 4, 4)
+            if transforms is not None
+            else np.broadcast_to(np.identity(4), (len(meshes), 4, 4))
+        )
+        self.mesh_bounds = mesh_bounds(meshes, self.transforms)
+        self.bounds = combine_bounds(self.mesh_bounds)
+
+    def transformed_meshes(self) -> List[trimesh.Trimesh]:
+        """Copies of the meshes moved to their placement, for whole-mesh operations."""
+        return [
+            mesh.copy().apply_transform(transform)
+            for mesh, transform in zip(self.meshes, self.transforms)
+        ]
+
+
+def mesh_bounds(
+    meshes: List[trimesh.Trimesh], transforms: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Pack the axis-aligned bounds of a list of meshes.
+
+    Args:
+        meshes (List[Trimesh]): The meshes to measure.
+        transforms (Optional[np.ndarray]): (M, 4, 4) placement of each mesh. The
+            placed bounds are derived from the local ones, not from the vertices.
+
+    Returns:
+        np.ndarray: A (M, 2, 3) array of min and max corners, one row per mesh.
+    """
+    if not meshes:
+        return np.empty((0, 2, 3))
+    bounds = np.array([mesh.bounds for mesh in meshes], dtype=float)
+    if transforms is None:
+        return bounds
+    return transform_bounds(bounds, transforms)
+
+
+def combine_bounds(bounds: np.ndarray) -> np.ndarray:
+    """
+    Combine packed (M, 2, 3) bounds into a single (2, 3) box.
+
+    An empty input yields an inverted box that never overlaps anything.
+    """
+    if len(bounds) == 0:
+        return EMPTY_BOUNDS.copy()
+    return np.array([bounds[:, 0].min(axis=0), bounds[:, 1].max(axis=0)])
+
+
+def pack_bounds(elements: List[Element]) -> np.ndarray:
+    """
+    Pack the bounds of a model's elements into one (N, 2, 3) array.
+
+    Args:
+        elements (List[Element]): The elements of one model.
+
+    Returns:
+        np.ndarray: The element bounds, in the same order as the elements.
+    """
+    if not elements:
+        return np.empty((0, 2, 3))
+    return np.stack([element.bounds for element in elements])
+
+
+def convert_length(
+    value: float, from_units: Union[str, Units], to_units: Optional[Union[str, Units]]
+) -> float:
+    """
+    Convert a length such as a clearance tolerance into the units of a model.
+
+    Args:
+        value (float): The length to convert.
+        from_units (Union[str, Units]): Units of `value`.
+        to_units (Optional[Union[str, Units]]): Target units. When unknown the value
+            is returned unchanged.
+
+    Returns:
+        float: The length in `to_units`.
+    """
+    if not to_units:
+        return value
+    return value * get_scale_factor_from_string(
+        getattr(from_units, "value", from_units), getattr(to_units, "value", to_units)
+    )
+
+
+def model_units(elements: List[Element]) -> Optional[str]:
+    """Return the units of the first element that declares any."""
+    return next((element.units for element in elements if element.units), None)
 
 
 def speckle_to_element(
-    base_id_transforms: Tuple[Base, str, Optional[List[Transform]]]
+    base_id_transforms: Tuple,
+    geometry_cache: Optional[Dict[str, trimesh.Trimesh]] = None,
 ) -> Element:
     """
     Convert a SpecklePy Base object, its identifier, and an optional list of transforms
     to an Element object.
 
+    Meshes are kept in their own coordinates and placed by the combined transform,
+    so every placement of a block definition can share one converted mesh.
+
     Args:
         base_id_transforms (tuple): Contains a SpecklePy Base object, its identifier,
-            and an optional list of Transform objects.
+            an optional list of Transform objects and, optionally, the id of the
+            instance group it belongs to.
+        geometry_cache (Optional[Dict[str, Trimesh]]): Converted meshes by Speckle
+            mesh id, shared across calls so repeated definitions convert once.
 
     Returns:
         Element: The resulting Element object.
     """
-    base, speckle_id, transforms = base_id_transforms
+    base, speckle_id, transforms, *group = base_id_transforms
 
     display_value = base.displayValue
     if isinstance(display_value, SpeckleMesh):
         display_value = [display_value]
 
-    element = Element(speckle_id, meshes=[])
+    meshes = []
+    units = None
+    geometry_cache = {} if geometry_cache is None else geometry_cache
 
     # Combine all transforms into a single matrix
     combined_transform = (
@@ -53,12 +166,22 @@ def speckle_to_element(
     if isinstance(display_value, list):
         for mesh in display_value:
             if mesh:
-                t_mesh = speckle_mesh_to_trimesh(mesh)
+                mesh_id = getattr(mesh, "id", None)
+                t_mesh = geometry_cache.get(mesh_id) if mesh_id else None
+                if t_mesh is None:
+                    t_mesh = speckle_mesh_to_trimesh(mesh)
+                    if mesh_id:
+                        geometry_cache[mesh_id] = t_mesh
                 if not isinstance(t_mesh, trimesh.Trimesh):
                     continue
 
-                # Apply the combined transformation matrix
-                t_mesh.apply_transform(combined_transform)
-                element.meshes.append(t_mesh)
+                meshes.append(t_mesh)
+                units = units or getattr(mesh, "units", None)
 
-    return element
+    return Element(
+        speckle_id,
+        meshes=meshes,
+        units=units,
+        transforms=[combined_transform] * len(meshes),
+        group=group[0] if group else None,
+    )
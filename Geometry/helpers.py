@@ -1,116 +1,155 @@
 from typing import List
 
 import numpy as np
-from specklepy.objects.geometry import Vector
 from specklepy.objects.other import Transform as SpeckleTransform
 
+# Twice the signed area below which an ear is treated as degenerate.
+EAR_EPSILON = 1e-12
 
-def calculate_polygon_normal(vertices: List[Vector]) -> Vector:
+
+def polygon_normals(polygons: np.ndarray) -> np.ndarray:
     """
-    Calculate the normal vector for a polygon represented by a list of vertices.
+    Calculate the unit normal of each polygon with Newell's method.
 
     Args:
-        vertices (List[Vector]): A list of vertices representing the polygon.
+        polygons (np.ndarray): (M, N, 3) vertices of M polygons with N vertices each.
 
     Returns:
-        Vector: The normal vector of the polygon.
-    """
-    normal = Vector.from_list([0.0, 0.0, 0.0])
-    num_vertices = len(vertices)
-    for i in range(num_vertices):
-        curr, nxt = vertices[i], vertices[(i + 1) % num_vertices]
-        # Cross product components are accumulated to find the normal.
-        normal.x += (curr.y - nxt.y) * (curr.z + nxt.z)
-        normal.y += (curr.z - nxt.z) * (curr.x + nxt.x)
-        normal.z += (curr.x - nxt.x) * (curr.y + nxt.y)
-
-    # Normalize the calculated normal vector.
-    length = np.sqrt(normal.x**2 + normal.y**2 + normal.z**2)
-    normal.x, normal.y, normal.z = (
-        normal.x / length,
-        normal.y / length,
-        normal.z / length,
-    )
-    return normal
+        np.ndarray: (M, 3) normals, following the winding of each polygon.
+    """
+    # Summing the cross products of consecutive vertices is Newell's formula.
+    normal = np.cross(polygons, np.roll(polygons, -1, axis=1)).sum(axis=1)
+    length = np.linalg.norm(normal, axis=1, keepdims=True)
+    return np.divide(normal, length, out=np.zeros_like(normal), where=length > 0)
 
 
-def is_point_within_triangle(pt: Vector, v1: Vector, v2: Vector, v3: Vector) -> bool:
+def project_polygons(polygons: np.ndarray) -> np.ndarray:
     """
-    Check if a point is inside a given triangle.
+    Project each polygon onto its own plane, once.
+
+    The 2D frame is right-handed about the polygon normal, so every projected
+    polygon is wound counter-clockwise.
 
     Args:
-        pt (Vector): The point to check.
-        v1, v2, v3 (Vector): The vertices of the triangle.
+        polygons (np.ndarray): (M, N, 3) polygon vertices.
 
     Returns:
-        bool: True if the point is inside the triangle, False otherwise.
+        np.ndarray: (M, N, 2) planar coordinates.
     """
+    normals = polygon_normals(polygons)
 
-    def sign(p1, p2, p3):
-        return (p1.x - p3.x) * (p2.y - p3.y) - (p2.x - p3.x) * (p1.y - p3.y)
+    # Build the in-plane axes from the world axis least aligned with the normal.
+    helper = np.eye(3)[np.argmin(np.abs(normals), axis=1)]
+    u = np.cross(normals, helper)
+    u /= np.maximum(np.linalg.norm(u, axis=1, keepdims=True), EAR_EPSILON)
+    v = np.cross(normals, u)
+
+    return np.stack(
+        [np.einsum("mnk,mk->mn", polygons, u), np.einsum("mnk,mk->mn", polygons, v)],
+        axis=2,
+    )
 
-    b1 = sign(pt, v1, v2) < 0.0
-    b2 = sign(pt, v2, v3) < 0.0
-    b3 = sign(pt, v3, v1) < 0.0
 
-    return (b1 == b2) and (b2 == b3)
+def _cross_2d(o: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Twice the signed area of the triangles (o, a, b), over the last axis."""
+    oa = a - o
+    ob = b - o
+    return oa[..., 0] * ob[..., 1] - oa[..., 1] * ob[..., 0]
 
 
-def triangulate_face(vertices: List[Vector]) -> List[List[int]]:
+def triangulate_polygons(polygons: np.ndarray) -> np.ndarray:
     """
-    Triangulate a polygon defined by a list of vertices.
+    Triangulate a batch of simple polygons with the same vertex count by ear clipping.
+
+    Every polygon keeps a doubly linked ring of its remaining vertices and a cursor.
+    Each step tests the ear at the cursor of all unfinished polygons at once: the
+    corner must be convex and no other remaining vertex may lie inside the ear. A
+    valid ear is clipped and the cursor steps back to its neighbour; otherwise the
+    cursor moves on, so the scan never restarts from the first vertex. A polygon
+    that completes a full lap without a valid ear (degenerate or self-intersecting
+    input) clips its current corner anyway, which guarantees termination.
 
     Args:
-        vertices (List[Vector]): The vertices of the polygon.
+        polygons (np.ndarray): (M, N, 3) vertices of M polygons with N vertices each.
 
     Returns:
-        List[List[int]]: A list of triangles, each represented as a list of vertex indices.
-    """
-    triangles = []
-    indices = list(range(len(vertices)))
-    normal = calculate_polygon_normal(vertices)
-
-    # The ear clipping algorithm is used for triangulation.
-    while len(indices) > 2:
-        for i in range(len(indices)):
-            prev, curr, nxt = (
-                indices[i - 1],
-                indices[i],
-                indices[(i + 1) % len(indices)],
-            )
-            if is_convex(vertices[prev], vertices[curr], vertices[nxt], normal):
-                triangles.append([prev, curr, nxt])
-                del indices[i]
-                break
-
+        np.ndarray: (M, N - 2, 3) triangles as vertex indices local to each polygon.
+    """
+    count, size = polygons.shape[:2]
+    if size < 3:
+        return np.empty((count, 0, 3), dtype=np.int64)
+
+    points = project_polygons(polygons)
+    rows = np.arange(count)
+
+    prev = np.tile(np.roll(np.arange(size), 1), (count, 1))
+    nxt = np.tile(np.roll(np.arange(size), -1), (count, 1))
+    alive = np.ones((count, size), dtype=bool)
+    cursor = np.zeros(count, dtype=np.int64)
+    remaining = np.full(count, size)
+    misses = np.zeros(count, dtype=np.int64)
+
+    triangles = np.zeros((count, size - 2, 3), dtype=np.int64)
+    clipped = np.zeros(count, dtype=np.int64)
+
+    while True:
+        active = np.flatnonzero(remaining > 3)
+        if len(active) == 0:
+            break
+
+        b = cursor[active]
+        a = prev[active, b]
+        c = nxt[active, b]
+        pa, pb, pc = (points[active, idx] for idx in (a, b, c))
+
+        convex = _cross_2d(pa, pb, pc) > EAR_EPSILON
+
+        # Any remaining vertex other than the corners inside (or on) the ear blocks it.
+        others = points[active]
+        inside = (
+            (_cross_2d(pa[:, None], pb[:, None], others) >= 0)
+            & (_cross_2d(pb[:, None], pc[:, None], others) >= 0)
+            & (_cross_2d(pc[:, None], pa[:, None], others) >= 0)
+        )
+        candidates = alive[active].copy()
+        local = np.arange(len(active))
+        candidates[local, a] = candidates[local, b] = candidates[local, c] = False
+        blocked = np.any(inside & candidates, axis=1)
+
+        clip = (convex & ~blocked) | (misses[active] >= remaining[active])
+        skip = ~clip
+
+        cut = active[clip]
+        a_cut, b_cut, c_cut = a[clip], b[clip], c[clip]
+        triangles[cut, clipped[cut]] = np.stack([a_cut, b_cut, c_cut], axis=1)
+        clipped[cut] += 1
+        nxt[cut, a_cut] = c_cut
+        prev[cut, c_cut] = a_cut
+        alive[cut, b_cut] = False
+        remaining[cut] -= 1
+        cursor[cut] = a_cut
+        misses[cut] = 0
+
+        moved = active[skip]
+        cursor[moved] = c[skip]
+        misses[moved] += 1
+
+    b = cursor
+    triangles[rows, clipped] = np.stack([prev[rows, b], b, nxt[rows, b]], axis=1)
     return triangles
 
 
-def is_convex(a: Vector, b: Vector, c: Vector, normal: Vector) -> bool:
+def triangulate_face(vertices: np.ndarray) -> np.ndarray:
     """
-    Check if a triangle formed by three vertices (a, b, c) is convex with respect to a given normal.
+    Triangulate a single polygon defined by its vertices.
 
     Args:
-        a (Vector): The first vertex of the triangle.
-        b (Vector): The second vertex of the triangle.
-        c (Vector): The third vertex of the triangle.
-        normal (Vector): The normal vector with respect to which convexity is checked.
+        vertices (np.ndarray): (N, 3) vertices of the polygon.
 
     Returns:
-        bool: True if the triangle is convex with respect to the normal, False otherwise.
-    """
-    ab = Vector.from_list([b.x - a.x, b.y - a.y, b.z - a.z])
-    bc = Vector.from_list([c.x - b.x, c.y - b.y, c.z - b.z])
-    cross = Vector.from_list(
-        [
-            ab.y * bc.z - ab.z * bc.y,
-            ab.z * bc.x - ab.x * bc.z,
-            ab.x * bc.y - ab.y * bc.x,
-        ]
-    )
-
-    # Dot product to compare with the face normal
-    return cross.x * normal.x + cross.y * normal.y + cross.z * normal.z > 0
+        np.ndarray: (N - 2, 3) triangles, each as indices into `vertices`.
+    """
+    return triangulate_polygons(np.asarray(vertices, dtype=float)[None])[0]
 
 
 def combine_transform_matrices(transforms: List[SpeckleTransform]) -> np.ndarray:
@@ -141,3 +180,41 @@ def convert_speckle_transform_to_matrix(transform: SpeckleTransform) -> np.ndarr
         np.ndarray: A 4x4 transformation matrix.
     """
     return np.array(transform.value).reshape(4, 4)
+
+
+def transform_points(points: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    Apply a 4x4 affine transformation to (N, 3) points.
+
+    Args:
+        points (np.ndarray): The points to transform.
+        matrix (np.ndarray): A 4x4 transformation matrix.
+
+    Returns:
+        np.ndarray: The transformed (N, 3) points.
+    """
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+def transform_bounds(bounds: np.ndarray, matrices: np.ndarray) -> np.ndarray:
+    """
+    Bound transformed axis-aligned boxes without transforming any vertices.
+
+    The centre of each box is transformed and its half extents are projected onto
+    the world axes through the absolute linear part of the matrix (Arvo's method),
+    which gives the tightest box around the transformed box.
+
+    Args:
+        bounds (np.ndarray): (M, 2, 3) min and max corners in local coordinates.
+        matrices (np.ndarray): (M, 4, 4) transformation matrices.
+
+    Returns:
+        np.ndarray: (M, 2, 3) bounds in world coordinates.
+    """
+    centres = (bounds[:, 0] + bounds[:, 1]) / 2
+    halves = (bounds[:, 1] - bounds[:, 0]) / 2
+    linear = matrices[:, :3, :3]
+
+    world_centres = np.einsum("mij,mj->mi", linear, centres) + matrices[:, :3, 3]
+    world_halves = np.einsum("mij,mj->mi", np.abs(linear), halves)
+    return np.stack([world_centres - world_halves, world_centres + world_halves], axis=1)
@@ -0,0 +1,290 @@
+"""Yes/no intersection of triangle meshes without building a boolean solid."""
+from typing import Tuple
+
+import numpy as np
+
+from Geometry.bvh import TriangleBVH, candidate_triangle_pairs
+from Geometry.distance import (
+    TRIANGLE_EDGES,
+    point_triangle_distance,
+    segment_triangle_intersect,
+)
+
+# Plane distances below this fraction of the pair's size count as touching.
+INTERSECTION_EPSILON = 1e-9
+
+# Distance of the points probing a contact for overlap, as a fraction of the
+# size of the triangle pair, and the number of contacts probed per mesh pair.
+PROBE_OFFSET = 1e-6
+MAX_CONTACT_PROBES = 16
+
+# Direction of the parity rays of `point_in_mesh`, skewed so it is unlikely to
+# run exactly along the edges and faces of axis-aligned models.
+RAY_DIRECTION = np.array([0.8017, 0.5345, 0.2673])
+
+
+def _dot(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.einsum("...k,...k->...", a, b)
+
+
+def _unit_normals(triangles: np.ndarray) -> np.ndarray:
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    lengths = np.linalg.norm(normals, axis=-1, keepdims=True)
+    return np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+
+
+def _plane_interval(
+    triangles: np.ndarray, plane_distances: np.ndarray, direction: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Interval that each triangle covers on the intersection line of the two planes.
+
+    The line is parameterised by projection onto `direction`. Where an edge
+    changes side of the other plane the crossing point is interpolated from the
+    plane distances; vertices lying on the plane contribute themselves.
+    """
+    projections = np.einsum("kij,kj->ki", triangles, direction)
+    low = np.where(plane_distances == 0, projections, np.inf).min(axis=1)
+    high = np.where(plane_distances == 0, projections, -np.inf).max(axis=1)
+
+    for i, j in TRIANGLE_EDGES:
+        d_i, d_j = plane_distances[:, i], plane_distances[:, j]
+        crosses = d_i * d_j < 0
+        ratio = np.divide(d_i, d_i - d_j, out=np.zeros_like(d_i), where=crosses)
+        point = projections[:, i] + (projections[:, j] - projections[:, i]) * ratio
+        low = np.where(crosses, np.minimum(low, point), low)
+        high = np.where(crosses, np.maximum(high, point), high)
+
+    return low, high
+
+
+def _shared_intervals(a: np.ndarray, b: np.ndarray) -> tuple:
+    """
+    Intervals that pairs of triangles cover on the line where their planes meet.
+
+    Returns:
+        tuple: The unit normals of `a` and `b`, their plane distances to each
+            other, the line directions, the (K,) low and high ends of the interval
+            both triangles cover, and the (K,) tolerance of a pair's overlap.
+    """
+    normal_a, normal_b = _unit_normals(a), _unit_normals(b)
+    size = np.maximum(np.ptp(a, axis=1).max(axis=1), np.ptp(b, axis=1).max(axis=1))
+    epsilon = (INTERSECTION_EPSILON * size)[:, None]
+
+    distances_b = _dot(b - a[:, :1], normal_a[:, None])
+    distances_a = _dot(a - b[:, :1], normal_b[:, None])
+    distances_b[np.abs(distances_b) < epsilon] = 0.0
+    distances_a[np.abs(distances_a) < epsilon] = 0.0
+
+    direction = np.cross(normal_a, normal_b)
+    low_a, high_a = _plane_interval(a, distances_a, direction)
+    low_b, high_b = _plane_interval(b, distances_b, direction)
+
+    tolerance = epsilon[:, 0] * np.linalg.norm(direction, axis=-1)
+    return (
+        normal_a,
+        normal_b,
+        distances_a,
+        distances_b,
+        direction,
+        np.maximum(low_a, low_b),
+        np.minimum(high_a, high_b),
+        tolerance,
+    )
+
+
+def triangle_contacts(a: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Test each pair of triangles for intersection (Möller's interval test).
+
+    A triangle entirely on one side of the other's plane is rejected. Otherwise
+    both cut the line where the two planes meet in an interval, and the
+    triangles meet when those intervals overlap. Coplanar pairs do not meet: two
+    closed meshes that overlap always also meet along non-coplanar triangles.
+
+    Args:
+        a (np.ndarray): (K, 3, 3) first triangles.
+        b (np.ndarray): (K, 3, 3) second triangles.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (K,) booleans telling whether the triangles
+            meet, touching included, and (K,) booleans telling whether they pass
+            through each other. Closed surfaces crossing like that overlap in volume.
+    """
+    if len(a) == 0:
+        return np.zeros(0, dtype=bool), np.zeros(0, dtype=bool)
+
+    _, _, distances_a, distances_b, _, low, high, tolerance = _shared_intervals(a, b)
+    reaches = (
+        (distances_a.max(axis=1) >= 0)
+        & (distances_a.min(axis=1) <= 0)
+        & (distances_b.max(axis=1) >= 0)
+        & (distances_b.min(axis=1) <= 0)
+    )
+    coplanar = np.all(distances_a == 0, axis=1) | np.all(distances_b == 0, axis=1)
+    meets = reaches & ~coplanar & (high - low >= -tolerance)
+
+    straddles = (
+        (distances_a.max(axis=1) > 0)
+        & (distances_a.min(axis=1) < 0)
+        & (distances_b.max(axis=1) > 0)
+        & (distances_b.min(axis=1) < 0)
+    )
+    return meets, meets & straddles & (high - low > tolerance)
+
+
+def triangles_intersect(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Test each pair of triangles for intersection, see `triangle_contacts`.
+
+    Triangles that touch count as intersecting. Coplanar pairs do not.
+
+    Args:
+        a (np.ndarray): (K, 3, 3) first triangles.
+        b (np.ndarray): (K, 3, 3) second triangles.
+
+    Returns:
+        np.ndarray: (K,) booleans.
+    """
+    return triangle_contacts(a, b)[0]
+
+
+def _contact_probes(a: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Points just off the contact of each pair of meeting triangles.
+
+    The middle of the segment both triangles share is moved a little along
+    either normal of both triangles, into the four wedges the two planes form.
+    When the meshes overlap in volume there, one of the four lies inside both.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (K, 4, 3) points and the (K,) distance
+            they were moved by.
+    """
+    normal_a, normal_b, _, _, direction, low, high, _ = _shared_intervals(a, b)
+    cosine = _dot(normal_a, normal_b)
+    offset_a, offset_b = _dot(normal_a, a[:, 0]), _dot(normal_b, b[:, 0])
+    length_squared = _dot(direction, direction)[:, None]
+
+    # A point on both planes, then moved along their shared line to the middle.
+    on_line = (
+        (offset_a - offset_b * cosine)[:, None] * normal_a
+        + (offset_b - offset_a * cosine)[:, None] * normal_b
+    ) / length_squared
+    middle = (low + high) / 2 - _dot(on_line, direction)
+    points = on_line + middle[:, None] * direction / length_squared
+
+    size = np.maximum(np.ptp(a, axis=1).max(axis=1), np.ptp(b, axis=1).max(axis=1))
+    step = PROBE_OFFSET * size
+    signs = np.array([[1, 1], [1, -1], [-1, 1], [-1, -1]], dtype=float)
+    wedges = signs[None, :, :1] * normal_a[:, None] + signs[None, :, 1:] * normal_b[:, None]
+    return points[:, None] + step[:, None, None] * wedges, step
+
+
+def _strictly_inside(point: np.ndarray, mesh: TriangleBVH, clearance: float) -> bool:
+    """Whether a point is inside a mesh and not within `clearance` of its surface."""
+    if not point_in_mesh(point, mesh.triangles):
+        return False
+    points = np.broadcast_to(point, (len(mesh.triangles), 3))
+    return bool(point_triangle_distance(points, mesh.triangles).min() > clearance)
+
+
+def point_in_mesh(point: np.ndarray, triangles: np.ndarray) -> bool:
+    """
+    Test whether a point lies inside a closed mesh by the parity of ray crossings.
+
+    Args:
+        point (np.ndarray): (3,) point.
+        triangles (np.ndarray): (F, 3, 3) triangles of the mesh.
+
+    Returns:
+        bool: True if a ray from the point crosses the surface an odd number of times.
+    """
+    if len(triangles) == 0:
+        return False
+
+    corners = triangles.reshape(-1, 3)
+    reach = np.linalg.norm(corners.max(axis=0) - corners.min(axis=0))
+    reach += np.linalg.norm(point - corners.mean(axis=0))
+    end = point + RAY_DIRECTION / np.linalg.norm(RAY_DIRECTION) * 2 * (reach + 1)
+
+    starts = np.broadcast_to(point, (len(triangles), 3))
+    ends = np.broadcast_to(end, (len(triangles), 3))
+    return bool(np.count_nonzero(segment_triangle_intersect(starts, ends, triangles)) % 2)
+
+
+def _contains(outer: TriangleBVH, inner: TriangleBVH) -> bool:
+    outer_bounds, inner_bounds = outer.node_bounds[0], inner.node_bounds[0]
+    if np.any(inner_bounds[0] < outer_bounds[0]) or np.any(inner_bounds[1] > outer_bounds[1]):
+        return False
+
+    # Without crossings the inner surface is entirely inside or outside, so one
+    # point of it decides. The centroid of its largest triangle is the least
+    # likely to sit on the outer surface where the two merely touch.
+    triangles = inner.triangles
+    areas = np.linalg.norm(
+        np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0]),
+        axis=-1,
+    )
+    point = triangles[int(np.argmax(areas))].mean(axis=0)
+    return point_in_mesh(point, outer.triangles)
+
+
+def meshes_nested(a: TriangleBVH, b: TriangleBVH) -> bool:
+    """
+    Test whether one of two closed meshes lies inside the other.
+
+    Only meaningful once the surfaces are known not to cross: either the whole inner
+    surface is inside the outer mesh or none of it is.
+    """
+    if len(a.triangles) == 0 or len(b.triangles) == 0:
+        return False
+    return _contains(a, b) or _contains(b, a)
+
+
+def meshes_intersect(a: TriangleBVH, b: TriangleBVH, touching: bool = False) -> bool:
+    """
+    Test whether two closed meshes overlap.
+
+    Triangle pairs whose boxes touch are taken from the two hierarchies and tested
+    in batches, stopping at the first pair passing through each other. Surfaces
+    that only meet in contacts, as flush elements do, overlap in volume only if a
+    point just off one of those contacts is inside both meshes. Without any
+    contact the meshes still clash when one lies entirely inside the other.
+
+    Args:
+        a (TriangleBVH): The first mesh.
+        b (TriangleBVH): The second mesh.
+        touching (bool): Also count meshes whose surfaces only touch.
+
+    Returns:
+        bool: True if the meshes overlap in volume, or touch if `touching`.
+    """
+    if len(a.triangles) == 0 or len(b.triangles) == 0:
+        return False
+
+    contacts_a, contacts_b = [], []
+    contact_count = 0
+    for indices_a, indices_b in candidate_triangle_pairs(a, b, 0.0):
+        triangles_a, triangles_b = a.triangles[indices_a], b.triangles[indices_b]
+        meets, crosses = triangle_contacts(triangles_a, triangles_b)
+        if np.any(crosses) or (touching and np.any(meets)):
+            return True
+        if contact_count < MAX_CONTACT_PROBES and np.any(meets):
+            contacts_a.append(triangles_a[meets])
+            contacts_b.append(triangles_b[meets])
+            contact_count += np.count_nonzero(meets)
+
+    if contact_count:
+        probes, steps = _contact_probes(
+            np.concatenate(contacts_a)[:MAX_CONTACT_PROBES],
+            np.concatenate(contacts_b)[:MAX_CONTACT_PROBES],
+        )
+        # Probes on a face both meshes share, where parity cannot tell, are ignored.
+        return any(
+            _strictly_inside(point, a, step / 2) and _strictly_inside(point, b, step / 2)
+            for points, step in zip(probes, steps)
+            for point in points
+        )
+
+    return meshes_nested(a, b)
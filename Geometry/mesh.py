@@ -1,4 +1,5 @@
-from typing import Union, Type
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Union, Type
 
 try:
     import pymesh
@@ -7,20 +8,110 @@ except ImportError:
 
     pymesh = mypymesh
 
+import numpy as np
 import trimesh
 
-from Geometry.helpers import triangulate_face
+from Geometry.helpers import triangulate_polygons
+
+DEFAULT_CONVERSION_CACHE_BYTES = 512 * 1024 * 1024
+
+
+class ConversionCache:
+    def __init__(self, max_bytes: int = DEFAULT_CONVERSION_CACHE_BYTES):
+        """
+        Initialize a least-recently-used cache of converted meshes.
+
+        Each process has its own instance, `conversion_cache`, so a mesh is converted
+        at most once per worker for as long as it fits under the memory cap.
+
+        Args:
+        max_bytes (int): Approximate memory cap; the least recently used entries are
+            evicted once the cached meshes exceed it.
+        """
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, create: Callable[[], Any], nbytes: int) -> Any:
+        """
+        Return the cached value for `key`, creating it on a miss.
+
+        Args:
+            key (Hashable): Identity or content hash of the source mesh.
+            create (Callable[[], Any]): Builds the value when it is not cached.
+            nbytes (int): Approximate memory held by the value.
+
+        Returns:
+            Any: The cached or newly created value.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        value = create()
+        self._entries[key] = (value, nbytes)
+        self.bytes += nbytes
+
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, evicted_bytes) = self._entries.popitem(last=False)
+            self.bytes -= evicted_bytes
+            self.evictions += 1
+
+        return value
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+        }
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+
+conversion_cache = ConversionCache()
+
+
+def form_pymesh(key: Hashable, vertices: np.ndarray, faces: np.ndarray) -> pymesh.Mesh:
+    """
+    Build a Pymesh object from vertex and face arrays, at most once per key.
+
+    Args:
+        key (Hashable): Identifies the mesh, e.g. its store and index.
+        vertices (np.ndarray): (V, 3) vertex positions.
+        faces (np.ndarray): (F, 3) triangle vertex indices.
+
+    Returns:
+        pymesh.Mesh: The converted mesh, shared between calls with the same key.
+    """
+    return conversion_cache.get(
+        key,
+        lambda: pymesh.form_mesh(vertices, faces),
+        vertices.nbytes + faces.nbytes,
+    )
 
 
 def trimesh_to_pymesh(mesh: trimesh.Trimesh) -> pymesh.Mesh:
     """
     Convert a Trimesh object to a Pymesh object.
+
+    Conversions are memoized by the content hash of the mesh.
     Args:
         mesh (Trimesh): The Trimesh object to convert.
     Returns:
         pymesh.Mesh: The resulting Pymesh object.
     """
-    return pymesh.form_mesh(mesh.vertices, mesh.faces)
+    return form_pymesh(("trimesh", hash(mesh)), mesh.vertices, mesh.faces)
 
 
 def pymesh_to_trimesh(mesh: pymesh.Mesh) -> trimesh.Trimesh:
@@ -56,45 +147,143 @@ def cast(
         raise TypeError("Unsupported mesh type or target type.")
 
 
-import numpy as np
-import trimesh
-from specklepy.objects.geometry import Mesh as SpeckleMesh, Vector
+from specklepy.objects.geometry import Mesh as SpeckleMesh
 
+# Faces compared at once while following a run of faces with one vertex count, and
+# the shortest run still followed that way rather than by pointer doubling.
+RUN_WINDOW = 1024
+MIN_RUN_LENGTH = 16
 
-def speckle_mesh_to_trimesh(input_mesh: SpeckleMesh) -> trimesh.Trimesh:
-    vertices = np.array(input_mesh.vertices).reshape((-1, 3))
-    faces = []
 
-    i = 0
-    while i < len(input_mesh.faces):
-        face_vertex_count = input_mesh.faces[i]
-        i += 1  # Skip the vertex count
+def _chained_starts(faces: np.ndarray) -> np.ndarray:
+    """
+    Follow the chain of face headers from the first entry by pointer doubling.
 
-        face_vertex_indices = input_mesh.faces[i: i + face_vertex_count]
+    Every entry is treated as a possible header pointing at the next one. Each
+    round doubles both the headers found and the length of the jumps, so F faces
+    take log2(F) passes over the list.
+    """
+    end = len(faces)
+    # Where the next face would start if position i held a header; jumps past the
+    # end stop at the end, which jumps to itself.
+    positions = np.arange(end + 1, dtype=np.int64)
+    jump = np.minimum(positions + np.append(np.maximum(faces, 0), 0) + 1, end)
 
-        face_vertices = [
-            Vector.from_list(vertices[idx].tolist()) for idx in face_vertex_indices
-        ]
+    # `starts` holds the first 2^k headers and `jump` skips 2^k faces.
+    starts = np.zeros(1, dtype=np.int64)
+    while starts[-1] < end:
+        starts = np.concatenate((starts, jump[starts]))
+        jump = jump[jump]
+    return starts[starts < end]
 
-        if face_vertex_count == 3:
-            faces.append(face_vertex_indices)
-        else:
-            triangulated = triangulate_face(face_vertices)
-            faces.extend(
-                [[face_vertex_indices[idx] for idx in tri] for tri in triangulated]
-            )
 
-        i += face_vertex_count
+def face_starts(faces: np.ndarray) -> np.ndarray:
+    """
+    Find the position of every face header in a Speckle face list.
 
-    t_mesh = trimesh.Trimesh(vertices=vertices, faces=np.array(faces))
+    Speckle stores faces as `[n, i_0, ..., i_n-1, n, ...]`. Lists made of only
+    triangles or only quads have a fixed stride and are recognised in bulk. Mixed
+    lists usually hold long runs of faces with the same vertex count, which are
+    found a window at a time; once faces of different counts alternate, the rest
+    of the list is resolved by `_chained_starts`.
 
-    return t_mesh
+    Args:
+        faces (np.ndarray): The flat Speckle face list.
+
+    Returns:
+        np.ndarray: Indices of the vertex-count entries.
+    """
+    for count in (3, 4):
+        stride = count + 1
+        if len(faces) % stride == 0 and np.all(faces[::stride] == count):
+            return np.arange(0, len(faces), stride)
+
+    runs = []
+    start, end = 0, len(faces)
+    while start < end:
+        count = int(faces[start])
+        stride = max(count, 0) + 1
+        matches = faces[start: start + RUN_WINDOW * stride: stride] == count
+        length = len(matches) if matches.all() else int(np.argmin(matches))
+        if length < len(matches) and length < MIN_RUN_LENGTH:
+            runs.append(start + _chained_starts(faces[start:]))
+            break
+        runs.append(np.arange(start, start + length * stride, stride))
+        start += length * stride
+    return np.concatenate(runs) if runs else np.empty(0, dtype=np.int64)
+
+
+def split_quads(quads: np.ndarray, vertices: np.ndarray) -> np.ndarray:
+    """
+    Split quads into two triangles each, along a diagonal that lies inside the quad.
 
-    # code below speeds up the process but is not used in the current implementation.
-    # Bounding boxes could be used for a 2-pass approach to speed up the process.
+    The 0-2 diagonal is used unless the quad is concave at vertex 1 or 3, in which
+    case only the 1-3 diagonal keeps both triangles inside the face.
 
-    # obbox = t_mesh.bounding_box_oriented
+    Args:
+        quads (np.ndarray): (Q, 4) vertex indices.
+        vertices (np.ndarray): (V, 3) vertex positions.
+
+    Returns:
+        np.ndarray: (2 * Q, 3) triangle vertex indices.
+    """
+    v0, v1, v2, v3 = (vertices[quads[:, k]] for k in range(4))
+    normal = np.cross(v2 - v0, v3 - v1)
+    first = np.einsum("ij,ij->i", np.cross(v1 - v0, v2 - v0), normal)
+    second = np.einsum("ij,ij->i", np.cross(v2 - v0, v3 - v0), normal)
+    use_02 = ((first > 0) & (second > 0)) | ~np.any(normal, axis=1)
+
+    triangles = np.where(
+        use_02[:, None, None],
+        quads[:, [[0, 1, 2], [0, 2, 3]]],
+        quads[:, [[0, 1, 3], [1, 2, 3]]],
+    )
+    return triangles.reshape(-1, 3)
+
+
+def decode_faces(faces: np.ndarray, vertices: np.ndarray) -> np.ndarray:
+    """
+    Decode a Speckle face list into triangles.
 
-    # obbox_mesh = obbox.to_mesh()
+    Triangles and quads are handled with array operations; faces with more than four
+    vertices are ear clipped in batches of equal vertex count.
 
-    # return obbox_mesh
+    Args:
+        faces (np.ndarray): The flat Speckle face list.
+        vertices (np.ndarray): (V, 3) vertex positions.
+
+    Returns:
+        np.ndarray: (T, 3) triangle vertex indices.
+    """
+    if len(faces) == 0:
+        return np.empty((0, 3), dtype=np.int64)
+
+    starts = face_starts(faces)
+    counts = faces[starts]
+
+    triangles = [faces[starts[counts == 3, None] + np.arange(1, 4)]]
+
+    quad_starts = starts[counts == 4]
+    if len(quad_starts):
+        triangles.append(
+            split_quads(faces[quad_starts[:, None] + np.arange(1, 5)], vertices)
+        )
+
+    # n-gons are triangulated in batches of polygons with the same vertex count.
+    for count in np.unique(counts[counts > 4]).tolist():
+        polygons = faces[starts[counts == count, None] + np.arange(1, count + 1)]
+        local = triangulate_polygons(vertices[polygons])
+        triangles.append(
+            np.take_along_axis(polygons[:, None, :], local, axis=2).reshape(-1, 3)
+        )
+
+    return np.concatenate(triangles)
+
+
+def speckle_mesh_to_trimesh(input_mesh: SpeckleMesh) -> trimesh.Trimesh:
+    vertices = np.array(input_mesh.vertices, dtype=float).reshape((-1, 3))
+    faces = decode_faces(np.asarray(input_mesh.faces, dtype=np.int64), vertices)
+
+    t_mesh = trimesh.Trimesh(vertices=vertices, faces=faces)
+
+    return t_mesh
@@ -0,0 +1,133 @@
+"""On-disk cache of processed reference models, keyed by Speckle version id."""
+import json
+import os
+import shutil
+import tempfile
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+from Geometry.broad_phase import SweepIndex
+from Geometry.store import GeometryStore, PackedModel
+
+# Bumped whenever the layout written by `ReferenceModelCache.save` changes.
+CACHE_FORMAT_VERSION = 4
+
+# Location of the cache, overridable for deployments with a persistent volume.
+DEFAULT_MODEL_CACHE_DIR = os.environ.get(
+    "CLASH_MODEL_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "speckle-clash", "models"),
+)
+DEFAULT_MAX_MODEL_CACHE_BYTES = 8 * 1024 ** 3
+
+
+class ReferenceModelCache:
+    def __init__(
+        self,
+        directory: str = DEFAULT_MODEL_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_MODEL_CACHE_BYTES,
+    ):
+        """
+        Initialize a size-bounded cache of packed models in `directory`.
+
+        Each entry is a directory of .npy files holding the element meshes, bounds
+        and broad phase index, plus a JSON file with the element ids. Loading maps
+        the arrays instead of reading them, so a cached model is available at once.
+        Entries are evicted least recently used first when `evict` is called.
+
+        Args:
+        directory (str): Where the entries are kept.
+        max_bytes (int): Size of the entries kept after eviction.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        # Entries loaded or saved in this session, which eviction never removes.
+        self._used: Set[str] = set()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"v{CACHE_FORMAT_VERSION}", key)
+
+    def load(self, key: str) -> Optional[PackedModel]:
+        """
+        Map the model stored under `key`.
+
+        Args:
+            key (str): Usually the reference model version id.
+
+        Returns:
+            Optional[PackedModel]: The model, or None if it is not cached.
+        """
+        path = self.path(key)
+        try:
+            with open(os.path.join(path, "model.json")) as file:
+                meta = json.load(file)
+        except FileNotFoundError:
+            return None
+
+        # Mapping the arrays does not reliably update access times, so the use
+        # is recorded on the metadata file.
+        os.utime(os.path.join(path, "model.json"))
+        self._used.add(path)
+        index = SweepIndex(
+            np.load(os.path.join(path, "index_valid.npy"), mmap_mode="r"),
+            np.load(os.path.join(path, "index_orders.npy"), mmap_mode="r"),
+        )
+        store = GeometryStore.load(path, meta["token"])
+        return PackedModel(meta["ids"], store, meta["units"], index)
+
+    def save(self, key: str, model: PackedModel) -> None:
+        """
+        Store a model under `key`, replacing any previous entry.
+
+        The entry is written to a temporary directory first and moved into place,
+        so a concurrent `load` never sees half of it.
+        """
+        os.makedirs(os.path.dirname(self.path(key)), exist_ok=True)
+        staging = tempfile.mkdtemp(dir=os.path.dirname(self.path(key)))
+
+        model.store.save(staging)
+        np.save(os.path.join(staging, "index_valid.npy"), model.index.valid)
+        np.save(os.path.join(staging, "index_orders.npy"), model.index.orders)
+        with open(os.path.join(staging, "model.json"), "w") as file:
+            json.dump(
+                {"ids": model.ids, "units": model.units, "token": model.store.token}, file
+            )
+
+        shutil.rmtree(self.path(key), ignore_errors=True)
+        os.replace(staging, self.path(key))
+        self._used.add(self.path(key))
+
+    def entries(self) -> List[Tuple[float, int, str]]:
+        """Last use, size and path of every entry in the current format."""
+        entries = []
+        root = os.path.join(self.directory, f"v{CACHE_FORMAT_VERSION}")
+        for path, _, files in os.walk(root):
+            if "model.json" not in files:
+                continue
+            size = sum(os.path.getsize(os.path.join(path, name)) for name in files)
+            last_used = os.path.getmtime(os.path.join(path, "model.json"))
+            entries.append((last_used, size, path))
+        return entries
+
+    def evict(self) -> None:
+        """Drop entries of older formats and the least recently used entries."""
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.startswith("v") and name != f"v{CACHE_FORMAT_VERSION}":
+                    shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+        entries = sorted(self.entries())
+        excess = sum(size for _, size, _ in entries) - self.max_bytes
+        for _, size, path in entries:
+            if excess <= 0:
+                break
+            if path in self._used:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            try:
+                os.rmdir(os.path.dirname(path))  # the version holds no other category
+            except OSError:
+                pass
+            self.evictions += 1
+            excess -= size
@@ -0,0 +1,157 @@
+"""Cheap conservative tests that reject mesh pairs before the exact boolean."""
+from typing import List, Tuple
+
+import numpy as np
+
+# Squared length below which a search direction is treated as zero.
+GJK_EPSILON = 1e-18
+GJK_MAX_ITERATIONS = 64
+
+
+def oriented_bounds(vertices: np.ndarray) -> np.ndarray:
+    """
+    Fit an oriented bounding box to a point set along its principal axes.
+
+    Args:
+        vertices (np.ndarray): (V, 3) points.
+
+    Returns:
+        np.ndarray: A (5, 3) array holding the box centre, its three unit axes and
+            its half extents along those axes.
+    """
+    if len(vertices) == 0:
+        return np.vstack([np.zeros(3), np.eye(3), np.full(3, -np.inf)])
+
+    mean = vertices.mean(axis=0)
+    centred = vertices - mean
+    # Columns of the eigenvector matrix are the principal directions.
+    _, eigenvectors = np.linalg.eigh(centred.T @ centred)
+    axes = eigenvectors.T
+
+    projected = centred @ axes.T
+    low, high = projected.min(axis=0), projected.max(axis=0)
+    centre = mean + ((low + high) / 2) @ axes
+
+    return np.vstack([centre, axes, (high - low) / 2])
+
+
+def transform_obb(obb: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    Fit an oriented box around a (5, 3) box moved by a 4x4 transformation.
+
+    The placed box is the convex hull of its eight transformed corners, so a box
+    fitted to those corners contains it even under shear or non-uniform scale.
+    """
+    if np.any(obb[4] < 0) or np.array_equal(matrix, np.identity(4)):
+        return obb
+    signs = np.array([[i, j, k] for i in (-1, 1) for j in (-1, 1) for k in (-1, 1)])
+    corners = obb[0] + (signs * obb[4]) @ obb[1:4]
+    return oriented_bounds(corners @ matrix[:3, :3].T + matrix[:3, 3])
+
+
+def obb_overlap(a: np.ndarray, b: np.ndarray) -> bool:
+    """
+    Test two oriented boxes for overlap with the separating axis theorem.
+
+    Args:
+        a (np.ndarray): (5, 3) box as returned by `oriented_bounds`.
+        b (np.ndarray): (5, 3) box as returned by `oriented_bounds`.
+
+    Returns:
+        bool: False if one of the 15 candidate axes separates the boxes.
+    """
+    axes_a, extents_a = a[1:4], a[4]
+    axes_b, extents_b = b[1:4], b[4]
+    if np.any(extents_a < 0) or np.any(extents_b < 0):
+        return False
+
+    edge_axes = np.cross(axes_a[:, None, :], axes_b[None, :, :]).reshape(9, 3)
+    edge_axes = edge_axes[np.einsum("ij,ij->i", edge_axes, edge_axes) > 1e-12]
+    axes = np.vstack([axes_a, axes_b, edge_axes])
+
+    distance = np.abs(axes @ (b[0] - a[0]))
+    radius_a = np.abs(axes @ axes_a.T) @ extents_a
+    radius_b = np.abs(axes @ axes_b.T) @ extents_b
+
+    return not np.any(distance > radius_a + radius_b)
+
+
+def _support(a: np.ndarray, b: np.ndarray, direction: np.ndarray) -> np.ndarray:
+    """Furthest point of the Minkowski difference a - b along `direction`."""
+    return a[np.argmax(a @ direction)] - b[np.argmin(b @ direction)]
+
+
+def _line(simplex: List[np.ndarray]) -> Tuple[List[np.ndarray], np.ndarray]:
+    b, a = simplex
+    ab, ao = b - a, -a
+    if np.dot(ab, ao) > 0:
+        return [b, a], np.cross(np.cross(ab, ao), ab)
+    return [a], ao
+
+
+def _triangle(simplex: List[np.ndarray]) -> Tuple[List[np.ndarray], np.ndarray]:
+    c, b, a = simplex
+    ab, ac, ao = b - a, c - a, -a
+    abc = np.cross(ab, ac)
+
+    if np.dot(np.cross(abc, ac), ao) > 0:
+        if np.dot(ac, ao) > 0:
+            return [c, a], np.cross(np.cross(ac, ao), ac)
+        return _line([b, a])
+    if np.dot(np.cross(ab, abc), ao) > 0:
+        return _line([b, a])
+    if np.dot(abc, ao) > 0:
+        return [c, b, a], abc
+    return [b, c, a], -abc
+
+
+def _tetrahedron(simplex: List[np.ndarray]) -> Tuple[List[np.ndarray], np.ndarray]:
+    d, c, b, a = simplex
+    ao = -a
+    for face, opposite in (((c, b), d), ((d, c), b), ((b, d), c)):
+        normal = np.cross(face[1] - a, face[0] - a)
+        if np.dot(normal, opposite - a) > 0:
+            normal = -normal
+        if np.dot(normal, ao) > 0:
+            return _triangle([face[0], face[1], a])
+    # The origin is behind all three faces that touch the newest point.
+    return simplex, np.zeros(3)
+
+
+def convex_hulls_intersect(a: np.ndarray, b: np.ndarray) -> bool:
+    """
+    Test whether the convex hulls of two point sets intersect, using GJK.
+
+    The hulls are never built: GJK only needs the support point of each set, which
+    is the vertex furthest along a direction.
+
+    Args:
+        a (np.ndarray): (N, 3) points of the first set.
+        b (np.ndarray): (M, 3) points of the second set.
+
+    Returns:
+        bool: False only if the hulls are strictly separated. If the iteration
+            limit is reached the pair is kept, so the test never rejects a clash.
+    """
+    if len(a) == 0 or len(b) == 0:
+        return False
+
+    direction = a.mean(axis=0) - b.mean(axis=0)
+    if np.dot(direction, direction) < GJK_EPSILON:
+        return True
+
+    simplex = [_support(a, b, direction)]
+    direction = -simplex[0]
+
+    for _ in range(GJK_MAX_ITERATIONS):
+        if np.dot(direction, direction) < GJK_EPSILON:
+            return True
+
+        point = _support(a, b, direction)
+        if np.dot(point, direction) < 0:
+            return False
+
+        simplex.append(point)
+        simplex, direction = (_line, _triangle, _tetrahedron)[len(simplex) - 2](simplex)
+
+    return True
@@ -0,0 +1,190 @@
+"""Reporting of detected clashes to the Automate run, bounded in size."""
+import csv
+import gzip
+import os
+import re
+import tempfile
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from speckle_automate import AutomationContext
+
+from Geometry.clustering import ClashGroup, cluster_clashes, group_objects
+from Utilities import instrumentation
+
+# Clash groups attached to the run one by one; the rest are summarized.
+DEFAULT_MAX_REPORTED_GROUPS = 200
+# Object ids attached with one result, the reference object included.
+MAX_OBJECTS_PER_RESULT = 100
+
+
+class ResultCase(NamedTuple):
+    """One result to attach to the run: the objects it highlights and its message."""
+
+    object_ids: List[str]
+    message: str
+
+
+class ClashReport(NamedTuple):
+    """What `report_clashes` attached to the run."""
+
+    groups: int
+    reported_groups: int
+    results: int
+    object_ids: int
+    artifact: Optional[str]  # name of the attached clash list, if any
+
+
+def clash_result_cases(
+    groups: List[ClashGroup],
+    max_groups: Optional[int] = DEFAULT_MAX_REPORTED_GROUPS,
+    artifact: Optional[str] = None,
+) -> List[ResultCase]:
+    """
+    Build the results for a set of clash groups, with a bounded number of object ids.
+
+    The first `max_groups` groups become one result each, numbered in order, and
+    hold at most `MAX_OBJECTS_PER_RESULT` objects. All further groups are
+    summarized by a single result highlighting their first object each.
+
+    Args:
+        groups (List[ClashGroup]): See `cluster_clashes`.
+        max_groups (Optional[int]): Number of groups reported one by one, or None
+            to report all of them.
+        artifact (Optional[str]): Name of the file holding the full clash list, to
+            refer to from the summary.
+
+    Returns:
+        List[ResultCase]: At most `max_groups + 1` results.
+    """
+    reported = groups if max_groups is None else groups[:max_groups]
+
+    cases = []
+    for group_number, group in enumerate(reported, start=1):
+        object_ids = group_objects(group)
+        message = str(group_number)
+        if len(object_ids) > MAX_OBJECTS_PER_RESULT:
+            message += f" (and {len(object_ids) - MAX_OBJECTS_PER_RESULT} more objects)"
+        cases.append(ResultCase(object_ids[:MAX_OBJECTS_PER_RESULT], message))
+
+    remaining = groups[len(reported):]
+    if remaining:
+        clash_count = sum(len(group) for group in remaining)
+        message = f"{len(remaining)} more clash groups with {clash_count} clashes"
+        if artifact:
+            message += f", all listed in {artifact}"
+        cases.append(
+            ResultCase(
+                [group[0][0] for group in remaining[:MAX_OBJECTS_PER_RESULT]], message + "."
+            )
+        )
+    return cases
+
+
+def write_clash_list(groups: List[ClashGroup], path: str) -> None:
+    """Write every clash as a (group, reference id, latest id) row of a gzipped CSV."""
+    with gzip.open(path, "wt", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(("group", "reference_id", "latest_id"))
+        for group_number, group in enumerate(groups, start=1):
+            writer.writerows((group_number, ref_id, latest_id) for ref_id, latest_id in group)
+
+
+def attach_clash_list(
+    groups: List[ClashGroup],
+    automate_context: AutomationContext,
+    category: str,
+) -> Optional[str]:
+    """
+    Attach the full clash list of a category to the run as a compressed CSV file.
+
+    Returns:
+        Optional[str]: The file name, or None if it could not be attached.
+    """
+    slug = re.sub(r"[^a-z0-9]+", "-", category.lower()).strip("-")
+    file_name = f"clashes-{slug}.csv.gz"
+    path = os.path.join(tempfile.mkdtemp(), file_name)
+    write_clash_list(groups, path)
+    try:
+        automate_context.store_file_result(path)
+    except Exception as ex:
+        # The results attached to the objects still show the clashes.
+        print(f"Could not attach the clash list {file_name}: {ex}")
+        return None
+    return file_name
+
+
+def report_clashes(
+    clashes: List[Tuple[str, str]],
+    automate_context: AutomationContext,
+    category: str = "Clash",
+    max_groups: Optional[int] = DEFAULT_MAX_REPORTED_GROUPS,
+    locations: Optional[np.ndarray] = None,
+    group_distance: float = 0.0,
+    object_ids: Optional[Dict[str, str]] = None,
+) -> ClashReport:
+    """
+    Attach every group of connected clashing objects to the run.
+
+    Clashes sharing an element form one group, see `cluster_clashes`. At most
+    `max_groups` groups are attached one by one and the rest are summarized, so the
+    results stay small however many clashes there are. The full list of a
+    summarized category goes into an attached file, see `attach_clash_list`.
+
+    Args:
+        clashes (List[Tuple[str, str]]): (reference id, latest id) pairs.
+        automate_context (AutomationContext): The run to attach the results to.
+        category (str): Category of the results.
+        max_groups (Optional[int]): See `clash_result_cases`.
+        locations (Optional[np.ndarray]): (K, 3) location of every clash.
+        group_distance (float): Also group clashes closer than this to each other.
+            Only used with `locations`.
+        object_ids (Optional[Dict[str, str]]): Object id of every element of
+            `clashes`, when these name elements by `PackedModel.placement_keys`.
+            Placements of one definition share its object id, so they are only
+            told apart while grouping.
+
+    Returns:
+        ClashReport: How many groups, results and object ids were attached.
+    """
+    with instrumentation.span("report") as span:
+        reported = [index for index, (_, latest) in enumerate(clashes) if latest]
+        groups = cluster_clashes(
+            [clashes[index] for index in reported],
+            None if locations is None else locations[reported],
+            group_distance,
+        )
+        if object_ids is not None:
+            groups = [
+                [(object_ids[ref_id], object_ids[latest_id]) for ref_id, latest_id in group]
+                for group in groups
+            ]
+
+        artifact = None
+        if max_groups is not None and len(groups) > max_groups:
+            artifact = attach_clash_list(groups, automate_context, category)
+
+        cases = clash_result_cases(groups, max_groups, artifact)
+        for case in cases:
+            automate_context.attach_error_to_objects(
+                category=category, object_ids=case.object_ids, message=case.message
+            )
+
+        report = ClashReport(
+            groups=len(groups),
+            reported_groups=(
+                len(groups) if max_groups is None else min(len(groups), max_groups)
+            ),
+            results=len(cases),
+            object_ids=sum(len(case.object_ids) for case in cases),
+            artifact=artifact,
+        )
+        span.count("results", report.results)
+        span.count("object_ids", report.object_ids)
+
+    if report.reported_groups < report.groups:
+        print(
+            f"{category}: reported {report.reported_groups} of {report.groups} clash "
+            f"groups one by one, the rest in one summary."
+        )
+    return report
@@ -0,0 +1,108 @@
+"""Clash results persisted between runs, keyed by Speckle object ids."""
+import os
+import sqlite3
+from typing import Iterable, NamedTuple, Set, Tuple
+
+# Location of the result store, overridable for deployments with a persistent volume.
+DEFAULT_RESULT_STORE_PATH = os.environ.get(
+    "CLASH_RESULT_STORE",
+    os.path.join(os.path.expanduser("~"), ".cache", "speckle-clash", "results.sqlite"),
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS elements (
+    scope TEXT NOT NULL,
+    side TEXT NOT NULL,
+    object_id TEXT NOT NULL,
+    PRIMARY KEY (scope, side, object_id)
+);
+CREATE TABLE IF NOT EXISTS clashes (
+    scope TEXT NOT NULL,
+    reference_id TEXT NOT NULL,
+    latest_id TEXT NOT NULL,
+    PRIMARY KEY (scope, reference_id, latest_id)
+);
+"""
+
+
+class Snapshot(NamedTuple):
+    """The elements and clashes of the last run in one scope."""
+
+    reference_ids: Set[str]
+    latest_ids: Set[str]
+    clashes: Set[Tuple[str, str]]
+
+
+class ClashResultStore:
+    def __init__(self, path: str = DEFAULT_RESULT_STORE_PATH):
+        """
+        Open (or create) an SQLite store of clash results.
+
+        Speckle object ids are content hashes, so a (reference id, latest id) pair
+        that was evaluated before has the same outcome now. The store keeps, per
+        scope, the element ids of the last run and the clashes found among them:
+        every pair of those elements was evaluated, whether it clashed or not.
+
+        Args:
+        path (str): Database file, or ":memory:" for a store that lives only as
+            long as this object.
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def load(self, scope: str) -> Snapshot:
+        """Return the snapshot of the last run saved under `scope`, empty if none."""
+        rows = self.connection.execute(
+            "SELECT side, object_id FROM elements WHERE scope = ?", (scope,)
+        )
+        ids = {"reference": set(), "latest": set()}
+        for side, object_id in rows:
+            ids[side].add(object_id)
+
+        clashes = set(
+            self.connection.execute(
+                "SELECT reference_id, latest_id FROM clashes WHERE scope = ?", (scope,)
+            )
+        )
+        return Snapshot(ids["reference"], ids["latest"], clashes)
+
+    def save(
+        self,
+        scope: str,
+        reference_ids: Iterable[str],
+        latest_ids: Iterable[str],
+        clashes: Iterable[Tuple[str, str]],
+    ) -> None:
+        """
+        Replace the snapshot of `scope` with the outcome of a complete run.
+
+        Args:
+            scope (str): Identifies the models and settings the results belong to.
+            reference_ids (Iterable[str]): Ids of all reference elements of the run.
+            latest_ids (Iterable[str]): Ids of all latest elements of the run.
+            clashes (Iterable[Tuple[str, str]]): All clashing (reference, latest) pairs.
+        """
+        with self.connection:
+            self.connection.execute("DELETE FROM elements WHERE scope = ?", (scope,))
+            self.connection.execute("DELETE FROM clashes WHERE scope = ?", (scope,))
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO elements VALUES (?, ?, ?)",
+                [(scope, "reference", object_id) for object_id in reference_ids]
+                + [(scope, "latest", object_id) for object_id in latest_ids],
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO clashes VALUES (?, ?, ?)",
+                [(scope, reference_id, latest_id) for reference_id, latest_id in clashes],
+            )
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "ClashResultStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
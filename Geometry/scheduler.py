@@ -0,0 +1,126 @@
+"""Batch scheduling of candidate pairs onto a process pool."""
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, NamedTuple, Optional
+
+import numpy as np
+
+DEFAULT_INITIAL_CHUNK_SIZE = 16
+DEFAULT_TARGET_BATCH_SECONDS = 0.5
+MAX_CHUNK_SIZE = 65536
+
+
+class BatchResult(NamedTuple):
+    """What a worker sends back for one batch of pairs."""
+
+    clashes: np.ndarray
+    pair_count: int
+    elapsed: float
+    counters: Optional[Dict[str, int]] = None
+    profile: Optional[Any] = None  # cost samples of the pairs, a PairProfile
+
+
+class AdaptiveChunkSize:
+    def __init__(
+        self,
+        chunk_size: Optional[int] = None,
+        target_batch_seconds: float = DEFAULT_TARGET_BATCH_SECONDS,
+        smoothing: float = 0.3,
+    ):
+        """
+        Choose batch sizes from the measured cost per pair.
+
+        Args:
+        chunk_size (Optional[int]): A fixed batch size. When None, batches start small
+            and grow or shrink so each one takes about `target_batch_seconds`.
+        target_batch_seconds (float): Desired wall time of one batch in a worker.
+        smoothing (float): Weight of the newest measurement in the running average.
+        """
+        self.fixed = chunk_size
+        self.target_batch_seconds = target_batch_seconds
+        self.smoothing = smoothing
+        self.seconds_per_pair: Optional[float] = None
+
+    def record(self, pair_count: int, elapsed: float) -> None:
+        if pair_count <= 0:
+            return
+        cost = elapsed / pair_count
+        if self.seconds_per_pair is None:
+            self.seconds_per_pair = cost
+        else:
+            self.seconds_per_pair += self.smoothing * (cost - self.seconds_per_pair)
+
+    def next_size(self) -> int:
+        if self.fixed:
+            return self.fixed
+        if not self.seconds_per_pair:
+            return DEFAULT_INITIAL_CHUNK_SIZE
+        size = int(self.target_batch_seconds / self.seconds_per_pair)
+        return max(1, min(size, MAX_CHUNK_SIZE))
+
+
+def create_pool(
+    max_workers: Optional[int],
+    initializer: Callable[..., None],
+    initargs: tuple,
+) -> ProcessPoolExecutor:
+    """
+    Create a process pool whose workers hold the shared clash state.
+
+    Where the platform supports it the pool forks, so workers inherit `initargs`
+    from the parent's memory instead of unpickling a copy each.
+    """
+    context = (
+        multiprocessing.get_context("fork")
+        if "fork" in multiprocessing.get_all_start_methods()
+        else None
+    )
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=context,
+        initializer=initializer,
+        initargs=initargs,
+    )
+
+
+def map_batches(
+    executor: Executor,
+    worker: Callable[[np.ndarray], Any],
+    pairs: np.ndarray,
+    max_workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> Iterator[Any]:
+    """
+    Submit candidate pairs to a pool as index arrays, in adaptively sized batches.
+
+    At most two batches per worker are in flight, so batch sizes chosen later in the
+    run already reflect the cost measured on earlier ones.
+
+    Args:
+        executor (Executor): The pool to submit to.
+        worker (Callable): Function run in the worker on a (K, 2) slice of `pairs`. It
+            must return an object with `pair_count` and `elapsed` attributes.
+        pairs (np.ndarray): (N, 2) integer index pairs.
+        max_workers (Optional[int]): Number of workers of the pool.
+        chunk_size (Optional[int]): A fixed batch size, or None to size adaptively.
+
+    Yields:
+        The worker results, in completion order.
+    """
+    sizer = AdaptiveChunkSize(chunk_size)
+    in_flight_limit = 2 * (max_workers or os.cpu_count() or 1)
+
+    pending = set()
+    offset = 0
+    while offset < len(pairs) or pending:
+        while offset < len(pairs) and len(pending) < in_flight_limit:
+            size = sizer.next_size()
+            pending.add(executor.submit(worker, pairs[offset: offset + size]))
+            offset += size
+
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            result = future.result()
+            sizer.record(result.pair_count, result.elapsed)
+            yield result
@@ -0,0 +1,373 @@
+"""Array-backed storage of element meshes for the clash workers."""
+import hashlib
+import os
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Tuple, Union
+from uuid import uuid4
+
+import numpy as np
+
+from Geometry.broad_phase import SweepIndex, sweep_index
+from Geometry.element import Element, model_units, pack_bounds
+from Geometry.helpers import transform_points
+
+# Name and dtype of every array a store is made of.
+STORE_ARRAYS: Tuple[Tuple[str, str], ...] = (
+    ("vertices", "float64"),
+    ("faces", "int64"),
+    ("geometry_vertex_offsets", "int64"),
+    ("geometry_face_offsets", "int64"),
+    ("mesh_geometry", "int64"),
+    ("mesh_transforms", "float64"),
+    ("element_mesh_offsets", "int64"),
+    ("element_groups", "int64"),
+    ("mesh_bounds", "float64"),
+    ("element_bounds", "float64"),
+)
+
+# Shared memory handle of one array: block name, dtype and full shape.
+ArrayHandle = Tuple[str, str, Tuple[int, ...]]
+
+
+def _offsets(counts: List[int]) -> np.ndarray:
+    return np.concatenate(([0], np.cumsum(counts, dtype=np.int64))).astype(np.int64)
+
+
+class GeometryStore:
+    def __init__(self, arrays: Dict[str, np.ndarray], token: Optional[str] = None):
+        """
+        Initialize a GeometryStore from its packed arrays.
+
+        Distinct geometries are stored back to back: geometry `g` owns the vertex
+        rows `geometry_vertex_offsets[g]:geometry_vertex_offsets[g + 1]` and likewise
+        for faces, whose indices are local to their geometry. Mesh `m` is geometry
+        `mesh_geometry[m]` placed by `mesh_transforms[m]`, so the placements of a
+        block definition share its vertices; `mesh_bounds` are already placed.
+        Element `e` owns the meshes
+        `element_mesh_offsets[e]:element_mesh_offsets[e + 1]`, and elements with
+        the same non-negative `element_groups` code are parts of one block instance.
+
+        Args:
+        arrays (Dict[str, np.ndarray]): One array per name in `STORE_ARRAYS`.
+        token (Optional[str]): Identifies the store's content across processes, so
+            per-mesh caches can be keyed by (token, mesh index).
+        """
+        for name, _ in STORE_ARRAYS:
+            setattr(self, name, arrays[name])
+        self.token = token or uuid4().hex
+        self._placed = ~np.all(self.mesh_transforms == np.identity(4), axis=(1, 2))
+        self._blocks: List[SharedMemory] = []
+        self._owner = False
+        self._handles: Optional[Dict[str, ArrayHandle]] = None
+        self._path: Optional[str] = None
+
+    @classmethod
+    def from_elements(cls, elements: List[Element]) -> "GeometryStore":
+        """
+        Pack the meshes of a list of elements into one store.
+
+        Args:
+            elements (List[Element]): The elements, in the order they are indexed.
+
+        Returns:
+            GeometryStore: A store backed by ordinary process memory.
+        """
+        meshes = [mesh for element in elements for mesh in element.meshes]
+        transforms = np.concatenate(
+            [element.transforms for element in elements] or [np.empty((0, 4, 4))]
+        )
+
+        # Placements of one definition share a trimesh object and are stored once.
+        geometry_index: Dict[int, int] = {}
+        geometries = []
+        for mesh in meshes:
+            if id(mesh) not in geometry_index:
+                geometry_index[id(mesh)] = len(geometries)
+                geometries.append(mesh)
+        mesh_geometry = np.array([geometry_index[id(mesh)] for mesh in meshes], dtype=np.int64)
+
+        mesh_counts = [len(element.meshes) for element in elements]
+        group_codes: Dict[str, int] = {}
+        element_groups = np.array(
+            [
+                group_codes.setdefault(element.group, len(group_codes))
+                if element.group is not None else -1
+                for element in elements
+            ],
+            dtype=np.int64,
+        )
+
+        return cls(
+            {
+                "vertices": np.concatenate(
+                    [mesh.vertices for mesh in geometries] or [np.empty((0, 3))]
+                ).astype(np.float64, copy=False),
+                "faces": np.concatenate(
+                    [mesh.faces for mesh in geometries] or [np.empty((0, 3))]
+                ).astype(np.int64, copy=False),
+                "geometry_vertex_offsets": _offsets([len(mesh.vertices) for mesh in geometries]),
+                "geometry_face_offsets": _offsets([len(mesh.faces) for mesh in geometries]),
+                "mesh_geometry": mesh_geometry,
+                "mesh_transforms": transforms.astype(np.float64, copy=False),
+                "element_mesh_offsets": _offsets(mesh_counts),
+                "element_groups": element_groups,
+                "mesh_bounds": np.concatenate(
+                    [element.mesh_bounds for element in elements]
+                    or [np.empty((0, 2, 3))]
+                ),
+                "element_bounds": pack_bounds(elements),
+            }
+        )
+
+    def __len__(self) -> int:
+        return len(self.element_mesh_offsets) - 1
+
+    @property
+    def mesh_count(self) -> int:
+        return len(self.mesh_geometry)
+
+    @property
+    def geometry_count(self) -> int:
+        return len(self.geometry_vertex_offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name, _ in STORE_ARRAYS)
+
+    def element_mesh_indices(self, element_index: int) -> range:
+        """Global indices of the meshes that belong to an element."""
+        return range(
+            int(self.element_mesh_offsets[element_index]),
+            int(self.element_mesh_offsets[element_index + 1]),
+        )
+
+    def element_face_counts(self) -> np.ndarray:
+        """Number of triangles of every element, over all of its meshes."""
+        offsets = self.geometry_face_offsets
+        mesh_faces = offsets[self.mesh_geometry + 1] - offsets[self.mesh_geometry]
+        cumulative = np.concatenate(([0], np.cumsum(mesh_faces, dtype=np.int64)))
+        return cumulative[self.element_mesh_offsets[1:]] - cumulative[self.element_mesh_offsets[:-1]]
+
+    def element_placement(self, element_index: int) -> Optional[str]:
+        """
+        Digest of the transforms that place an element's meshes.
+
+        Returns:
+            Optional[str]: A hex digest, or None if no mesh of the element is placed.
+        """
+        start, end = self.element_mesh_offsets[element_index: element_index + 2]
+        if not self._placed[start:end].any():
+            return None
+        transforms = np.ascontiguousarray(self.mesh_transforms[start:end])
+        return hashlib.sha1(transforms.tobytes()).hexdigest()[:16]
+
+    def mesh(self, mesh_index: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the placed vertices and the faces of one mesh.
+
+        Only placed block instances transform their vertices, here in the narrow
+        phase; other meshes are returned as zero-copy views.
+
+        Args:
+            mesh_index (int): Global index of the mesh.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (V, 3) vertices and (F, 3) mesh-local faces.
+        """
+        geometry = self.mesh_geometry[mesh_index]
+        vertex_start, vertex_end = self.geometry_vertex_offsets[geometry: geometry + 2]
+        face_start, face_end = self.geometry_face_offsets[geometry: geometry + 2]
+        vertices = self.vertices[vertex_start:vertex_end]
+        if self._placed[mesh_index]:
+            vertices = transform_points(vertices, self.mesh_transforms[mesh_index])
+        return vertices, self.faces[face_start:face_end]
+
+    def save(self, directory: str) -> None:
+        """Write every array to `directory` as an .npy file that `load` can map."""
+        os.makedirs(directory, exist_ok=True)
+        for name, _ in STORE_ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+
+    @classmethod
+    def load(cls, directory: str, token: Optional[str] = None) -> "GeometryStore":
+        """
+        Memory-map a store written by `save`.
+
+        Nothing is read until an array is used, and the pages are shared with every
+        other process that maps the same files.
+        """
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+            for name, _ in STORE_ARRAYS
+        }
+        store = cls(arrays, token)
+        store._path = directory
+        return store
+
+    def share(self) -> "GeometryStore":
+        """
+        Copy the store into shared memory blocks.
+
+        The returned store owns the blocks and must be closed with `unlink`. Workers
+        that fork from this process see the same pages; others attach by block name
+        when the store is unpickled, so its arrays are never copied through a pipe.
+        A store mapped from files is already shared by the page cache and is mapped
+        again instead of copied, and a store in shared memory is attached again
+        without taking over its blocks.
+        """
+        if self._path is not None:
+            return GeometryStore.load(self._path, self.token)
+        if self._handles is not None:
+            return GeometryStore.attach(self._handles, self.token)
+
+        arrays = {}
+        blocks = []
+        handles = {}
+        for name, dtype in STORE_ARRAYS:
+            source = getattr(self, name)
+            block = SharedMemory(create=True, size=max(source.nbytes, 1))
+            view = np.ndarray(source.shape, dtype=dtype, buffer=block.buf)
+            view[...] = source
+            arrays[name] = view
+            blocks.append(block)
+            handles[name] = (block.name, dtype, source.shape)
+
+        shared = GeometryStore(arrays, self.token)
+        shared._blocks = blocks
+        shared._owner = True
+        shared._handles = handles
+        return shared
+
+    @classmethod
+    def attach(cls, handles: Dict[str, ArrayHandle], token: str) -> "GeometryStore":
+        """Map a store shared by another process, without copying its arrays."""
+        arrays = {}
+        blocks = []
+        for name, (block_name, dtype, shape) in handles.items():
+            # Pool workers share the creator's resource tracker, so attaching here
+            # does not take over responsibility for unlinking the block.
+            block = SharedMemory(name=block_name)
+            arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            blocks.append(block)
+
+        store = cls(arrays, token)
+        store._blocks = blocks
+        store._handles = handles
+        return store
+
+    def __reduce__(self):
+        if self._path is not None:
+            return GeometryStore.load, (self._path, self.token)
+        if self._handles is not None:
+            return GeometryStore.attach, (self._handles, self.token)
+        arrays = {name: getattr(self, name) for name, _ in STORE_ARRAYS}
+        return GeometryStore, (arrays, self.token)
+
+    def close(self) -> None:
+        """Release this process' mapping of the shared blocks."""
+        for name, _ in STORE_ARRAYS:
+            setattr(self, name, None)
+        self._placed = None
+        for block in self._blocks:
+            try:
+                block.close()
+            except BufferError:  # A caller still holds a view; the mapping dies with it.
+                pass
+        self._blocks = []
+
+    def unlink(self) -> None:
+        """Close and, if this store created them, destroy the shared blocks."""
+        blocks = list(self._blocks)
+        self.close()
+        if self._owner:
+            for block in blocks:
+                block.unlink()
+            self._owner = False
+
+    def __enter__(self) -> "GeometryStore":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.unlink()
+
+
+class PackedModel:
+    def __init__(
+        self,
+        ids: List[str],
+        store: GeometryStore,
+        units: Optional[str] = None,
+        index: Optional[SweepIndex] = None,
+    ):
+        """
+        Initialize a PackedModel, the part of a model the clash detection needs.
+
+        It holds no Speckle or trimesh objects, so it can be written to disk and
+        mapped back without receiving or converting the model again.
+
+        Args:
+        ids (List[str]): Element ids, in store order.
+        store (GeometryStore): The element meshes.
+        units (Optional[str]): Units of the coordinates, if known.
+        index (Optional[SweepIndex]): Broad phase index of the element bounds,
+            built from the store when not given.
+        """
+        self.ids = ids
+        self.store = store
+        self.units = units
+        self.index = index if index is not None else sweep_index(store.element_bounds)
+
+    @classmethod
+    def from_elements(cls, elements: List[Element]) -> "PackedModel":
+        return cls(
+            [element.id for element in elements],
+            GeometryStore.from_elements(elements),
+            model_units(elements),
+        )
+
+    @property
+    def bounds(self) -> np.ndarray:
+        return self.store.element_bounds
+
+    def share(self) -> "PackedModel":
+        """
+        Get the model with its store in shared memory, see `GeometryStore.share`.
+
+        Detection runs on the returned model attach to its blocks instead of copying
+        the store again, so a model compared several times is shared once. Used as a
+        context manager, it destroys the blocks on exit.
+        """
+        return PackedModel(self.ids, self.store.share(), self.units, self.index)
+
+    def __enter__(self) -> "PackedModel":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.store.unlink()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def placement_keys(self) -> List[str]:
+        """
+        Identify every element by its content and its placement, across runs.
+
+        Element ids are content hashes, but every placement of a block definition
+        carries the id of the definition, and moving a placement only changes its
+        transform. Placed elements are keyed by their id and a digest of their
+        transforms, so a moved instance does not look unchanged.
+        """
+        keys = []
+        for element_index, object_id in enumerate(self.ids):
+            placement = self.store.element_placement(element_index)
+            keys.append(object_id if placement is None else f"{object_id}@{placement}")
+        return keys
+
+    def keyed_by_placement(self) -> "PackedModel":
+        """The same model with `placement_keys` as its ids."""
+        return PackedModel(self.placement_keys(), self.store, self.units, self.index)
+
+
+def pack_model(elements: Union[List[Element], PackedModel]) -> PackedModel:
+    """Pack a list of elements, passing models that are already packed through."""
+    return elements if isinstance(elements, PackedModel) else PackedModel.from_elements(elements)
@@ -0,0 +1,167 @@
+"""Single-pass classification of Speckle objects into named categories."""
+from collections import Counter
+from time import perf_counter_ns
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from specklepy.objects import Base
+
+from Rules.checks import CheckRule, as_check_rule
+
+T = TypeVar("T")
+
+# Name under which the per-type lookup of candidate categories is reported.
+DISPATCH = "type dispatch"
+
+# Categories an object of one speckle_type may belong to, each with the checks
+# that are left once its type is known.
+Plan = Tuple[Tuple[str, Tuple[CheckRule, ...]], ...]
+
+
+class RuleRouter:
+    def __init__(self, categories: Dict[str, Callable[[Base], bool]]):
+        """
+        Initialize a router that sorts objects into named categories in one pass.
+
+        The rules of all categories are compiled into a plan per speckle_type: the
+        type checks are settled once per type through set lookups, and only the
+        categories an object can still belong to are checked further, cheapest
+        check first. A check shared by several categories, such as
+        `is_displayable`, runs at most once per object. Every check counts its
+        calls, hits and time.
+
+        Args:
+        categories (Dict[str, Callable[[Base], bool]]): Rule of every category.
+            An object may belong to any number of categories.
+        """
+        self.categories = {name: as_check_rule(rule) for name, rule in categories.items()}
+        self._checks = {
+            name: rule.flatten() for name, rule in self.categories.items()
+        }
+        self._plans: Dict[Optional[str], Plan] = {}
+
+        self.type_counts: Counter = Counter()
+        self.category_counts: Counter = Counter()
+        self.calls: Counter = Counter()
+        self.hits: Counter = Counter()
+        self.nanoseconds: Counter = Counter()
+
+    def plan(self, speckle_type: Optional[str]) -> Plan:
+        """Get the cached plan for objects of one speckle_type."""
+        plan = self._plans.get(speckle_type)
+        if plan is None:
+            plan = self._plans[speckle_type] = tuple(
+                (name, tuple(check for check in checks if check.types is None))
+                for name, checks in self._checks.items()
+                if all(
+                    speckle_type in check.types
+                    for check in checks
+                    if check.types is not None
+                )
+            )
+        return plan
+
+    def classify(self, obj: Base) -> Tuple[str, ...]:
+        """Get the names of the categories `obj` belongs to."""
+        start = perf_counter_ns()
+        speckle_type = getattr(obj, "speckle_type", None)
+        plan = self.plan(speckle_type)
+        self.type_counts[speckle_type] += 1
+        self.nanoseconds[DISPATCH] += perf_counter_ns() - start
+
+        outcomes: Dict[int, bool] = {}
+        matched = []
+        for name, checks in plan:
+            for check in checks:
+                outcome = outcomes.get(id(check.check))
+                if outcome is None:
+                    start = perf_counter_ns()
+                    outcome = outcomes[id(check.check)] = bool(check.check(obj))
+                    self.nanoseconds[check.name] += perf_counter_ns() - start
+                    self.calls[check.name] += 1
+                    self.hits[check.name] += outcome
+                if not outcome:
+                    break
+            else:
+                matched.append(name)
+                self.category_counts[name] += 1
+        return tuple(matched)
+
+    def route(
+        self, items: Iterable[T], key: Callable[[T], Base] = lambda item: item
+    ) -> Iterator[Tuple[Tuple[str, ...], T]]:
+        """
+        Stream the items that belong to at least one category.
+
+        Args:
+            items (Iterable[T]): Objects, or records holding one.
+            key (Callable[[T], Base]): Get the object to classify from an item.
+
+        Yields:
+            Tuple[Tuple[str, ...], T]: The categories of an item and the item.
+        """
+        for item in items:
+            names = self.classify(key(item))
+            if names:
+                yield names, item
+
+    def partition(
+        self, items: Iterable[T], key: Callable[[T], Base] = lambda item: item
+    ) -> Dict[str, List[T]]:
+        """Sort items into lists per category in a single pass."""
+        partitions: Dict[str, List[T]] = {name: [] for name in self.categories}
+        for names, item in self.route(items, key):
+            for name in names:
+                partitions[name].append(item)
+        return partitions
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Get the calls, hits and seconds spent of every check, type checks included."""
+        objects = sum(self.type_counts.values())
+        stats: Dict[str, Dict[str, float]] = {}
+        stats[DISPATCH] = {
+            "calls": objects,
+            "hits": objects,
+            "seconds": self.nanoseconds[DISPATCH] / 1e9,
+        }
+
+        for checks in self._checks.values():
+            for check in checks:
+                if check.types is not None:
+                    # Settled by the dispatch, once per object.
+                    stats[check.name] = {
+                        "calls": objects,
+                        "hits": sum(
+                            count
+                            for speckle_type, count in self.type_counts.items()
+                            if speckle_type in check.types
+                        ),
+                        "seconds": 0.0,
+                    }
+                else:
+                    stats[check.name] = {
+                        "calls": self.calls[check.name],
+                        "hits": self.hits[check.name],
+                        "seconds": self.nanoseconds[check.name] / 1e9,
+                    }
+        return stats
+
+    def report(self) -> str:
+        """Describe how many objects each category and check matched."""
+        objects = sum(self.type_counts.values())
+        categories = ", ".join(
+            f"{self.category_counts[name]} {name}" for name in self.categories
+        )
+        checks = ", ".join(
+            f"{name} {check['hits']}/{check['calls']} in {check['seconds']:.3f}s"
+            for name, check in self.stats().items()
+        )
+        return f"Rules: {objects} objects, {categories}. Checks: {checks}."
@@ -0,0 +1,115 @@
+"""Element categories that can be clashed against each other, and the clash matrix."""
+import hashlib
+import json
+import re
+from typing import Dict, List, Tuple
+
+from Rules.checks import CheckRule, ElementCheckRules
+
+# The speckle_types making up every category.
+CATEGORY_TYPES: Dict[str, List[str]] = {
+    "beams": [
+        "Objects.BuiltElements.Beam:Objects.BuiltElements.Revit.RevitBeam",
+    ],
+    "columns": [
+        "Objects.BuiltElements.Column:Objects.BuiltElements.Revit.RevitColumn",
+    ],
+    "ducts": [
+        "Objects.BuiltElements.Duct",
+        "Objects.BuiltElements.Duct:Objects.BuiltElements.Revit.RevitDuct",
+        "Objects.BuiltElements.Duct:Objects.BuiltElements.Revit.RevitDuct:Objects.BuiltElements.Revit.RevitFlexDuct",
+        "Objects.Other.Revit.RevitInstance:Objects.BuiltElements.Revit.RevitMEPFamilyInstance",
+        "Objects.BuiltElements.Revit.RevitElementType:Objects.BuiltElements.Revit.RevitSymbolElementType"
+    ],
+    "pipes": [
+        "Objects.BuiltElements.Pipe",
+        "Objects.BuiltElements.Pipe:Objects.BuiltElements.Revit.RevitPipe",
+        "Objects.BuiltElements.Pipe:Objects.BuiltElements.Revit.RevitPipe:Objects.BuiltElements.Revit.RevitFlexPipe",
+    ],
+}
+
+# Bumped whenever `category_rules` selects elements differently for the same types.
+CATEGORY_RULES_VERSION = 1
+
+# Separates the two categories of a pair ("x" or "×"), and the pairs of a matrix.
+PAIR_SEPARATOR = re.compile(r"\s+x\s+|\s*×\s*")
+MATRIX_SEPARATOR = ","
+
+
+def category_rules(names: List[str]) -> Dict[str, CheckRule]:
+    """Rule of every named category: visible elements of one of its types."""
+    element_rules = ElementCheckRules()
+    return {
+        name: element_rules.rule_combiner(
+            element_rules.speckle_type_rule(CATEGORY_TYPES[name]),
+            element_rules.is_displayable_rule(),
+        )
+        for name in names
+    }
+
+
+def category_digest(name: str) -> str:
+    """
+    Digest of the rule definition of a category.
+
+    Anything derived from the elements a rule selects, such as a cached packed
+    model, is keyed by it, so changing a category's types never serves stale data.
+    """
+    definition = json.dumps([CATEGORY_RULES_VERSION, CATEGORY_TYPES[name]])
+    return hashlib.sha1(definition.encode()).hexdigest()[:16]
+
+
+def parse_clash_matrix(matrix: str) -> List[Tuple[str, str]]:
+    """
+    Parse a clash matrix such as "beams x ducts, beams x pipes".
+
+    The first category of every pair is taken from the reference model and the
+    second from the changed model.
+
+    Args:
+        matrix (str): Comma separated pairs of category names.
+
+    Returns:
+        List[Tuple[str, str]]: The distinct (reference, changed) category pairs,
+            in the order given.
+
+    Raises:
+        ValueError: If a pair is malformed or names an unknown category.
+    """
+    pairs = []
+    for entry in matrix.split(MATRIX_SEPARATOR):
+        if not entry.strip():
+            continue
+        names = [name.strip().lower() for name in PAIR_SEPARATOR.split(entry.strip())]
+        if len(names) != 2 or not all(names):
+            raise ValueError(f"Invalid clash matrix entry '{entry.strip()}'.")
+        for name in names:
+            if name not in CATEGORY_TYPES:
+                raise ValueError(
+                    f"Unknown category '{name}', expected one of "
+                    f"{', '.join(CATEGORY_TYPES)}."
+                )
+        if tuple(names) not in pairs:
+            pairs.append(tuple(names))
+    return pairs
+
+
+def parse_categories(categories: str) -> List[str]:
+    """
+    Parse a comma separated list of category names such as "ducts, pipes".
+
+    Raises:
+        ValueError: If a name is not a known category.
+    """
+    names = []
+    for entry in categories.split(MATRIX_SEPARATOR):
+        name = entry.strip().lower()
+        if not name:
+            continue
+        if name not in CATEGORY_TYPES:
+            raise ValueError(
+                f"Unknown category '{name}', expected one of {', '.join(CATEGORY_TYPES)}."
+            )
+        if name not in names:
+            names.append(name)
+    return names
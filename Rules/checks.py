@@ -1,8 +1,51 @@
 # Required imports
-from typing import Callable, List, Union
+from typing import Callable, FrozenSet, List, NamedTuple, Optional, Tuple, Union
 
 from specklepy.objects import Base
 
+# Relative cost of a check; cheaper checks run first when rules are combined.
+TYPE_CHECK_COST = 0
+MEMBER_CHECK_COST = 1
+CUSTOM_CHECK_COST = 2
+
+
+class CheckRule(NamedTuple):
+    """A named check on a Speckle object, with what a rule plan needs to know about it.
+
+    Rules are still plain callables, so they can be used anywhere a predicate is
+    expected; the extra fields let `Rules.actions.RuleRouter` order and share them.
+    """
+
+    name: str
+    check: Callable[[Base], bool]
+    cost: int = CUSTOM_CHECK_COST
+    # The only speckle_types the check can pass for, None when it does not
+    # depend on the type alone.
+    types: Optional[FrozenSet[str]] = None
+    # The checks of a combined rule, all of which must pass.
+    parts: Tuple["CheckRule", ...] = ()
+
+    def __call__(self, obj: Base) -> bool:
+        return self.check(obj)
+
+    def flatten(self) -> Tuple["CheckRule", ...]:
+        """Get the individual checks of this rule, cheapest first."""
+        if not self.parts:
+            return (self,)
+        checks = [check for part in self.parts for check in part.flatten()]
+        return tuple(sorted(checks, key=lambda check: check.cost))
+
+
+def as_check_rule(rule: Callable[[Base], bool]) -> CheckRule:
+    """Wrap a plain predicate so it can take part in a rule plan."""
+    if isinstance(rule, CheckRule):
+        return rule
+    return CheckRule(getattr(rule, "__name__", "check"), rule)
+
+
+def _is_displayable(obj: Base) -> bool:
+    return bool(getattr(obj, "displayValue", None))
+
 
 # We're going to define a set of rules that will allow us to filter and
 # process parameters in our Speckle objects. These rules will be encapsulated
@@ -12,38 +55,63 @@ from specklepy.objects import Base
 class ElementCheckRules:
     """A collection of rules for processing parameters in Speckle objects.
 
-    This class provides static methods that return lambda functions. These
-    lambda functions serve as filters or conditions we can use in our main
+    This class provides static methods that return `CheckRule` predicates. These
+    predicates serve as filters or conditions we can use in our main
     processing logic. By encapsulating these rules, we can easily extend
     or modify them in the future.
     """
 
     @staticmethod
-    def rule_combiner(*rules: Callable[[Base], bool]) -> Callable[[Base], bool]:
+    def rule_combiner(*rules: Callable[[Base], bool]) -> CheckRule:
+        """Rule: all of the given rules pass, checked cheapest first."""
+        parts = tuple(as_check_rule(rule) for rule in rules)
+        checks = tuple(
+            sorted(
+                (check for part in parts for check in part.flatten()),
+                key=lambda check: check.cost,
+            )
+        )
+
+        type_sets = [check.types for check in checks if check.types is not None]
+        types = frozenset.intersection(*type_sets) if type_sets else None
+
         def combined(obj: Base) -> bool:
-            return all(rule(obj) for rule in rules)
+            for check in checks:
+                if not check.check(obj):
+                    return False
+            return True
 
-        return combined
+        return CheckRule(
+            " and ".join(check.name for check in checks),
+            combined,
+            cost=max((check.cost for check in checks), default=TYPE_CHECK_COST),
+            types=types,
+            parts=parts,
+        )
 
     @staticmethod
-    def is_displayable_rule() -> Callable[[Base], bool]:
+    def is_displayable_rule() -> CheckRule:
         """Rule: Check if a parameter is displayable."""
-        return (
-            lambda parameter: parameter.displayValue
-                              and parameter.displayValue is not None
-        )
+        return CheckRule("is_displayable", _is_displayable, cost=MEMBER_CHECK_COST)
 
     @staticmethod
     def speckle_type_rule(
             desired_type: Union[str, List[str]]
-    ) -> Callable[[Base], bool]:
+    ) -> CheckRule:
         """Rule: Check if a parameter's speckle_type matches the desired type."""
 
-        # Convert single string to list for consistent handling
+        # Convert single string to a set for consistent handling and O(1) lookups
         if isinstance(desired_type, str):
             desired_type = [desired_type]
+        types = frozenset(desired_type)
+
+        def has_type(speckle_object: Base) -> bool:
+            return getattr(speckle_object, "speckle_type", None) in types
 
-        return (
-            lambda speckle_object: getattr(speckle_object, "speckle_type", None)
-                                   in desired_type
+        short_names = sorted({speckle_type.split(".")[-1] for speckle_type in types})
+        return CheckRule(
+            "speckle_type:" + ",".join(short_names),
+            has_type,
+            cost=TYPE_CHECK_COST,
+            types=types,
         )
@@ -0,0 +1,138 @@
+"""Iterative traversal of Speckle object trees with member lookup cached per type."""
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from specklepy.objects import Base
+from specklepy.objects.other import Instance, Transform
+
+# Types made of geometry only, which never host other elements.
+GEOMETRY_TYPE_PREFIXES: Tuple[str, ...] = ("Objects.Geometry.",)
+
+
+class TypeRule(NamedTuple):
+    """How the traversal handles every object of one speckle_type."""
+
+    instance: bool  # yield the definition in place of the object itself
+    descend: bool  # the object's children can contain a target
+
+
+def prune_type_prefixes(*prefixes: str) -> Callable[[str], bool]:
+    """Rule: prune the children of objects whose speckle_type starts with a prefix.
+
+    Inheritance chains such as "Objects.BuiltElements.Duct:...RevitDuct" are matched
+    on any of their links.
+    """
+
+    def prune(speckle_type: str) -> bool:
+        return any(
+            link.startswith(prefixes) for link in speckle_type.split(":")
+        )
+
+    return prune
+
+
+class TraversalEngine:
+    def __init__(self, prune: Optional[Callable[[str], bool]] = None):
+        """
+        Initialize a traversal of Speckle object trees.
+
+        What to do with an object depends only on its class and speckle_type, so it
+        is worked out once per type and cached: whether the object is an instance
+        to resolve and whether its children are visited at all. Children are found
+        by scanning the object's own members rather than `dir()`, and the tree is
+        walked with an explicit stack, so its depth is not bounded by the recursion
+        limit.
+
+        Args:
+        prune (Optional[Callable[[str], bool]]): Returns True for a speckle_type
+            whose children cannot contain any object of interest. The object itself
+            is still yielded. Everything is visited when not given.
+        """
+        self.prune = prune
+        self._rules: Dict[Tuple[type, str], TypeRule] = {}
+
+    def rule(self, base: Base) -> TypeRule:
+        """Get the cached rule for the type of `base`."""
+        speckle_type = getattr(base, "speckle_type", "")
+        key = (type(base), speckle_type)
+        rule = self._rules.get(key)
+        if rule is None:
+            rule = self._rules[key] = TypeRule(
+                instance=isinstance(base, Instance),
+                descend=not (self.prune and self.prune(speckle_type)),
+            )
+        return rule
+
+    def traverse(
+        self,
+        base: Base,
+        inherited_instance_id: Optional[str] = None,
+        transform_list: Optional[List[Transform]] = None,
+        release: bool = False,
+        groups: bool = False,
+    ) -> Iterator[Tuple]:
+        """
+        Yield every object of a tree with its identifier and accumulated transforms.
+
+        Objects come in the same depth-first order as a recursive walk: an object,
+        then its `elements` (or `@elements`) and then its `@`-prefixed members that
+        hold elements, in name order. Instances are replaced by their definition,
+        which inherits the instance's id and has the instance transform appended.
+
+        Args:
+            base (Base): The root of the tree.
+            inherited_instance_id (Optional[str]): Identifier for a root without an id.
+            transform_list (Optional[List[Transform]]): Transforms applying to the root.
+            release (bool): Detach every child from its parent's `elements` list once
+                it is reached, so objects the caller has finished with can be freed
+                while the traversal continues. Instance definitions, which may be
+                shared, are never detached.
+            groups (bool): Also yield the instance group of every object: the id of
+                the outermost instance it is part of, or None.
+
+        Yields:
+            Tuple[Base, str, List[Transform]]: An object, its identifier and the
+                transforms from the root down to it. Siblings share the list. With
+                `groups`, the instance group follows as a fourth item.
+        """
+        stack = [(base, inherited_instance_id, transform_list or [], release, None)]
+        del base
+
+        while stack:
+            node, inherited_id, transforms, detach, group = stack.pop()
+            current_id = getattr(node, "id", inherited_id)
+            rule = self.rule(node)
+
+            if rule.instance:
+                if node.transform:
+                    transforms = transforms + [node.transform]
+                if node.definition:
+                    stack.append(
+                        (node.definition, current_id, transforms, False, group or current_id)
+                    )
+                continue
+
+            if groups:
+                yield node, current_id, transforms, group
+            else:
+                yield node, current_id, transforms
+
+            if not rule.descend:
+                continue
+
+            members = node.__dict__
+            children = []
+            elements = members.get("elements") or members.get("@elements") or []
+            for index, element in enumerate(elements):
+                if isinstance(element, Base):
+                    children.append((element, current_id, transforms, detach, group))
+                if detach and isinstance(elements, list):
+                    elements[index] = None
+
+            # Older Revit commits nest category containers under '@'-prefixed members.
+            for name in sorted(name for name in members if name.startswith("@")):
+                value = members[name]
+                if isinstance(value, Base) and hasattr(value, "elements"):
+                    children.append((value, current_id, transforms, detach, group))
+
+            stack.extend(reversed(children))
+            del node, children
@@ -0,0 +1,243 @@
+"""Persistent local object cache for `operations.receive`."""
+import json
+import os
+import sqlite3
+from typing import Dict, List, Optional, Set
+
+from specklepy.logging.exceptions import SpeckleException
+from specklepy.transports.abstract_transport import AbstractTransport
+
+# Location of the cache, overridable for deployments with a persistent volume.
+DEFAULT_OBJECT_CACHE_PATH = os.environ.get(
+    "CLASH_OBJECT_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "speckle-clash", "objects.sqlite"),
+)
+DEFAULT_MAX_CACHE_BYTES = 4 * 1024 ** 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS objects_last_used ON objects (last_used);
+"""
+
+
+class LocalCacheTransport(AbstractTransport):
+    def __init__(
+        self,
+        path: str = DEFAULT_OBJECT_CACHE_PATH,
+        max_bytes: int = DEFAULT_MAX_CACHE_BYTES,
+        name: str = "LocalCache",
+    ) -> None:
+        """
+        Initialize a size-bounded SQLite cache of serialized Speckle objects.
+
+        Passed as the local transport of `operations.receive`, it is checked before
+        the server: a cached root object is deserialized without any download, and
+        `ServerTransport.copy_object_and_children` only fetches the children the
+        cache does not have. Objects are evicted least recently used first when
+        `evict` is called. Closing only records which objects this session used, so
+        a receive still running on another connection never loses objects to it;
+        call `evict` once no receive is using the cache any more.
+
+        Args:
+        path (str): Database file, or ":memory:" for a cache local to this object.
+        max_bytes (int): Size of the serialized objects kept after eviction.
+        name (str): Transport name reported to specklepy.
+        """
+        super().__init__()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._name = name
+        self.path = path
+        self.max_bytes = max_bytes
+        # Concurrent receives each open their own connection to the same file.
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+        (clock,) = self.connection.execute(
+            "SELECT COALESCE(MAX(last_used), 0) FROM objects"
+        ).fetchone()
+        self._clock = clock + 1  # every use in this session shares one timestamp
+        self._pending: List[tuple] = []
+        self._touched: Set[str] = set()
+        # Objects whose whole closure is known to be cached.
+        self._complete: Set[str] = set()
+        # Objects written in this session; lookups of them are not counted, so the
+        # hit rate only reflects objects the cache held before the session.
+        self._saved: Set[str] = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def __repr__(self) -> str:
+        return f"LocalCacheTransport(path: '{self.path}')"
+
+    def begin_write(self) -> None:
+        self._pending = []
+
+    def end_write(self) -> None:
+        if self._pending:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?)", self._pending
+                )
+        self._pending = []
+
+    def save_object(self, id: str, serialized_object: str) -> None:
+        self._pending.append(
+            (id, serialized_object, len(serialized_object), self._clock)
+        )
+        self._saved.add(id)
+
+    def save_object_from_transport(
+        self, id: str, source_transport: AbstractTransport
+    ) -> None:
+        self.save_object(id, source_transport.get_object(id))
+        self.end_write()
+
+    def get_object(self, id: str) -> Optional[str]:
+        row = self.connection.execute(
+            "SELECT content FROM objects WHERE hash = ?", (id,)
+        ).fetchone()
+        if id in self._complete:
+            self._touched.add(id)
+            return row[0] if row else None
+
+        # A root object only counts when all of its children survived eviction;
+        # otherwise `operations.receive` would deserialize a partial tree.
+        counted = id not in self._saved
+        if row is None or not self._closure_cached(id, row[0]):
+            self.misses += counted
+            return None
+
+        self.hits += counted
+        self._touched.add(id)
+        return row[0]
+
+    def has_objects(self, id_list: List[str]) -> Dict[str, bool]:
+        found = self._cached(id_list)
+        counted = [id for id in id_list if id not in self._saved]
+        self.hits += sum(id in found for id in counted)
+        self.misses += sum(id not in found for id in counted)
+        self._touched.update(found)
+        return {id: id in found for id in id_list}
+
+    def copy_object_and_children(
+        self, id: str, target_transport: AbstractTransport
+    ) -> str:
+        root = self.get_object(id)
+        if root is None:
+            raise SpeckleException(
+                f"Can't copy object {id}: it or one of its children is not cached."
+            )
+
+        children = list(json.loads(root).get("__closure") or {})
+        missing = [
+            child for child, found in target_transport.has_objects(children).items() if not found
+        ]
+
+        target_transport.begin_write()
+        for start in range(0, len(missing), 500):
+            batch = missing[start: start + 500]
+            placeholders = ",".join("?" * len(batch))
+            for hash, content in self.connection.execute(
+                f"SELECT hash, content FROM objects WHERE hash IN ({placeholders})", batch
+            ):
+                target_transport.save_object(hash, content)
+        target_transport.save_object(id, root)
+        target_transport.end_write()
+        return root
+
+    def _cached(self, id_list: List[str]) -> Set[str]:
+        found = set()
+        for start in range(0, len(id_list), 500):
+            batch = id_list[start: start + 500]
+            placeholders = ",".join("?" * len(batch))
+            found.update(
+                hash
+                for (hash,) in self.connection.execute(
+                    f"SELECT hash FROM objects WHERE hash IN ({placeholders})", batch
+                )
+            )
+        return found
+
+    def _closure_cached(self, id: str, content: str) -> bool:
+        closure = []
+        if "__closure" in content:
+            closure = list(json.loads(content).get("__closure") or {})
+        found = self._cached(closure)
+        if len(found) < len(closure):
+            return False
+
+        self._touched.update(found)
+        self._complete.add(id)
+        self._complete.update(closure)
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        (size,) = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM objects"
+        ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "bytes": size,
+        }
+
+    def record_uses(self) -> None:
+        """Mark the objects this session used as recently used."""
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE objects SET last_used = ? WHERE hash = ?",
+                [(self._clock, id) for id in self._touched],
+            )
+        self._touched = set()
+
+    def evict(self) -> None:
+        """Record this session's uses and drop the least recently used objects."""
+        self.record_uses()
+        with self.connection:
+            (size,) = self.connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM objects"
+            ).fetchone()
+            excess = size - self.max_bytes
+            if excess <= 0:
+                return
+
+            rows = self.connection.execute(
+                "SELECT hash, size FROM objects ORDER BY last_used"
+            )
+            victims = []
+            for hash, object_size in rows:
+                if excess <= 0:
+                    break
+                victims.append((hash,))
+                excess -= object_size
+            self.connection.executemany("DELETE FROM objects WHERE hash = ?", victims)
+            self.evictions += len(victims)
+        self._complete.clear()
+
+    def close(self) -> None:
+        if self.connection:
+            self.record_uses()
+            self.connection.close()
+            self.connection = None
+
+    def __enter__(self) -> "LocalCacheTransport":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
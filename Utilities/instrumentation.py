@@ -0,0 +1,224 @@
+"""Lightweight timing, memory and counter instrumentation of the pipeline stages."""
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def peak_rss_mb(children: bool = False) -> Optional[float]:
+    """
+    Peak resident set size of this process, or of its terminated worker processes.
+
+    Returns:
+        Optional[float]: The peak in MB, or None where the platform cannot tell.
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is in kB on Linux.
+    return usage.ru_maxrss / 1024
+
+
+def current_rss_mb() -> Optional[float]:
+    """
+    Resident set size of this process right now.
+
+    Returns:
+        Optional[float]: The size in MB, or None where the platform cannot tell.
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            resident_pages = int(file.read().split()[1])
+    except (OSError, ValueError, IndexError):  # /proc only exists on Linux
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+
+
+class Span:
+    """Wall time, CPU time, memory growth and item counts of one timed stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.calls = 0
+        self.rss_growth_mb: Optional[float] = None  # summed over calls
+        self.rss_mb: Optional[float] = None  # at the end of the last call
+        self.items: Counter = Counter()
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add `value` to the item count `name` of the stage."""
+        self.items[name] += value
+
+    def to_dict(self) -> dict:
+        return {
+            "wall_seconds": round(self.wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "calls": self.calls,
+            "rss_growth_mb": (
+                None if self.rss_growth_mb is None else round(self.rss_growth_mb, 3)
+            ),
+            "rss_mb": None if self.rss_mb is None else round(self.rss_mb, 3),
+            "items": dict(self.items),
+        }
+
+
+class _NullSpan:
+    """A span that records nothing."""
+
+    def count(self, name: str, value: int = 1) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *_) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Instrumentation:
+    def __init__(self):
+        """
+        Collect per-stage timings and counters of one run.
+
+        Spans of the same name, such as one per clash pair, add up into one stage.
+        Every span records how much the resident memory of the process grew while
+        it ran. Spans may run on several threads at once; their CPU time and memory
+        growth are those of the whole process, so overlapping stages count each
+        other's.
+        """
+        self.spans: Dict[str, Span] = {}
+        self.counters: Counter = Counter()
+        self.details: Dict[str, List[Any]] = defaultdict(list)
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[Span]:
+        """Time the body as stage `name`; the yielded span takes item counts."""
+        with self._lock:
+            span = self.spans.setdefault(name, Span(name))
+        wall, cpu, rss = time.perf_counter(), time.process_time(), current_rss_mb()
+        try:
+            yield span
+        finally:
+            elapsed_wall = time.perf_counter() - wall
+            elapsed_cpu = time.process_time() - cpu
+            end_rss = current_rss_mb()
+            with self._lock:
+                span.wall_seconds += elapsed_wall
+                span.cpu_seconds += elapsed_cpu
+                span.calls += 1
+                if rss is not None and end_rss is not None:
+                    span.rss_growth_mb = (span.rss_growth_mb or 0.0) + end_rss - rss
+                    span.rss_mb = end_rss
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add `value` to the run-wide counter `name`."""
+        with self._lock:
+            self.counters[name] += value
+
+    def merge(self, counters: Mapping[str, int], prefix: str = "") -> None:
+        """Add counters gathered elsewhere, such as in pool workers, to the run's."""
+        with self._lock:
+            for name, value in counters.items():
+                self.counters[prefix + name] += value
+
+    def detail(self, name: str, value: Any) -> None:
+        """Keep a JSON-serializable record under `name`, such as one per clash pair."""
+        with self._lock:
+            self.details[name].append(value)
+
+    def to_dict(self) -> dict:
+        return {
+            "wall_seconds": round(time.perf_counter() - self.started, 6),
+            "peak_rss_mb": peak_rss_mb(),
+            "worker_peak_rss_mb": peak_rss_mb(children=True),
+            "stages": {name: span.to_dict() for name, span in self.spans.items()},
+            "counters": dict(self.counters),
+            "details": dict(self.details),
+        }
+
+    def summary(self) -> str:
+        """One line with the wall time of every stage and the peak memory."""
+        stages = ", ".join(
+            f"{name} {span.wall_seconds:.1f}s" for name, span in self.spans.items()
+        )
+        peak = peak_rss_mb()
+        memory = f" Peak memory {peak:.0f} MB." if peak is not None else ""
+        return f"Timings: {stages}.{memory}"
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+
+class NullInstrumentation(Instrumentation):
+    """Instrumentation that is switched off: every call returns straight away."""
+
+    def span(self, name: str) -> _NullSpan:
+        return _NULL_SPAN
+
+    def count(self, name: str, value: int = 1) -> None:
+        pass
+
+    def merge(self, counters: Mapping[str, int], prefix: str = "") -> None:
+        pass
+
+    def detail(self, name: str, value: Any) -> None:
+        pass
+
+
+NO_INSTRUMENTATION = NullInstrumentation()
+
+# Instrumentation of the running function, read by the stages deep in the pipeline
+# so it need not be passed down every call. Off unless `instrument` switches it on.
+_active: Instrumentation = NO_INSTRUMENTATION
+
+
+def active() -> Instrumentation:
+    """The instrumentation of the running function."""
+    return _active
+
+
+@contextmanager
+def instrument(enabled: bool = True) -> Iterator[Instrumentation]:
+    """Record the stages run in the body, or nothing when not `enabled`."""
+    global _active
+    previous = _active
+    _active = Instrumentation() if enabled else NO_INSTRUMENTATION
+    try:
+        yield _active
+    finally:
+        _active = previous
+
+
+def span(name: str):
+    """Time the body as stage `name` of the active instrumentation."""
+    return _active.span(name)
+
+
+def count(name: str, value: int = 1) -> None:
+    """Add to counter `name` of the active instrumentation."""
+    _active.count(name, value)
+
+
+def merge(counters: Mapping[str, int], prefix: str = "") -> None:
+    """Add counters gathered in workers to the active instrumentation."""
+    _active.merge(counters, prefix)
+
+
+def detail(name: str, value: Any) -> None:
+    """Keep a record under `name` in the active instrumentation."""
+    _active.detail(name, value)
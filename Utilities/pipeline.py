@@ -0,0 +1,64 @@
+"""Bounded producer/consumer stage for streaming object processing."""
+import queue
+import threading
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+# Items a producer may run ahead of its consumer.
+DEFAULT_MAX_PENDING = 256
+
+# Seconds between checks of whether the consumer has gone away.
+_PUT_TIMEOUT = 0.1
+
+
+def prefetch(items: Iterable[T], max_pending: int = DEFAULT_MAX_PENDING) -> Iterator[T]:
+    """
+    Iterate `items` on a background thread, at most `max_pending` items ahead.
+
+    The consumer works on one item while the producer prepares the next ones, and
+    the bounded queue keeps a fast producer from holding the whole input in memory.
+    Exceptions raised by the producer are re-raised in the consumer.
+
+    Args:
+        items (Iterable[T]): Typically a generator doing traversal or I/O.
+        max_pending (int): Size of the queue between the two threads.
+
+    Yields:
+        T: The items, in order.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=max_pending)
+    stop = threading.Event()
+
+    def put(entry) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put((True, item)):
+                    return
+        except BaseException as ex:  # handed over to the consumer
+            put((False, ex))
+            return
+        put((False, None))
+
+    threading.Thread(target=produce, daemon=True).start()
+
+    try:
+        while True:
+            has_item, value = buffer.get()
+            if not has_item:
+                if value is not None:
+                    raise value
+                return
+            yield value
+            value = None  # do not keep the item alive while waiting for the next
+    finally:
+        stop.set()
@@ -0,0 +1,214 @@
+"""
+Offline benchmark of the clash pipeline on synthetic beam and duct models.
+
+Every stage of a run, from flattening the received Speckle trees to reporting the
+clashes, is timed separately so regressions can be traced to one stage:
+
+    python -m benchmarks.run --sizes 1000 10000 100000 --output results.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager, redirect_stdout
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from benchmarks.synthetic import beam_and_duct_models
+from Geometry.broad_phase import broad_phase
+from Geometry.clash import ClashMode, ClashSettings, narrow_phase
+from Geometry.reporting import report_clashes
+from Geometry.element import speckle_to_element
+from Geometry.store import PackedModel
+from Rules.actions import RuleRouter
+from Rules.categories import category_rules
+from Utilities.flatten import extract_base_and_transform
+
+STAGES = ("extract", "rules", "convert", "pack", "broad_phase", "narrow_phase", "report")
+
+
+class RecordingContext:
+    """Stands in for the AutomationContext and keeps the attached results."""
+
+    def __init__(self):
+        self.errors = []
+        self.files = []
+
+    def attach_error_to_objects(self, category: str, object_ids: List[str], message: str):
+        self.errors.append((category, object_ids, message))
+
+    def store_file_result(self, path: str):
+        self.files.append(path)
+
+
+@contextmanager
+def stage(stages: Dict[str, dict], name: str) -> Iterator[dict]:
+    """Time the body under `name`; the yielded dict takes extra figures of the stage."""
+    record = {}
+    start = time.perf_counter()
+    yield record
+    stages[name] = {"seconds": round(time.perf_counter() - start, 6), **record}
+
+
+def run_benchmark(
+    size: int,
+    clash_density: float = 0.1,
+    instance_fraction: float = 0.5,
+    sides: int = 6,
+    mode: ClashMode = ClashMode.HARD,
+    max_workers: Optional[int] = None,
+    seed: int = 0,
+) -> dict:
+    """
+    Run the clash pipeline once on a synthetic model pair of `size` elements.
+
+    Half of the elements are beams in the reference model and the rest ducts in the
+    changed model.
+
+    Returns:
+        dict: The element counts, the timings and figures of every stage, and the
+            found against the expected clash count.
+    """
+    beam_count = size // 2
+    models = beam_and_duct_models(
+        beam_count, size - beam_count, clash_density, instance_fraction, sides, seed
+    )
+    stages = {}
+
+    with stage(stages, "extract") as record:
+        flattened = {
+            "beams": list(extract_base_and_transform(models.reference, groups=True)),
+            "ducts": list(extract_base_and_transform(models.latest, groups=True)),
+        }
+        record["objects"] = sum(len(objects) for objects in flattened.values())
+
+    with stage(stages, "rules") as record:
+        selected = {}
+        for name, objects in flattened.items():
+            router = RuleRouter(category_rules([name]))
+            selected[name] = [item for _, item in router.route(objects, key=lambda item: item[0])]
+        record["elements"] = sum(len(items) for items in selected.values())
+
+    with stage(stages, "convert") as record:
+        geometry_cache = {}
+        elements = {
+            name: [speckle_to_element(item, geometry_cache) for item in items]
+            for name, items in selected.items()
+        }
+        record["distinct_meshes"] = len(geometry_cache)
+
+    with stage(stages, "pack") as record:
+        reference = PackedModel.from_elements(elements["beams"])
+        latest = PackedModel.from_elements(elements["ducts"])
+        record["meshes"] = reference.store.mesh_count + latest.store.mesh_count
+
+    settings = ClashSettings(mode=mode)
+    with stage(stages, "broad_phase") as record:
+        pairs, stats = broad_phase(
+            reference.bounds, latest.bounds, 0.0, reference.index, latest.index
+        )
+        record["candidate_pairs"] = stats.candidate_pairs
+        record["total_pairs"] = stats.total_pairs
+
+    with stage(stages, "narrow_phase") as record:
+        clashing_pairs = narrow_phase(reference, latest, pairs, settings, max_workers)
+        clashes = [
+            (reference.ids[ref_index], latest.ids[latest_index])
+            for ref_index, latest_index in clashing_pairs
+        ]
+        record["clashes"] = len(clashes)
+
+    with stage(stages, "report") as record:
+        # Duct instances share the id of their family, so they are grouped by
+        # placement as the pipeline does.
+        reference_keys, latest_keys = reference.placement_keys(), latest.placement_keys()
+        object_ids = dict(zip(reference_keys, reference.ids))
+        object_ids.update(zip(latest_keys, latest.ids))
+        context = RecordingContext()
+        report = report_clashes(
+            [
+                (reference_keys[ref_index], latest_keys[latest_index])
+                for ref_index, latest_index in clashing_pairs
+            ],
+            context,
+            object_ids=object_ids,
+        )
+        record["groups"] = report.groups
+        record["results"] = report.results
+        record["object_ids"] = report.object_ids
+
+    return {
+        "size": size,
+        "beams": len(elements["beams"]),
+        "ducts": len(elements["ducts"]),
+        "stages": stages,
+        "total_seconds": round(sum(timing["seconds"] for timing in stages.values()), 6),
+        "clashes": len(clashes),
+        "expected_clashes": len(models.expected_clashes),
+        "correct": sorted(clashes) == sorted(models.expected_clashes),
+    }
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--clash-density", type=float, default=0.1)
+    parser.add_argument("--instance-fraction", type=float, default=0.5)
+    parser.add_argument("--sides", type=int, default=6)
+    parser.add_argument("--mode", choices=[mode.value for mode in ClashMode], default="hard")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file to write, defaults to stdout.")
+    args = parser.parse_args(argv)
+
+    results = {
+        "parameters": {
+            "clash_density": args.clash_density,
+            "instance_fraction": args.instance_fraction,
+            "sides": args.sides,
+            "mode": args.mode,
+            "workers": args.workers,
+            "seed": args.seed,
+        },
+        "environment": environment(),
+        "runs": [],
+    }
+    for size in args.sizes:
+        print(f"Benchmarking {size} elements...", file=sys.stderr)
+        # The pipeline logs to stdout, which is kept for the results.
+        with redirect_stdout(sys.stderr):
+            results["runs"].append(
+                run_benchmark(
+                    size,
+                    args.clash_density,
+                    args.instance_fraction,
+                    args.sides,
+                    ClashMode(args.mode),
+                    args.workers,
+                    args.seed,
+                )
+            )
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+    return results
+
+
+if __name__ == "__main__":
+    main()
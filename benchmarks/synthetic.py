@@ -0,0 +1,175 @@
+"""Synthetic Speckle models of beams crossed by ducts, for offline benchmarks."""
+import math
+from typing import List, NamedTuple, Tuple
+
+import numpy as np
+from specklepy.objects import Base
+from specklepy.objects.geometry import Mesh
+from specklepy.objects.other import RevitInstance, Transform
+
+BEAM_TYPE = "Objects.BuiltElements.Beam:Objects.BuiltElements.Revit.RevitBeam"
+DUCT_TYPE = "Objects.BuiltElements.Duct:Objects.BuiltElements.Revit.RevitDuct"
+SYMBOL_TYPE = (
+    "Objects.BuiltElements.Revit.RevitElementType:"
+    "Objects.BuiltElements.Revit.RevitSymbolElementType"
+)
+
+# Layout of the grid, in metres.
+BEAM_LENGTH = 6.0
+BEAM_SPACING_X = 7.0
+BEAM_SPACING_Y = 3.0
+BEAM_LEVEL = 3.0
+DUCT_LENGTH = 2.5
+SECTION_RADIUS = 0.15
+# A near miss runs diagonally past the end of its beam: their bounding boxes
+# overlap, their surfaces stay this far apart along the beam axis.
+NEAR_MISS_OFFSET = 0.6
+CLEAR_RISE = 1.0
+
+
+class SyntheticModels(NamedTuple):
+    """A reference model, a changed model and the clashes expected between them."""
+
+    reference: Base
+    latest: Base
+    expected_clashes: List[Tuple[str, str]]
+
+
+def prism_mesh(sides: int, radius: float, length: float, mesh_id: str) -> Mesh:
+    """
+    Build a prism along x with a regular n-gon section, centred on the origin.
+
+    The caps are single n-gon faces and the sides are quads, as Revit exports them.
+    """
+    angles = math.pi / 2 + 2 * math.pi * np.arange(sides) / sides
+    section = np.column_stack([np.cos(angles), np.sin(angles)]) * radius
+    vertices = np.concatenate(
+        [
+            np.column_stack([np.full(sides, x), section[:, 1], section[:, 0]])
+            for x in (-length / 2, length / 2)
+        ]
+    )
+
+    faces = [sides, *range(sides - 1, -1, -1), sides, *range(sides, 2 * sides)]
+    for i in range(sides):
+        j = (i + 1) % sides
+        faces += [4, i, j, sides + j, sides + i]
+
+    mesh = Mesh(vertices=vertices.ravel().tolist(), faces=faces, units="m")
+    mesh.id = mesh_id
+    return mesh
+
+
+def placement(x: float, y: float, z: float, angle: float) -> np.ndarray:
+    """A 4x4 rotation about z by `angle` followed by a translation."""
+    cos, sin = math.cos(angle), math.sin(angle)
+    return np.array(
+        [[cos, -sin, 0, x], [sin, cos, 0, y], [0, 0, 1, z], [0, 0, 0, 1]], dtype=float
+    )
+
+
+def placed_mesh(mesh: Mesh, matrix: np.ndarray, mesh_id: str) -> Mesh:
+    """Copy of `mesh` with its vertices moved by `matrix`."""
+    vertices = np.array(mesh.vertices).reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+    placed = Mesh(vertices=vertices.ravel().tolist(), faces=list(mesh.faces), units="m")
+    placed.id = mesh_id
+    return placed
+
+
+def element(speckle_type: str, element_id: str, meshes: List[Mesh]) -> Base:
+    obj = Base.of_type(speckle_type)
+    obj.id = element_id
+    obj["displayValue"] = meshes
+    return obj
+
+
+def collection(name: str, elements: List[Base]) -> Base:
+    root = Base.of_type("Speckle.Core.Models.Collection")
+    root["name"] = name
+    root["elements"] = elements
+    return root
+
+
+def beam_and_duct_models(
+    beam_count: int,
+    duct_count: int,
+    clash_density: float = 0.1,
+    instance_fraction: float = 0.5,
+    sides: int = 6,
+    seed: int = 0,
+) -> SyntheticModels:
+    """
+    Generate a grid of beams and a model of ducts crossing them.
+
+    Every duct crosses one beam of the grid at right angles. A fraction
+    `clash_density` of them runs at the beam level and clashes. Half of the rest are
+    near misses that run diagonally past the end of their beam, so they pass the
+    bounding box test but not the exact one; the others run above the beams.
+
+    Args:
+        beam_count (int): Number of beams in the reference model.
+        duct_count (int): Number of ducts in the changed model.
+        clash_density (float): Fraction of the ducts that clash with a beam.
+        instance_fraction (float): Fraction of the ducts that are instances of a
+            shared family definition rather than standalone elements.
+        sides (int): Vertex count of the element sections; above 4 the caps are
+            n-gons that need ear clipping.
+        seed (int): Seed of the random clash assignment.
+
+    Returns:
+        SyntheticModels: Both models as Speckle object trees and the expected
+            (beam id, duct id) clashes, one per clashing duct.
+    """
+    rng = np.random.default_rng(seed)
+    columns = max(1, math.ceil(math.sqrt(beam_count)))
+
+    beam_mesh = prism_mesh(sides, SECTION_RADIUS, BEAM_LENGTH, "beam-mesh")
+    beams = []
+    beam_origins = []
+    for i in range(beam_count):
+        origin = np.array(
+            [(i % columns) * BEAM_SPACING_X, (i // columns) * BEAM_SPACING_Y, BEAM_LEVEL]
+        )
+        matrix = placement(*(origin + [BEAM_LENGTH / 2, 0, 0]), 0.0)
+        beams.append(
+            element(BEAM_TYPE, f"beam-{i}", [placed_mesh(beam_mesh, matrix, f"beam-mesh-{i}")])
+        )
+        beam_origins.append(origin)
+
+    duct_mesh = prism_mesh(sides, SECTION_RADIUS, DUCT_LENGTH, "duct-mesh")
+    # Every instance places the same family definition.
+    family = element(SYMBOL_TYPE, "duct-family", [duct_mesh])
+
+    ducts = []
+    expected = []
+    kinds = rng.random(duct_count)
+    instances = rng.random(duct_count) < instance_fraction
+    for j in range(duct_count):
+        beam = j % max(beam_count, 1)
+        x, y, z = beam_origins[beam] if beam_count else (0.0, 0.0, BEAM_LEVEL)
+        duct_id = f"duct-{j}"
+
+        if kinds[j] < clash_density:
+            matrix = placement(x + BEAM_LENGTH / 2, y, z, math.pi / 2)
+            if beam_count:
+                # Instances are reported under the id of their definition.
+                expected.append((f"beam-{beam}", family.id if instances[j] else duct_id))
+        elif kinds[j] < clash_density + (1 - clash_density) / 2:
+            matrix = placement(x + BEAM_LENGTH + NEAR_MISS_OFFSET, y, z, math.pi / 4)
+        else:
+            matrix = placement(x + BEAM_LENGTH / 2, y, z + CLEAR_RISE, math.pi / 2)
+
+        if instances[j]:
+            instance = RevitInstance(
+                definition=family, transform=Transform(value=matrix.ravel().tolist())
+            )
+            instance.id = duct_id
+            ducts.append(instance)
+        else:
+            ducts.append(
+                element(DUCT_TYPE, duct_id, [placed_mesh(duct_mesh, matrix, f"{duct_id}-mesh")])
+            )
+
+    return SyntheticModels(
+        collection("Structure", beams), collection("Ducts", ducts), expected
+    )
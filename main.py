@@ -3,8 +3,12 @@
 use the automation_context module to wrap your function in an Automate context helper
 """
 
+import os
+import tempfile
 from collections import defaultdict
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Callable, Dict, Iterator, List, Optional
 
 from pydantic import Field
 from speckle_automate import (
@@ -17,12 +21,26 @@ from specklepy.api.models import Branch
 from specklepy.objects import Base
 from specklepy.objects.other import Transform
 from specklepy.objects.units import Units
+from specklepy.transports.abstract_transport import AbstractTransport
 from specklepy.transports.server import ServerTransport
 
-from Geometry.clash import detect_and_report_clashes
-from Geometry.element import speckle_to_element
-from Rules.checks import ElementCheckRules
+from Geometry.clash import ClashMode, detect_and_report_clashes
+from Geometry.element import Element, convert_length, speckle_to_element
+from Geometry.model_cache import ReferenceModelCache
+from Geometry.result_store import ClashResultStore
+from Geometry.store import PackedModel
+from Rules.actions import RuleRouter
+from Rules.categories import (
+    category_digest,
+    category_rules,
+    parse_categories,
+    parse_clash_matrix,
+)
+from Utilities import instrumentation
+from Utilities.cache_transport import LocalCacheTransport
 from Utilities.flatten import extract_base_and_transform
+from Utilities.instrumentation import Instrumentation, instrument
+from Utilities.pipeline import prefetch
 
 
 class FunctionInputs(AutomateBase):
@@ -41,21 +59,74 @@ class FunctionInputs(AutomateBase):
     tolerance: float = Field(
         default=25.0,
         title="Tolerance",
-        description="Specify the tolerance value for the analysis. \
-        Negative values relaxes the test, positive values make it more strict.",
-        json_schema_extra={
-            "readOnly": True,
-        },
+        description="Clearance required between elements in Clearance mode. \
+        Elements closer to each other than this are reported as clashes.",
     )
     tolerance_unit: str = Field(  # Using the SpecklePy Units enum here
         default=Units.mm,
         title="Tolerance Unit",
         description="Unit of the tolerance value.",
         json_schema_extra={
-          "examples": ["mm", "cm", "m"], 
-          "readOnly": True
+          "examples": ["mm", "cm", "m"],
         },
     )
+    clash_mode: ClashMode = Field(
+        default=ClashMode.HARD,
+        title="Clash Mode",
+        description="Hard: exact triangle intersection test of every pair with overlapping bounds. \
+        Staged: reject pairs with oriented bounding box and convex hull tests first, \
+        which is much faster for box-like elements such as beams and ducts. \
+        Clearance: report pairs closer than the tolerance, including touching ones.",
+    )
+    clash_matrix: str = Field(
+        default="beams x ducts",
+        title="Clash Matrix",
+        description="Comma separated category pairs to clash in one run, such as \
+        'beams x ducts, beams x pipes'. The first category of a pair is taken from the \
+        static model and the second from the changed model. \
+        Categories: beams, columns, ducts, pipes.",
+    )
+    self_clash_categories: str = Field(
+        default="",
+        title="Self Clash Categories",
+        description="Comma separated categories of the changed model, such as \
+        'ducts, pipes', whose elements are also clashed against each other. \
+        Parts of the same block instance are not reported.",
+    )
+    require_volume: bool = Field(
+        default=False,
+        title="Require Intersection Volume",
+        description="Confirm every intersection with a boolean solid of positive \
+        volume. Much slower.",
+    )
+    report_touching: bool = Field(
+        default=False,
+        title="Report Touching Elements",
+        description="Also report elements that touch without overlapping, such as \
+        flush-mounted ones. Only used by the hard and staged modes.",
+    )
+    max_reported_clash_groups: int = Field(
+        default=200,
+        ge=0,
+        title="Max Reported Clash Groups",
+        description="Number of clash groups per clash pair that are highlighted one \
+        by one. Further groups are summarized in one result and listed in full in an \
+        attached file.",
+    )
+    clash_group_distance: float = Field(
+        default=0.0,
+        ge=0.0,
+        title="Clash Group Distance",
+        description="Clashes sharing an element are always reported as one group. \
+        Clashes closer to each other than this distance, in the tolerance unit, are \
+        grouped as well. 0 groups by shared elements only.",
+    )
+    collect_timings: bool = Field(
+        default=True,
+        title="Collect Timings",
+        description="Measure the time and memory every stage of the run takes, \
+        add a summary to the status message and attach the details as a JSON file.",
+    )
 
 
 def automate_function(
@@ -71,128 +142,395 @@ def automate_function(
             It also has convenience methods attach result data to the Speckle model.
         function_inputs: An instance object matching the defined schema.
     """
-    # the context provides a convenient way, to receive the triggering version
-    changed_model_version = automate_context.receive_version()
+    with instrument(function_inputs.collect_timings) as timings:
+        run_clash_detection(automate_context, function_inputs, timings)
 
-    try:
-        reference_model_version, reference_model_id, reference_model_version_id = (
-            get_reference_model(automate_context, function_inputs.static_model_name)
-        )
-        print(
-            f"Reference model id: {reference_model_id}, version id: {reference_model_version_id}"
-        )
 
-    except Exception as ex:
+def run_clash_detection(
+    automate_context: AutomationContext,
+    function_inputs: FunctionInputs,
+    timings: Instrumentation,
+) -> None:
+    """Clash the changed model against the static model and report the results."""
+    try:
+        clash_pairs = parse_clash_matrix(function_inputs.clash_matrix)
+        self_clash_categories = parse_categories(function_inputs.self_clash_categories)
+    except ValueError as ex:
         automate_context.mark_run_failed(status_message=str(ex))
         return
 
-    reference_objects: tuple[
-        Base,
-        str,
-        Optional[Transform],
-    ] = extract_base_and_transform(reference_model_version)
-    latest_objects: tuple[
-        Base,
-        str,
-        Optional[Transform],
-    ] = extract_base_and_transform(changed_model_version)
-
-    element_rules = ElementCheckRules()
-
-    beam_types = [
-        "Objects.BuiltElements.Beam:Objects.BuiltElements.Revit.RevitBeam",
-    ]
-    duct_types = [
-        "Objects.BuiltElements.Duct",
-        "Objects.BuiltElements.Duct:Objects.BuiltElements.Revit.RevitDuct",
-        "Objects.BuiltElements.Duct:Objects.BuiltElements.Revit.RevitDuct:Objects.BuiltElements.Revit.RevitFlexDuct",
-        "Objects.Other.Revit.RevitInstance:Objects.BuiltElements.Revit.RevitMEPFamilyInstance",
-        "Objects.BuiltElements.Revit.RevitElementType:Objects.BuiltElements.Revit.RevitSymbolElementType"
-    ]
-
-    visible_beams_rule = element_rules.rule_combiner(
-        element_rules.speckle_type_rule(beam_types),
-        element_rules.is_displayable_rule(),
+    # Every category is traversed, converted and indexed once, however many
+    # pairs of the matrix it takes part in.
+    reference_categories = category_rules(
+        list(dict.fromkeys(reference for reference, _ in clash_pairs))
     )
-
-    visible_ducts_rule = element_rules.rule_combiner(
-        element_rules.speckle_type_rule(duct_types),
-        element_rules.is_displayable_rule(),
+    latest_categories = category_rules(
+        list(dict.fromkeys([latest for _, latest in clash_pairs] + self_clash_categories))
     )
 
-    reference_displayable_objects = [
-        (base_obj, id, transform)
-        for base_obj, id, transform in reference_objects
-        if visible_beams_rule(base_obj)
-    ]
+    # Both models are network-bound to fetch: each is received and converted on its
+    # own thread, so whichever arrives first is processed while the other downloads.
+    try:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            latest_future = executor.submit(
+                load_changed_elements, automate_context, latest_categories
+            )
+            reference_future = executor.submit(
+                load_reference_models,
+                automate_context,
+                function_inputs.static_model_name,
+                reference_categories,
+            )
+
+            try:
+                reference_models, reference_model_id, reference_model_version_id = (
+                    reference_future.result()
+                )
+            except Exception as ex:
+                automate_context.mark_run_failed(status_message=str(ex))
+                return
+
+            latest_elements = latest_future.result()
+    finally:
+        # Both receives share the object cache: it is only trimmed once neither
+        # of them can still be reading objects from it.
+        evict_object_cache()
+
+    with instrumentation.span("pack changed model"):
+        latest_models = {
+            name: PackedModel.from_elements(latest_elements[name])
+            for name in dict.fromkeys(latest for _, latest in clash_pairs)
+        }
+        # The self-clash categories form one set with one index; an element in
+        # several of them is part of it once.
+        self_clash_model = PackedModel.from_elements(
+            list(
+                {
+                    id(element): element
+                    for name in self_clash_categories
+                    for element in latest_elements[name]
+                }.values()
+            )
+        )
+    del latest_elements
 
-    latest_displayable_objects = [
-        (base_obj, id, transform)
-        for base_obj, id, transform in latest_objects
-        if visible_ducts_rule(base_obj)
-    ]
+    reference_units = next(
+        (model.units for model in reference_models.values() if model.units), None
+    )
+    tolerance = convert_length(
+        function_inputs.tolerance, function_inputs.tolerance_unit, reference_units
+    )
+    group_distance = convert_length(
+        function_inputs.clash_group_distance, function_inputs.tolerance_unit, reference_units
+    )
 
-    reference_mesh_elements = [
-        speckle_to_element(obj) for obj in reference_displayable_objects
+    compared_pairs = [
+        (reference, latest)
+        for reference, latest in clash_pairs
+        if len(reference_models[reference]) and len(latest_models[latest])
     ]
-    latest_mesh_elements = [
-        speckle_to_element(obj) for obj in latest_displayable_objects
-    ]
-
-    tolerance = function_inputs.tolerance
-
-    if len(reference_mesh_elements) == 0 or len(latest_mesh_elements) == 0:
+    if not compared_pairs and len(self_clash_model) < 2:
         automate_context.mark_run_failed(
             status_message="Clash detection failed. No objects to compare."
         )
         return
 
-    clashes = detect_and_report_clashes(
-        reference_mesh_elements, latest_mesh_elements, tolerance, automate_context
-    )
+    # Results of earlier runs comparing the same two models are reused for
+    # every pair of unchanged objects.
+    run_data = automate_context.automation_run_data
+    clashes_by_pair = {}
+    with ClashResultStore() as result_store, ExitStack() as shared_models:
+        # Each category goes to shared memory once for all the pairs it is in.
+        shared_reference = {
+            name: shared_models.enter_context(model.share())
+            for name, model in reference_models.items()
+        }
+        shared_latest = {
+            name: shared_models.enter_context(model.share())
+            for name, model in latest_models.items()
+        }
+
+        for reference, latest in compared_pairs:
+            print(f"Clashing {reference} x {latest}.")
+            clashes_by_pair[reference, latest] = detect_and_report_clashes(
+                shared_reference[reference],
+                shared_latest[latest],
+                tolerance,
+                automate_context,
+                function_inputs.clash_mode,
+                function_inputs.require_volume,
+                function_inputs.report_touching,
+                result_store=result_store,
+                scope=(
+                    f"{run_data.project_id}:{reference_model_id}:{run_data.model_id}"
+                    f":{reference}x{latest}"
+                ),
+                category=f"Clash {reference} x {latest}",
+                max_reported_groups=function_inputs.max_reported_clash_groups,
+                group_distance=group_distance,
+            )
+
+        self_clashes = []
+        if len(self_clash_model) >= 2:
+            self_clash_label = " + ".join(self_clash_categories)
+            print(f"Clashing {self_clash_label} of the changed model among themselves.")
+            # The changed model may be drawn in other units than the reference.
+            self_clashes = detect_and_report_clashes(
+                self_clash_model,
+                None,
+                convert_length(
+                    function_inputs.tolerance,
+                    function_inputs.tolerance_unit,
+                    self_clash_model.units,
+                ),
+                automate_context,
+                function_inputs.clash_mode,
+                function_inputs.require_volume,
+                function_inputs.report_touching,
+                result_store=result_store,
+                scope=(
+                    f"{run_data.project_id}:{run_data.model_id}"
+                    f":self:{'+'.join(self_clash_categories)}"
+                ),
+                category=f"Self clash {self_clash_label}",
+                max_reported_groups=function_inputs.max_reported_clash_groups,
+                group_distance=convert_length(
+                    function_inputs.clash_group_distance,
+                    function_inputs.tolerance_unit,
+                    self_clash_model.units,
+                ),
+            )
+
+    reference_ids = {
+        object_id
+        for reference, _ in compared_pairs
+        for object_id in reference_models[reference].ids
+    }
+    latest_ids = {
+        object_id
+        for _, latest in compared_pairs
+        for object_id in latest_models[latest].ids
+    }
+    clashes = [clash for pair_clashes in clashes_by_pair.values() for clash in pair_clashes]
 
     percentage_reference_objects_clashing = (
         len(set([ref_id for ref_id, latest_id in clashes]))
-        / len(reference_mesh_elements)
+        / max(len(reference_ids), 1)
         * 100
     )
     percentage_latest_objects_clashing = (
         len(set([latest_id for ref_id, latest_id in clashes]))
-        / len(latest_mesh_elements)
+        / max(len(latest_ids), 1)
         * 100
     )
 
     # all clashes count
-    all_objects_count = len(reference_mesh_elements) + len(latest_mesh_elements)
+    all_objects_count = len(reference_ids) + len(latest_ids)
     all_clashes_count = len(clashes)
 
+    pair_counts = ", ".join(
+        f"{reference} x {latest}: {len(pair_clashes)}"
+        for (reference, latest), pair_clashes in clashes_by_pair.items()
+    )
     clash_report_message = (
         f"Clash detection report: {all_clashes_count} clashes found "
-        f"between {all_objects_count} objects. "
+        f"between {all_objects_count} objects ({pair_counts}). "
         f"Percentage of reference objects clashing: "
         f"{percentage_reference_objects_clashing}%. "
         f"Percentage of latest objects clashing: "
         f"{percentage_latest_objects_clashing}%."
     )
+    if self_clashes:
+        clash_report_message += (
+            f" {len(self_clashes)} clashes within the changed model "
+            f"({' + '.join(self_clash_categories)})."
+        )
 
     reference_view = [f"{reference_model_id}@{reference_model_version_id}"]
 
     automate_context.set_context_view(reference_view)
 
     automate_context.mark_run_success(
-        status_message="Clash detection completed. " + clash_report_message
+        status_message="Clash detection completed. "
+        + clash_report_message
+        + report_timings(automate_context, timings)
     )
 
 
-def get_reference_model(
+def report_timings(automate_context: AutomationContext, timings: Instrumentation) -> str:
+    """Attach the collected timings to the run as a JSON file and summarize them.
+
+    Returns:
+        The summary to append to the status message, empty when nothing was collected.
+    """
+    if not timings.spans:
+        return ""
+
+    path = os.path.join(tempfile.mkdtemp(), "clash_timings.json")
+    timings.write_json(path)
+    try:
+        automate_context.store_file_result(path)
+    except Exception as ex:
+        # The timings are a diagnostic, not worth failing a completed run for.
+        print(f"Could not attach the timings: {ex}")
+    return " " + timings.summary()
+
+
+def convert_elements(
+    model_version: Base,
+    categories: Dict[str, Callable[[Base], bool]],
+    label: str = "model",
+) -> Dict[str, List[Element]]:
+    """Stream a received model through traversal, classification and conversion.
+
+    The traversal runs ahead on its own thread, at most a bounded number of objects
+    ahead of the conversion, and detaches objects from the tree once they have been
+    traversed. Nothing but the converted elements outlives its conversion, so the
+    caller must not keep its own reference to `model_version`.
+
+    Every object is classified into all `categories` in the same pass and converted
+    once, however many categories it belongs to. Traversal and conversion overlap,
+    so they are timed together as one stage named after `label`.
+    """
+    objects: Iterator[tuple[
+        Base,
+        str,
+        Optional[Transform],
+        Optional[str],
+    ]] = extract_base_and_transform(model_version, release=True, groups=True)
+    del model_version
+
+    router = RuleRouter(categories)
+    routed_objects = prefetch(router.route(objects, key=lambda record: record[0]))
+
+    # Instances of one block definition convert its meshes once and share them.
+    geometry_cache = {}
+    elements: Dict[str, List[Element]] = {name: [] for name in categories}
+    with instrumentation.span(f"convert {label}") as span:
+        for names, obj in routed_objects:
+            element = speckle_to_element(obj, geometry_cache)
+            for name in names:
+                elements[name].append(element)
+        span.count("objects", sum(router.type_counts.values()))
+        span.count("elements", sum(len(category) for category in elements.values()))
+        span.count("distinct_meshes", len(geometry_cache))
+
+    print(router.report())
+    return elements
+
+
+def receive_through_cache(
+    label: str, receive: Callable[[AbstractTransport], Base]
+) -> Base:
+    """Run `receive` with a local object cache and report the cache's hit rate."""
+    # Objects that did not change since an earlier run come from the local cache.
+    with LocalCacheTransport() as object_cache, instrumentation.span(
+        f"receive {label}"
+    ) as span:
+        model_version = receive(object_cache)
+
+        cache_stats = object_cache.stats()
+        span.count("cache_hits", cache_stats["hits"])
+        span.count("cache_misses", cache_stats["misses"])
+        print(
+            f"Object cache ({label}): {cache_stats['hits']} hits, "
+            f"{cache_stats['misses']} misses ({cache_stats['hit_rate']:.1%} hit rate)."
+        )
+
+    return model_version
+
+
+def evict_object_cache() -> None:
+    """Trim the local object cache to its size limit."""
+    with LocalCacheTransport() as object_cache:
+        object_cache.evict()
+        print(f"Object cache: {object_cache.evictions} evictions.")
+
+
+def load_changed_elements(
+    automate_context: AutomationContext,
+    categories: Dict[str, Callable[[Base], bool]],
+) -> Dict[str, List[Element]]:
+    """Receive the changed model and convert its objects of every category."""
+    # The model is handed straight to the conversion, which holds the only reference.
+    return convert_elements(
+        receive_through_cache(
+            "changed model",
+            lambda transport: receive_changed_model(automate_context, transport),
+        ),
+        categories,
+        "changed model",
+    )
+
+
+def load_reference_models(
+    automate_context: AutomationContext,
+    static_model_name: str,
+    categories: Dict[str, Callable[[Base], bool]],
+) -> tuple[Dict[str, PackedModel], str, str]:
+    """Resolve the static model and load every category of its latest version.
+
+    Returns:
+        The packed reference model of every category, its model id and its version id.
+    """
+    reference_object_id, reference_model_id, reference_model_version_id = (
+        get_reference_model_version(automate_context, static_model_name)
+    )
+    print(
+        f"Reference model id: {reference_model_id}, version id: {reference_model_version_id}"
+    )
+
+    # The static model rarely changes: once processed, a version is mapped from
+    # the cache and never received, traversed or converted again.
+    # Entries are keyed by the category rule too, so a changed rule is re-processed.
+    model_cache = ReferenceModelCache()
+    cache_keys = {
+        name: f"{reference_model_version_id}/{name}-{category_digest(name)}"
+        for name in categories
+    }
+    with instrumentation.span("load reference cache"):
+        reference_models = {name: model_cache.load(cache_keys[name]) for name in categories}
+    missing = {
+        name: rule for name, rule in categories.items() if reference_models[name] is None
+    }
+
+    if missing:
+        # All missing categories come out of a single receive and traversal.
+        for name, elements in convert_elements(
+            receive_through_cache(
+                "reference model",
+                lambda transport: receive_reference_model(
+                    automate_context, reference_object_id, transport
+                ),
+            ),
+            missing,
+            "reference model",
+        ).items():
+            with instrumentation.span("pack reference model"):
+                reference_models[name] = PackedModel.from_elements(elements)
+                model_cache.save(cache_keys[name], reference_models[name])
+    if len(missing) < len(categories):
+        print(
+            f"Reference model version {reference_model_version_id} loaded from cache "
+            f"for {len(categories) - len(missing)} of {len(categories)} categories."
+        )
+    model_cache.evict()
+    print(f"Reference model cache: {model_cache.evictions} evictions.")
+
+    return reference_models, reference_model_id, reference_model_version_id
+
+
+def get_reference_model_version(
     automate_context: AutomationContext, static_model_name: str
-) -> tuple[Base, Optional[str], Optional[str]]:
+) -> tuple[str, str, str]:
+    """Look up the latest version of the static model without receiving it.
+
+    Returns:
+        The referenced object id, the model id and the version id.
+    """
     # the static reference model will be retrieved from the project using model name stored in the inputs
     speckle_client = automate_context.speckle_client
     project_id = automate_context.automation_run_data.project_id
-    remote_transport = ServerTransport(
-        automate_context.automation_run_data.project_id, speckle_client
-    )
 
     model: Branch = speckle_client.branch.get(
         project_id, static_model_name, commits_limit=1
@@ -215,12 +553,56 @@ def get_reference_model(
             "The static model is the same as the changed model, skipping the function."
         )
 
-    latest_reference_model_version = operations.receive(
-        latest_reference_model_version_object,
-        remote_transport,
-    )  # receive the static model
+    return latest_reference_model_version_object, model.id, reference_model_commits[0].id
+
+
+def receive_changed_model(
+    automate_context: AutomationContext, local_transport: AbstractTransport
+) -> Base:
+    """Receive the version that triggered this run through `local_transport`.
 
-    return latest_reference_model_version, model.id, reference_model_commits[0].id
+    Same as `AutomationContext.receive_version`, except that objects already in
+    the local transport are not downloaded again.
+    """
+    run_data = automate_context.automation_run_data
+    commit = automate_context.speckle_client.commit.get(
+        run_data.project_id, run_data.version_id
+    )
+    if not commit.referencedObject:
+        raise ValueError("The commit has no referencedObject, cannot receive it.")
+
+    remote_transport = ServerTransport(
+        run_data.project_id, automate_context.speckle_client
+    )
+    return operations.receive(
+        commit.referencedObject, remote_transport, local_transport
+    )
+
+
+def receive_reference_model(
+    automate_context: AutomationContext,
+    referenced_object_id: str,
+    local_transport: Optional[AbstractTransport] = None,
+) -> Base:
+    """Receive a version of the static model from the server."""
+    remote_transport = ServerTransport(
+        automate_context.automation_run_data.project_id,
+        automate_context.speckle_client,
+    )
+    return operations.receive(referenced_object_id, remote_transport, local_transport)
+
+
+def get_reference_model(
+    automate_context: AutomationContext, static_model_name: str
+) -> tuple[Base, Optional[str], Optional[str]]:
+    referenced_object_id, model_id, version_id = get_reference_model_version(
+        automate_context, static_model_name
+    )
+    return (
+        receive_reference_model(automate_context, referenced_object_id),
+        model_id,
+        version_id,
+    )
 
 
 # make sure to call the function with the executor
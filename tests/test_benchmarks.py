@@ -0,0 +1,22 @@
+"""Unit tests for the synthetic benchmark models and runner."""
+import json
+
+from benchmarks.run import STAGES, run_benchmark
+from benchmarks.synthetic import beam_and_duct_models
+
+
+def test_synthetic_models_have_the_requested_clash_density():
+    models = beam_and_duct_models(10, 200, clash_density=0.25, seed=1)
+
+    assert len(models.reference["elements"]) == 10
+    assert len(models.latest["elements"]) == 200
+    assert 25 <= len(models.expected_clashes) <= 75
+
+
+def test_benchmark_finds_exactly_the_expected_clashes():
+    result = run_benchmark(60, clash_density=0.3, sides=5, max_workers=1)
+
+    assert result["correct"]
+    assert result["clashes"] == result["expected_clashes"] > 0
+    assert tuple(result["stages"]) == STAGES
+    json.dumps(result)
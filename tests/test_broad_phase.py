@@ -0,0 +1,100 @@
+"""Unit tests for the broad-phase pair culling."""
+import numpy as np
+import trimesh
+
+from Geometry.broad_phase import (
+    broad_phase,
+    overlapping_pairs,
+    self_broad_phase,
+    self_overlapping_pairs,
+)
+from Geometry.element import Element
+
+
+def box_element(element_id: str, centre, size=1.0) -> Element:
+    """Create an element made of a single axis aligned box."""
+    mesh = trimesh.creation.box(extents=[size, size, size])
+    mesh.apply_translation(centre)
+    return Element(element_id, [mesh])
+
+
+def test_only_overlapping_pairs_are_kept():
+    reference = [box_element(f"beam{i}", [i * 3.0, 0, 0]) for i in range(10)]
+    latest = [
+        box_element("duct-hit", [3.5, 0, 0]),
+        box_element("duct-miss", [3.0, 5.0, 0]),
+        box_element("duct-far", [100.0, 0, 0]),
+    ]
+
+    pairs, stats = broad_phase(reference, latest)
+
+    assert pairs.tolist() == [[1, 0]]
+    assert stats.total_pairs == 30
+    assert stats.candidate_pairs == 1
+    assert stats.pruned_pairs == 29
+
+
+def test_touching_boxes_are_candidates():
+    reference = [box_element("beam", [0, 0, 0])]
+    latest = [box_element("duct", [1.0, 0, 0])]
+
+    pairs, _ = broad_phase(reference, latest)
+
+    assert pairs.tolist() == [[0, 0]]
+
+
+def test_elements_without_meshes_are_skipped():
+    reference = [Element("empty", []), box_element("beam", [0, 0, 0])]
+    latest = [box_element("duct", [0, 0, 0])]
+
+    pairs, stats = broad_phase(reference, latest)
+
+    assert pairs.tolist() == [[1, 0]]
+    assert stats.total_pairs == 2
+
+
+def test_chunked_overlap_matches_brute_force():
+    rng = np.random.default_rng(42)
+
+    def random_boxes(count):
+        corner = rng.uniform(0, 50, (count, 3))
+        return np.stack([corner, corner + rng.uniform(0.1, 4, (count, 3))], axis=1)
+
+    reference, latest = random_boxes(300), random_boxes(400)
+    expected = {
+        (i, j)
+        for i in range(len(reference))
+        for j in range(len(latest))
+        if np.all(reference[i, 0] <= latest[j, 1]) and np.all(latest[j, 0] <= reference[i, 1])
+    }
+
+    pairs = overlapping_pairs(reference, latest, max_chunk_cells=64)
+
+    assert set(map(tuple, pairs.tolist())) == expected
+    assert len(pairs) == len(expected)
+
+
+def test_self_pairs_match_brute_force_once_each():
+    rng = np.random.default_rng(3)
+    low = rng.uniform(0, 10, (300, 3))
+    bounds = np.stack([low, low + rng.uniform(0, 1.5, (300, 3))], axis=1)
+    expected = {
+        (i, j)
+        for i in range(300)
+        for j in range(i + 1, 300)
+        if np.all(bounds[i, 0] <= bounds[j, 1]) and np.all(bounds[j, 0] <= bounds[i, 1])
+    }
+
+    for max_chunk_cells in (1, 100, 1 << 22):
+        pairs = self_overlapping_pairs(bounds, max_chunk_cells)
+        assert len(pairs) == len(expected)
+        assert set(map(tuple, pairs.tolist())) == expected
+
+
+def test_self_broad_phase_margin_is_shared_by_both_boxes():
+    elements = [box_element("a", [0, 0, 0]), box_element("b", [1.4, 0, 0])]
+
+    assert len(self_broad_phase(elements)[0]) == 0
+    pairs, stats = self_broad_phase(elements, margin=0.5)
+    assert pairs.tolist() == [[0, 1]]
+    assert stats.total_pairs == 1
@@ -0,0 +1,133 @@
+"""Unit tests for the local object cache transport."""
+import json
+
+import pytest
+from specklepy.api import operations
+from specklepy.logging.exceptions import SpeckleException
+from specklepy.objects import Base
+from specklepy.transports.abstract_transport import AbstractTransport
+from specklepy.transports.memory import MemoryTransport
+
+from Utilities.cache_transport import LocalCacheTransport
+
+
+class FakeServerTransport(MemoryTransport):
+    """Stands in for `ServerTransport`, counting the objects it sends."""
+
+    def __init__(self):
+        super().__init__(name="FakeServer")
+        self.downloaded = 0
+
+    def copy_object_and_children(self, id: str, target_transport: AbstractTransport) -> str:
+        root = self.objects[id]
+        children = list(json.loads(root).get("__closure", {}))
+        missing = [
+            child for child, found in target_transport.has_objects(children).items() if not found
+        ]
+
+        target_transport.begin_write()
+        for child in missing:
+            target_transport.save_object(child, self.objects[child])
+        target_transport.save_object(id, root)
+        target_transport.end_write()
+
+        self.downloaded += len(missing) + 1
+        return root
+
+
+def make_model(*names: str) -> Base:
+    model = Base()
+    model["@elements"] = [Base(name=name, values=list(range(10))) for name in names]
+    return model
+
+
+def test_second_receive_downloads_only_changed_objects():
+    server = FakeServerTransport()
+    first = operations.send(make_model("a", "b", "c"), [server], use_default_cache=False)
+    second = operations.send(make_model("a", "b", "d"), [server], use_default_cache=False)
+
+    with LocalCacheTransport(":memory:") as cache:
+        operations.receive(first, server, cache)
+        assert server.downloaded == 4
+
+        received = operations.receive(second, server, cache)
+        assert server.downloaded == 4 + 2  # the new root and element "d"
+        assert [element.name for element in received["@elements"]] == ["a", "b", "d"]
+
+        operations.receive(second, server, cache)
+        assert server.downloaded == 6
+
+
+def test_hit_rate_counts_only_objects_cached_before_the_session(tmp_path):
+    server = FakeServerTransport()
+    root = operations.send(make_model(*"abcdefgh"), [server], use_default_cache=False)
+    path = str(tmp_path / "objects.sqlite")
+
+    with LocalCacheTransport(path) as cold:
+        operations.receive(root, server, cold)
+        assert cold.stats()["hits"] == 0
+        assert cold.stats()["hit_rate"] == 0
+
+    with LocalCacheTransport(path) as warm:
+        operations.receive(root, server, warm)
+        assert warm.stats()["hit_rate"] == 1
+    assert server.downloaded == 9
+
+
+def test_eviction_bounds_the_cache_size():
+    server = FakeServerTransport()
+    root = operations.send(make_model("a", "b"), [server], use_default_cache=False)
+
+    cache = LocalCacheTransport(":memory:", max_bytes=0)
+    operations.receive(root, server, cache)
+    cache.evict()
+
+    assert cache.stats()["bytes"] == 0
+    assert cache.stats()["evictions"] == 3
+
+
+def test_closing_a_session_leaves_other_sessions_objects_cached(tmp_path):
+    server = FakeServerTransport()
+    root = operations.send(make_model("a", "b"), [server], use_default_cache=False)
+    path = str(tmp_path / "objects.sqlite")
+
+    with LocalCacheTransport(path, max_bytes=0) as receiving:
+        operations.receive(root, server, receiving)
+        with LocalCacheTransport(path, max_bytes=0):
+            pass  # a concurrent receive that finishes first
+        assert receiving.get_object(root) is not None
+
+    with LocalCacheTransport(path, max_bytes=0) as cache:
+        cache.evict()
+        assert cache.stats()["bytes"] == 0
+
+
+def test_root_with_evicted_children_is_a_miss(tmp_path):
+    server = FakeServerTransport()
+    root = operations.send(make_model("a", "b"), [server], use_default_cache=False)
+    path = str(tmp_path / "objects.sqlite")
+
+    with LocalCacheTransport(path) as cache:
+        operations.receive(root, server, cache)
+        child = next(iter(json.loads(server.objects[root])["__closure"]))
+        with cache.connection:
+            cache.connection.execute("DELETE FROM objects WHERE hash = ?", (child,))
+
+    with LocalCacheTransport(path) as cache:
+        assert cache.get_object(root) is None
+        operations.receive(root, server, cache)
+        assert server.downloaded == 3 + 2  # only the root and the evicted child
+
+
+def test_copy_object_and_children_copies_the_whole_closure():
+    server = FakeServerTransport()
+    root = operations.send(make_model("a", "b"), [server], use_default_cache=False)
+
+    with LocalCacheTransport(":memory:") as cache:
+        operations.receive(root, server, cache)
+        target = MemoryTransport()
+        assert cache.copy_object_and_children(root, target) == server.objects[root]
+        assert target.objects == server.objects
+
+        with pytest.raises(SpeckleException):
+            cache.copy_object_and_children("missing", MemoryTransport())
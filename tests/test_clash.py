@@ -0,0 +1,98 @@
+"""Unit tests for clash detection between and within sets of elements."""
+from unittest import mock
+
+import numpy as np
+import trimesh
+
+from Geometry.clash import (
+    ClashMode,
+    detect_and_report_clashes,
+    detect_clashes,
+    detect_self_clashes,
+    narrow_phase,
+)
+from Geometry.element import Element
+from Geometry.store import PackedModel
+
+
+def box(element_id: str, x: float, group=None) -> Element:
+    mesh = trimesh.creation.box((1, 1, 1)).apply_translation((x, 0, 0))
+    return Element(element_id, [mesh], group=group)
+
+
+def test_self_clashes_report_each_pair_once_and_skip_parts_of_one_instance():
+    elements = [
+        box("duct", 0),
+        box("pipe", 0.5),
+        box("part-a", 5, group="instance"),
+        box("part-b", 5.5, group="instance"),
+        box("far", 20),
+    ]
+
+    assert detect_self_clashes(elements, 0.0, max_workers=1) == [("duct", "pipe")]
+
+
+def test_overlapping_placements_of_one_definition_clash():
+    # Both placements carry the id of their definition.
+    elements = [
+        box("family", 10, group="placement-1"),
+        box("family", 10.5, group="placement-2"),
+    ]
+
+    assert detect_self_clashes(elements, 0.0, max_workers=1) == [("family", "family")]
+
+
+def test_clearance_mode_reports_an_element_inside_another():
+    outer = Element("wall", [trimesh.creation.box((10, 10, 10))])
+    inner = Element("sleeve", [trimesh.creation.box((1, 1, 1))])
+
+    clashes = detect_clashes([outer], [inner], 0.1, mode=ClashMode.CLEARANCE, max_workers=1)
+
+    assert clashes == [("wall", "sleeve")]
+
+
+def test_staged_mode_reports_overlapping_boxes():
+    reference, latest = [box("beam", 0), box("far", 20)], [box("duct", 0.5)]
+
+    clashes = detect_clashes(reference, latest, 0.0, mode=ClashMode.STAGED, max_workers=1)
+
+    assert clashes == [("beam", "duct")]
+
+
+def test_narrow_phase_checks_only_the_given_pairs():
+    reference = PackedModel.from_elements([box("beam", 0), box("column", 0)])
+    latest = PackedModel.from_elements([box("duct", 0.5)])
+
+    clashing_pairs = narrow_phase(reference, latest, np.array([[1, 0]]), max_workers=1)
+
+    assert clashing_pairs == [(1, 0)]
+
+
+def test_far_apart_instances_of_one_definition_are_reported_apart():
+    definition = trimesh.creation.box((1, 1, 1))
+
+    def placement(x: float, group: str) -> Element:
+        transform = trimesh.transformations.translation_matrix((x, 0, 0))
+        return Element("duct-family", [definition], transforms=[transform], group=group)
+
+    reference = [box("beam-1", 0), box("beam-2", 50)]
+    latest = [placement(0.5, "placement-1"), placement(50.5, "placement-2")]
+    context = mock.MagicMock()
+
+    clashes = detect_and_report_clashes(reference, latest, 0.0, context, group_distance=1.0)
+
+    assert sorted(clashes) == [("beam-1", "duct-family"), ("beam-2", "duct-family")]
+    calls = context.attach_error_to_objects.call_args_list
+    assert sorted(call.kwargs["object_ids"] for call in calls) == [
+        ["beam-1", "duct-family"],
+        ["beam-2", "duct-family"],
+    ]
+
+
+def test_elements_that_only_touch_clash_only_when_asked():
+    reference, latest = [box("slab", 0)], [box("wall", 1)]
+
+    assert detect_clashes(reference, latest, 0.0, max_workers=1) == []
+    assert detect_clashes(reference, latest, 0.0, max_workers=1, touching=True) == [
+        ("slab", "wall")
+    ]
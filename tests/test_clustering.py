@@ -0,0 +1,61 @@
+"""Unit tests for the connected-component clustering of clashes."""
+import numpy as np
+import trimesh
+
+from Geometry.clustering import UnionFind, clash_locations, cluster_clashes, group_objects
+from Geometry.element import Element, pack_bounds
+
+
+def test_union_find_merges_sets():
+    components = UnionFind(6)
+    components.union(0, 1)
+    components.union(2, 3)
+    components.union(1, 3)
+
+    assert len({components.find(item) for item in range(4)}) == 1
+    assert components.find(4) != components.find(5) != components.find(0)
+
+
+def test_a_duct_crossing_many_beams_is_one_group():
+    clashes = [(f"beam-{i}", "duct-run") for i in range(10)] + [("beam-20", "duct-other")]
+
+    groups = cluster_clashes(clashes)
+
+    assert [len(group) for group in groups] == [10, 1]
+    assert group_objects(groups[0])[:3] == ["beam-0", "duct-run", "beam-1"]
+
+
+def test_self_clashes_share_nodes_across_sides():
+    groups = cluster_clashes([("a", "b"), ("c", "d"), ("b", "c")])
+
+    assert len(groups) == 1
+
+
+def test_nearby_groups_merge_only_within_the_distance():
+    clashes = [("b1", "d1"), ("b2", "d2"), ("b3", "d3")]
+    locations = np.array([[0, 0, 0], [0.8, 0.8, 0], [3, 0, 0]], dtype=float)
+
+    assert len(cluster_clashes(clashes, locations, 1.0)) == 2
+    assert len(cluster_clashes(clashes, locations, 0.5)) == 3
+    assert len(cluster_clashes(clashes, locations)) == 3
+
+
+def test_clash_locations_are_the_centres_of_the_overlaps():
+    beam = Element("beam", [trimesh.creation.box((4, 1, 1))])
+    duct = Element("duct", [trimesh.creation.box((1, 1, 4)).apply_translation((1.5, 0, 0))])
+
+    locations = clash_locations(
+        [("beam", "duct")], ["beam"], pack_bounds([beam]), ["duct"], pack_bounds([duct])
+    )
+
+    assert np.allclose(locations, [[1.5, 0, 0]])
+
+
+def test_clustering_scales_to_many_clashes():
+    rng = np.random.default_rng(0)
+    pairs = rng.integers(0, 50000, size=(100000, 2))
+    clashes = [(f"r{ref}", f"l{latest}") for ref, latest in pairs.tolist()]
+
+    groups = cluster_clashes(clashes)
+
+    assert sum(len(group) for group in groups) == len(clashes)
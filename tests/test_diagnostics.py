@@ -0,0 +1,58 @@
+"""Unit tests for the per-pair cost sampling of the narrow phase."""
+import trimesh
+
+from Geometry.clash import detect_clashes
+from Geometry.diagnostics import PairProfile, PairSample, time_decade, triangle_decade
+from Geometry.element import Element
+from Geometry.store import GeometryStore
+from Utilities.instrumentation import instrument
+
+
+def sample(seconds: float, triangles: int = 24, index: int = 0) -> PairSample:
+    return PairSample(seconds, index, index, triangles, 0.0, False)
+
+
+def test_profiles_keep_the_slowest_pairs_across_merges():
+    first, second = PairProfile(top_count=3), PairProfile(top_count=3)
+    for index, seconds in enumerate([0.5, 0.001, 2.0, 0.01]):
+        first.record(sample(seconds, index=index))
+    for index, seconds in enumerate([1.0, 0.0001], start=10):
+        second.record(sample(seconds, triangles=5000, index=index))
+
+    first.merge(second)
+
+    assert [pair.seconds for pair in first.hot_pairs()] == [2.0, 1.0, 0.5]
+    assert first.pair_count == 6
+    assert first.histogram[3, 0] == 1 and first.histogram[3, -4] == 1
+    assert "Slowest pairs" in first.report()
+
+
+def test_histogram_buckets():
+    assert [triangle_decade(count) for count in (0, 9, 10, 12345)] == [0, 0, 1, 4]
+    assert [time_decade(seconds) for seconds in (0.0, 1e-7, 0.002, 3.0)] == [-5, -5, -3, 0]
+
+
+def test_element_face_counts_cover_all_meshes_of_an_element():
+    box = trimesh.creation.box((1, 1, 1))
+    store = GeometryStore.from_elements(
+        [Element("two boxes", [box, box.copy()]), Element("one box", [box])]
+    )
+
+    assert store.element_face_counts().tolist() == [24, 12]
+
+
+def test_detection_samples_every_candidate_pair():
+    boxes = [
+        Element(name, [trimesh.creation.box((1, 1, 1)).apply_translation((x, 0, 0))])
+        for name, x in (("beam", 0), ("duct", 0.5), ("far", 5))
+    ]
+
+    with instrument() as timings:
+        detect_clashes(boxes[:1], boxes[1:], 0.0, max_workers=1)
+
+    (costs,) = timings.details["pair costs"]
+    assert costs["pairs"] == 1
+    assert costs["slowest_pairs"][0]["reference"] == "beam"
+    assert costs["slowest_pairs"][0]["latest"] == "duct"
+    assert costs["slowest_pairs"][0]["triangles"] == 24
+    assert costs["slowest_pairs"][0]["clash"] is True
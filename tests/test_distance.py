@@ -0,0 +1,46 @@
+"""Unit tests for triangle distances and the BVH clearance query."""
+import numpy as np
+import trimesh
+
+from Geometry.bvh import TriangleBVH, within_distance
+from Geometry.distance import triangle_distances
+
+
+def sampled_distance(a: np.ndarray, b: np.ndarray, samples: int = 60) -> float:
+    u, v = np.meshgrid(np.linspace(0, 1, samples), np.linspace(0, 1, samples))
+    inside = u + v <= 1
+    weights = np.stack([1 - u[inside] - v[inside], u[inside], v[inside]], axis=1)
+    points_a, points_b = weights @ a, weights @ b
+    return float(
+        np.min(np.linalg.norm(points_a[:, None] - points_b[None, :], axis=-1))
+    )
+
+
+def test_triangle_distances_match_sampling():
+    rng = np.random.default_rng(3)
+    a = rng.uniform(-1, 1, (20, 3, 3))
+    b = rng.uniform(-1, 1, (20, 3, 3)) + rng.uniform(-1.5, 1.5, (20, 1, 3))
+
+    distances = triangle_distances(a, b)
+
+    for i in range(len(a)):
+        # Sampling can only overestimate the true minimum.
+        assert distances[i] <= sampled_distance(a[i], b[i]) + 1e-9
+        assert distances[i] >= sampled_distance(a[i], b[i]) - 0.1
+
+
+def test_crossing_triangles_are_at_distance_zero():
+    a = np.array([[[0, 0, 0], [2, 0, 0], [0, 2, 0]]], dtype=float)
+    b = np.array([[[0.5, 0.5, -1], [0.5, 0.5, 1], [1.5, 0.5, 0]]], dtype=float)
+
+    assert triangle_distances(a, b).tolist() == [0.0]
+
+
+def test_within_distance_of_separated_spheres():
+    sphere = trimesh.creation.icosphere(subdivisions=2)
+    a = TriangleBVH(sphere.vertices, sphere.faces)
+    b = TriangleBVH(sphere.vertices + [2.3, 0, 0], sphere.faces)
+
+    # The spheres have radius 1 at the vertices, so the gap is a little over 0.3.
+    assert within_distance(a, b, 0.31)
+    assert not within_distance(a, b, 0.25)
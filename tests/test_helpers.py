@@ -0,0 +1,59 @@
+"""Unit tests for the polygon triangulation helpers."""
+import numpy as np
+
+from Geometry.helpers import transform_bounds, triangulate_face, triangulate_polygons
+
+
+def polygon_area(points: np.ndarray) -> float:
+    x, y = points[:, 0], points[:, 1]
+    return 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+
+def covered_area(polygon: np.ndarray, triangles: np.ndarray) -> float:
+    return sum(polygon_area(polygon[triangle, :2]) for triangle in triangles)
+
+
+def test_concave_polygon_ears_stay_inside():
+    # An L-shape: clipping the reflex corner's neighbours naively covers the notch.
+    polygon = np.array(
+        [[0, 0, 0], [2, 0, 0], [2, 1, 0], [1, 1, 0], [1, 2, 0], [0, 2, 0]], dtype=float
+    )
+
+    triangles = triangulate_face(polygon)
+
+    assert triangles.shape == (4, 3)
+    assert np.isclose(covered_area(polygon, triangles), polygon_area(polygon[:, :2]))
+
+
+def test_star_in_tilted_plane_either_winding():
+    angles = np.linspace(0, 2 * np.pi, 16, endpoint=False)
+    radii = np.where(np.arange(16) % 2, 1.5, 1.0)
+    flat = np.column_stack([np.cos(angles) * radii, np.sin(angles) * radii, np.zeros(16)])
+    tilt = np.array([[1, 0, 0], [0, np.cos(1), -np.sin(1)], [0, np.sin(1), np.cos(1)]])
+
+    for polygon in (flat, flat[::-1]):
+        triangles = triangulate_face(polygon @ tilt.T)
+
+        assert np.isclose(covered_area(polygon, triangles), polygon_area(polygon[:, :2]))
+
+
+def test_batch_of_polygons_and_degenerate_input():
+    square = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0], [0, 0.5, 0]], dtype=float)
+    collinear = np.column_stack([np.arange(5.0), np.zeros(5), np.zeros(5)])
+
+    triangles = triangulate_polygons(np.stack([square, collinear]))
+
+    assert triangles.shape == (2, 3, 3)
+    assert np.isclose(covered_area(square, triangles[0]), 1.0)
+
+
+def test_transform_bounds_matches_transformed_corners():
+    rng = np.random.default_rng(0)
+    bounds = np.sort(rng.uniform(-1, 1, (20, 2, 3)), axis=1)
+    matrices = np.tile(np.identity(4), (20, 1, 1))
+    matrices[:, :3, :] = rng.uniform(-2, 2, (20, 3, 4))
+
+    signs = np.array([[i, j, k] for i in (0, 1) for j in (0, 1) for k in (0, 1)])
+    for box, matrix, result in zip(bounds, matrices, transform_bounds(bounds, matrices)):
+        corners = box[signs, [0, 1, 2]] @ matrix[:3, :3].T + matrix[:3, 3]
+        np.testing.assert_allclose(result, [corners.min(axis=0), corners.max(axis=0)])
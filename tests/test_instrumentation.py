@@ -0,0 +1,74 @@
+"""Unit tests for the stage timing and counter instrumentation."""
+import json
+
+import numpy as np
+import trimesh
+
+from Geometry.clash import detect_clashes
+from Geometry.element import Element
+from Utilities import instrumentation
+from Utilities.instrumentation import NO_INSTRUMENTATION, instrument
+
+
+def box(element_id: str, x: float) -> Element:
+    return Element(element_id, [trimesh.creation.box((1, 1, 1)).apply_translation((x, 0, 0))])
+
+
+def test_spans_of_one_name_add_up_and_counters_merge(tmp_path):
+    with instrument() as timings:
+        for _ in range(3):
+            with instrumentation.span("stage") as span:
+                span.count("items", 2)
+        instrumentation.merge({"hits": 4}, prefix="cache_")
+        instrumentation.count("cache_hits")
+
+    stage = timings.spans["stage"]
+    assert stage.calls == 3
+    assert stage.items["items"] == 6
+    assert stage.wall_seconds >= 0 and stage.cpu_seconds >= 0
+    assert timings.counters["cache_hits"] == 5
+    assert timings.summary().startswith("Timings: stage ")
+
+    path = tmp_path / "timings.json"
+    timings.write_json(str(path))
+    assert json.loads(path.read_text())["stages"]["stage"]["calls"] == 3
+    assert instrumentation.active() is NO_INSTRUMENTATION
+
+
+def test_spans_record_the_memory_they_allocate():
+    with instrument() as timings:
+        with instrumentation.span("allocate"):
+            block = np.ones(64 * 1024 ** 2 // 8)  # 64 MB, written so it is resident
+        with instrumentation.span("idle"):
+            pass
+
+    allocate, idle = timings.spans["allocate"], timings.spans["idle"]
+    if instrumentation.current_rss_mb() is None:
+        assert allocate.rss_growth_mb is None
+        return
+    assert allocate.rss_growth_mb > 48
+    assert abs(idle.rss_growth_mb) < 16
+    assert idle.rss_mb >= block.nbytes / 1024 ** 2
+
+
+def test_disabled_instrumentation_records_nothing():
+    with instrument(enabled=False) as timings:
+        with instrumentation.span("stage") as span:
+            span.count("items")
+        instrumentation.count("hits")
+
+    assert timings is NO_INSTRUMENTATION
+    assert not timings.spans and not timings.counters
+
+
+def test_clash_detection_reports_its_stages_and_worker_counters():
+    with instrument() as timings:
+        clashes = detect_clashes(
+            [box("beam", 0)], [box("duct", 0.5), box("far", 5)], 0.0, max_workers=1
+        )
+
+    assert clashes == [("beam", "duct")]
+    assert {"pack", "broad phase", "narrow phase"} <= set(timings.spans)
+    assert timings.spans["narrow phase"].items == {"pairs": 1, "clashes": 1}
+    assert timings.counters["stage_triangles"] == 1
+    assert "worker_cpu_ms" in timings.counters
@@ -0,0 +1,72 @@
+"""Unit tests for the triangle intersection narrow phase."""
+import numpy as np
+import trimesh
+
+from Geometry.bvh import TriangleBVH
+from Geometry.distance import triangle_distances
+from Geometry.intersection import (
+    meshes_intersect,
+    point_in_mesh,
+    triangle_contacts,
+    triangles_intersect,
+)
+
+
+def box(extents, centre) -> TriangleBVH:
+    mesh = trimesh.creation.box(extents).apply_translation(centre)
+    return TriangleBVH(mesh.vertices, mesh.faces)
+
+
+def test_triangles_intersect_agrees_with_distance_for_random_pairs():
+    rng = np.random.default_rng(1)
+    a = rng.uniform(-1, 1, (2000, 3, 3))
+    b = rng.uniform(-1, 1, (2000, 3, 3))
+
+    assert triangles_intersect(a, b).tolist() == (triangle_distances(a, b) == 0).tolist()
+
+
+def test_touching_triangles_intersect_but_coplanar_ones_do_not():
+    a = np.array([[[0, 0, 0], [2, 0, 0], [0, 2, 0]]], dtype=float)
+    touching = np.array([[[0.5, 0.5, 0], [0.5, 0.5, 1], [1.5, 0.5, 1]]], dtype=float)
+    coplanar = np.array([[[0.5, 0.5, 0], [1.5, 0.5, 0], [0.5, 1.0, 0]]], dtype=float)
+
+    assert triangles_intersect(a, touching)[0]
+    assert not triangles_intersect(a, coplanar)[0]
+    assert not triangle_contacts(a, touching)[1][0]
+
+
+def test_point_in_mesh():
+    mesh = trimesh.creation.icosphere()
+    triangles = mesh.vertices[mesh.faces]
+
+    assert point_in_mesh(np.array([0.1, 0.2, 0.3]), triangles)
+    assert not point_in_mesh(np.array([1.5, 0.0, 0.0]), triangles)
+
+
+def test_meshes_intersect_boxes():
+    outer = box((2, 2, 2), (0, 0, 0))
+
+    assert meshes_intersect(outer, box((1, 1, 1), (1, 0, 0)))
+    assert meshes_intersect(outer, box((2, 2, 2), (0, 1.5, 0)))  # flush side walls
+    assert meshes_intersect(outer, box((1, 1, 1), (0.5, 0, 0)))  # inside, flush
+    assert not meshes_intersect(outer, box((1, 1, 1), (3, 0, 0)))
+
+
+def test_meshes_that_only_touch_intersect_only_when_asked():
+    outer = box((2, 2, 2), (0, 0, 0))
+    touching = [
+        box((1, 1, 1), (1.5, 0, 0)),  # face on face
+        box((2, 2, 2), (2, 0.5, 0.3)),  # flush faces of equal size
+        box((1, 1, 1), (1.5, 1.5, 0)),  # edge on edge
+        box((1, 1, 1), (1.5, 1.5, 1.5)),  # corner on corner
+    ]
+
+    assert not any(meshes_intersect(outer, other) for other in touching)
+    assert all(meshes_intersect(outer, other, touching=True) for other in touching)
+
+
+def test_meshes_intersect_when_one_contains_the_other():
+    outer, inner = box((2, 2, 2), (0, 0, 0)), box((1, 1, 1), (0.2, 0, 0))
+
+    assert meshes_intersect(outer, inner)
+    assert meshes_intersect(inner, outer)
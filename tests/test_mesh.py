@@ -0,0 +1,83 @@
+"""Unit tests for mesh conversion helpers."""
+import numpy as np
+
+from Geometry.mesh import ConversionCache, decode_faces, face_starts
+
+
+def test_conversion_cache_converts_once_per_key():
+    cache = ConversionCache(max_bytes=1000)
+    calls = []
+
+    def convert():
+        calls.append(1)
+        return object()
+
+    first = cache.get(("store", 0), convert, nbytes=10)
+    second = cache.get(("store", 0), convert, nbytes=10)
+
+    assert first is second
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_conversion_cache_evicts_least_recently_used():
+    cache = ConversionCache(max_bytes=25)
+
+    cache.get("a", object, nbytes=10)
+    cache.get("b", object, nbytes=10)
+    cache.get("a", object, nbytes=10)  # "b" is now the least recently used
+    cache.get("c", object, nbytes=10)
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 20
+
+    cache.get("a", object, nbytes=10)
+    assert cache.stats()["hits"] == 2
+
+
+def test_face_starts_for_mixed_face_list():
+    faces = np.array([3, 0, 1, 2, 4, 0, 1, 2, 3, 5, 0, 1, 2, 3, 4, 3, 2, 3, 4])
+
+    assert face_starts(faces).tolist() == [0, 4, 9, 15]
+
+
+def test_face_starts_for_long_mixed_face_list():
+    rng = np.random.default_rng(0)
+    counts = rng.choice([3, 4, 5, 8], size=10000, p=[0.6, 0.3, 0.05, 0.05])
+    faces = np.concatenate([[count, *rng.integers(0, 10 ** 6, count)] for count in counts])
+
+    expected = np.concatenate(([0], np.cumsum(counts + 1)[:-1]))
+    assert face_starts(faces).tolist() == expected.tolist()
+
+    # Runs of one count are followed in bulk until the counts start alternating.
+    counts = np.concatenate([np.full(3000, 3), np.full(2000, 4), counts])
+    faces = np.concatenate([[count, *rng.integers(0, 10 ** 6, count)] for count in counts])
+
+    expected = np.concatenate(([0], np.cumsum(counts + 1)[:-1]))
+    assert face_starts(faces).tolist() == expected.tolist()
+
+
+def test_decode_faces_triangles_only():
+    faces = np.array([3, 0, 1, 2, 3, 2, 1, 3])
+    vertices = np.zeros((4, 3))
+
+    assert decode_faces(faces, vertices).tolist() == [[0, 1, 2], [2, 1, 3]]
+
+
+def test_decode_faces_splits_concave_quad_inside_the_face():
+    # Vertex 1 is reflex, so the 0-2 diagonal would run outside the quad.
+    vertices = np.array([[0, 0, 0], [1, 0.5, 0], [2, 0, 0], [1, 2, 0]], dtype=float)
+
+    triangles = decode_faces(np.array([4, 0, 1, 2, 3]), vertices)
+
+    assert sorted(map(sorted, triangles.tolist())) == [[0, 1, 3], [1, 2, 3]]
+
+
+def test_decode_faces_mixed_face_counts():
+    vertices = np.array(
+        [[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0], [0.5, 1.5, 0]], dtype=float
+    )
+    faces = np.array([3, 0, 1, 2, 4, 0, 1, 2, 3, 5, 0, 1, 2, 4, 3])
+
+    assert decode_faces(faces, vertices).shape == (1 + 2 + 3, 3)
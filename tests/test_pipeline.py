@@ -0,0 +1,68 @@
+"""Unit tests for the streaming traversal pipeline."""
+import gc
+import threading
+import weakref
+
+import pytest
+from specklepy.objects import Base
+
+from Utilities.flatten import extract_base_and_transform
+from Utilities.pipeline import prefetch
+
+
+def test_prefetch_keeps_order_and_bounds_the_queue():
+    produced = []
+
+    def items():
+        for i in range(100):
+            produced.append(i)
+            yield i
+
+    consumed = []
+    for item in prefetch(items(), max_pending=4):
+        # The producer may run at most the queue size (plus one in hand) ahead.
+        assert len(produced) - len(consumed) <= 6
+        consumed.append(item)
+
+    assert consumed == list(range(100))
+
+
+def test_prefetch_reraises_producer_errors():
+    def items():
+        yield 1
+        raise ValueError("broken traversal")
+
+    with pytest.raises(ValueError, match="broken traversal"):
+        list(prefetch(items()))
+
+
+def test_prefetch_stops_producer_when_consumer_leaves():
+    finished = threading.Event()
+
+    def items():
+        try:
+            for i in range(10_000):
+                yield i
+        finally:
+            finished.set()
+
+    stream = prefetch(items(), max_pending=2)
+    next(stream)
+    stream.close()
+
+    assert finished.wait(timeout=5)
+
+
+def test_release_frees_traversed_children():
+    root = Base()
+    root["@elements"] = [Base(name=str(i)) for i in range(5)]
+    children = [weakref.ref(child) for child in root["@elements"]]
+
+    names = []
+    for base, _, _ in extract_base_and_transform(root, release=True):
+        names.append(getattr(base, "name", None))
+        del base
+        gc.collect()
+
+    assert names == [None, "0", "1", "2", "3", "4"]
+    assert all(child() is None for child in children)
@@ -0,0 +1,44 @@
+"""Unit tests for the OBB and convex hull pre-checks."""
+import numpy as np
+
+from Geometry.prefilter import convex_hulls_intersect, obb_overlap, oriented_bounds
+
+CORNERS = np.array([[i, j, k] for i in (-1, 1) for j in (-1, 1) for k in (-1, 1)], float)
+
+
+def random_rotation(rng: np.random.Generator) -> np.ndarray:
+    q, r = np.linalg.qr(rng.normal(size=(3, 3)))
+    return q * np.sign(np.diag(r))
+
+
+def test_gjk_agrees_with_exact_box_separating_axis_test():
+    rng = np.random.default_rng(7)
+
+    for _ in range(500):
+        boxes = []
+        for _ in range(2):
+            rotation = random_rotation(rng)
+            extents = rng.uniform(0.2, 2, 3)
+            centre = rng.uniform(-2, 2, 3)
+            points = (CORNERS * extents) @ rotation.T + centre
+            boxes.append((points, np.vstack([centre, rotation.T, extents])))
+
+        (points_a, obb_a), (points_b, obb_b) = boxes
+
+        assert convex_hulls_intersect(points_a, points_b) == obb_overlap(obb_a, obb_b)
+
+
+def test_fitted_obb_contains_points_and_rejects_parallel_beams():
+    rotation = np.array([[1, -1, 0], [1, 1, 0], [0, 0, np.sqrt(2)]]) / np.sqrt(2)
+    beam = (CORNERS * [5.0, 0.2, 0.2]) @ rotation.T
+    neighbour = beam + [1.0, -1.0, 0.0]  # parallel, about 1.4 apart
+
+    beam_obb, neighbour_obb = oriented_bounds(beam), oriented_bounds(neighbour)
+
+    local = (beam - beam_obb[0]) @ beam_obb[1:4].T
+    assert np.all(np.abs(local) <= beam_obb[4] + 1e-9)
+
+    # Their axis-aligned boxes overlap, their oriented boxes do not.
+    assert np.all(beam.min(axis=0) <= neighbour.max(axis=0))
+    assert not obb_overlap(beam_obb, neighbour_obb)
+    assert not convex_hulls_intersect(beam, neighbour)
@@ -0,0 +1,71 @@
+"""Unit tests for the bounded reporting of clashes."""
+import csv
+import gzip
+from unittest import mock
+
+import numpy as np
+
+from Geometry.clustering import cluster_clashes
+from Geometry.reporting import MAX_OBJECTS_PER_RESULT, clash_result_cases, report_clashes
+
+
+def test_small_reports_attach_one_result_per_group():
+    context = mock.MagicMock()
+
+    report = report_clashes([("b1", "d1"), ("b2", "d2"), ("b1", "d3")], context, "Clash")
+
+    assert [call.kwargs for call in context.attach_error_to_objects.call_args_list] == [
+        {"category": "Clash", "object_ids": ["b1", "d1", "d3"], "message": "1"},
+        {"category": "Clash", "object_ids": ["b2", "d2"], "message": "2"},
+    ]
+    assert report.groups == report.reported_groups == 2
+    assert report.artifact is None
+    context.store_file_result.assert_not_called()
+
+
+def test_large_reports_are_capped_and_listed_in_full_in_a_file():
+    clashes = [(f"b{i}", f"d{i}-{j}") for i in range(1000) for j in range(3)]
+    stored = []
+    context = mock.MagicMock()
+    context.store_file_result.side_effect = stored.append
+
+    report = report_clashes(clashes, context, "Clash beams x ducts", max_groups=10)
+
+    assert report.results == 11
+    assert report.object_ids == 10 * 4 + MAX_OBJECTS_PER_RESULT
+    summary = context.attach_error_to_objects.call_args_list[-1].kwargs
+    assert summary["message"] == (
+        "990 more clash groups with 2970 clashes, all listed in "
+        "clashes-clash-beams-x-ducts.csv.gz."
+    )
+
+    (path,) = stored
+    with gzip.open(path, "rt", newline="") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ["group", "reference_id", "latest_id"]
+    assert rows[1:4] == [["1", "b0", "d0-0"], ["1", "b0", "d0-1"], ["1", "b0", "d0-2"]]
+    assert len(rows) == len(clashes) + 1
+
+
+def test_groups_with_many_objects_are_truncated():
+    groups = cluster_clashes([("b", f"d{j}") for j in range(250)])
+
+    (case,) = clash_result_cases(groups, max_groups=None)
+
+    assert len(case.object_ids) == MAX_OBJECTS_PER_RESULT
+    assert case.message == f"1 (and {250 - MAX_OBJECTS_PER_RESULT + 1} more objects)"
+
+
+def test_reports_group_connected_and_nearby_clashes():
+    clashes = [("b1", "d1"), ("b2", "d1"), ("b3", "d2"), ("b4", "d3")]
+    locations = np.array([[0, 0, 0], [5, 0, 0], [50, 0, 0], [50.5, 0, 0]], dtype=float)
+    context = mock.MagicMock()
+
+    report = report_clashes(clashes, context, locations=locations, group_distance=1.0)
+
+    calls = context.attach_error_to_objects.call_args_list
+    assert [call.kwargs["object_ids"] for call in calls] == [
+        ["b1", "d1", "b2"],
+        ["b3", "d2", "b4", "d3"],
+    ]
+    assert report.groups == 2
@@ -0,0 +1,76 @@
+"""Unit tests for incremental clash detection across runs."""
+from unittest import mock
+
+import trimesh
+
+from Geometry import clash
+from Geometry.element import Element
+from Geometry.result_store import ClashResultStore
+
+
+def box(element_id: str, x: float) -> Element:
+    return Element(element_id, [trimesh.creation.box((1, 1, 1)).apply_translation((x, 0, 0))])
+
+
+def test_store_replaces_snapshot_per_scope():
+    with ClashResultStore(":memory:") as store:
+        store.save("a", ["r1", "r2"], ["l1"], [("r1", "l1")])
+        store.save("b", ["r3"], ["l3"], [])
+        store.save("a", ["r1"], ["l1", "l2"], [("r1", "l2")])
+
+        snapshot = store.load("a")
+        assert snapshot.reference_ids == {"r1"}
+        assert snapshot.latest_ids == {"l1", "l2"}
+        assert snapshot.clashes == {("r1", "l2")}
+        assert store.load("missing").clashes == set()
+
+
+def test_incremental_run_only_evaluates_changed_pairs():
+    reference = [box("r0", 0), box("r1", 3)]
+    first = [box("l0", 0.5), box("l1", 3.5)]
+    second = [box("l0", 0.5), box("l1-moved", 6)]
+    evaluated = []
+
+    def detect(reference_model, latest_model, *args, **kwargs):
+        changed = kwargs["latest_changed"].tolist()
+        evaluated.append([i for i, new in zip(latest_model.ids, changed) if new])
+        return [
+            (ref_id, latest_id)
+            for ref_id, ref_bounds in zip(reference_model.ids, reference_model.bounds)
+            for latest_id, latest_bounds, new in zip(
+                latest_model.ids, latest_model.bounds, changed
+            )
+            if new and abs(ref_bounds[0, 0] - latest_bounds[0, 0]) < 1
+        ]
+
+    with ClashResultStore(":memory:") as store, mock.patch.object(
+        clash, "detect_clashes", side_effect=detect
+    ):
+        assert clash.detect_clashes_incremental(reference, first, 0, store, "s") == [
+            ("r0", "l0"),
+            ("r1", "l1"),
+        ]
+        assert clash.detect_clashes_incremental(reference, second, 0, store, "s") == [
+            ("r0", "l0"),
+        ]
+        assert clash.detect_clashes_incremental(reference, second, 0, store, "s") == [
+            ("r0", "l0"),
+        ]
+
+    assert evaluated == [["l0", "l1"], ["l1-moved"]]
+
+
+def test_moving_an_instance_invalidates_its_cached_clashes():
+    definition = trimesh.creation.box((1, 1, 1))
+
+    def placement(x: float) -> Element:
+        transform = trimesh.transformations.translation_matrix((x, 0, 0))
+        return Element("definition", [definition], transforms=[transform], group="instance")
+
+    reference = [box("beam", 0)]
+
+    with ClashResultStore(":memory:") as store:
+        assert clash.detect_clashes_incremental(
+            reference, [placement(0.5)], 0, store, "s"
+        ) == [("beam", "definition")]
+        assert clash.detect_clashes_incremental(reference, [placement(10)], 0, store, "s") == []
@@ -0,0 +1,87 @@
+"""Unit tests for the compiled element rules and the category router."""
+import pytest
+from specklepy.objects import Base
+
+from Rules.actions import RuleRouter
+from Rules.categories import CATEGORY_TYPES, category_digest, parse_clash_matrix
+from Rules.checks import ElementCheckRules
+
+BEAM = "Objects.BuiltElements.Beam:Objects.BuiltElements.Revit.RevitBeam"
+DUCT = "Objects.BuiltElements.Duct"
+
+
+def make_object(speckle_type: str, displayable: bool = True) -> Base:
+    obj = Base.of_type(speckle_type)
+    obj["displayValue"] = [Base()] if displayable else []
+    return obj
+
+
+def test_combined_rule_checks_type_before_members():
+    rules = ElementCheckRules()
+    rule = rules.rule_combiner(
+        rules.is_displayable_rule(), rules.speckle_type_rule(BEAM)
+    )
+
+    assert [check.name for check in rule.flatten()] == [
+        "speckle_type:RevitBeam",
+        "is_displayable",
+    ]
+    assert rule.types == frozenset([BEAM])
+    assert rule(make_object(BEAM))
+    assert not rule(make_object(BEAM, displayable=False))
+    # Objects without a displayValue never reach the member check.
+    assert not rule(Base.of_type(DUCT))
+
+
+def test_router_partitions_in_one_pass_and_counts_checks():
+    rules = ElementCheckRules()
+    router = RuleRouter(
+        {
+            "beams": rules.rule_combiner(
+                rules.speckle_type_rule(BEAM), rules.is_displayable_rule()
+            ),
+            "ducts": rules.rule_combiner(
+                rules.speckle_type_rule(DUCT), rules.is_displayable_rule()
+            ),
+            "visible": rules.is_displayable_rule(),
+        }
+    )
+    objects = [
+        make_object(BEAM),
+        make_object(DUCT),
+        make_object(DUCT, displayable=False),
+        make_object("Objects.Other.Text"),
+    ]
+
+    partitions = router.partition(objects)
+
+    assert partitions["beams"] == [objects[0]]
+    assert partitions["ducts"] == [objects[1]]
+    assert partitions["visible"] == [objects[0], objects[1], objects[3]]
+
+    stats = router.stats()
+    # The displayable check is shared between categories: once per object.
+    assert (stats["is_displayable"]["calls"], stats["is_displayable"]["hits"]) == (4, 3)
+    assert stats["speckle_type:Duct"]["hits"] == 2
+    assert "1 beams, 1 ducts, 3 visible" in router.report()
+
+
+def test_parse_clash_matrix():
+    assert parse_clash_matrix("beams x ducts, Beams×pipes,, beams x ducts") == [
+        ("beams", "ducts"),
+        ("beams", "pipes"),
+    ]
+    with pytest.raises(ValueError, match="Unknown category 'walls'"):
+        parse_clash_matrix("beams x walls")
+    with pytest.raises(ValueError, match="Invalid clash matrix entry"):
+        parse_clash_matrix("beams ducts")
+
+
+def test_category_digest_changes_with_the_rule(monkeypatch):
+    digest = category_digest("ducts")
+
+    assert category_digest("ducts") == digest
+    assert category_digest("pipes") != digest
+
+    monkeypatch.setitem(CATEGORY_TYPES, "ducts", ["Objects.BuiltElements.Duct"])
+    assert category_digest("ducts") != digest
@@ -0,0 +1,41 @@
+"""Unit tests for batch scheduling of candidate pairs."""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from Geometry.scheduler import (
+    DEFAULT_INITIAL_CHUNK_SIZE,
+    AdaptiveChunkSize,
+    BatchResult,
+    map_batches,
+)
+
+
+def test_fixed_chunk_size_is_kept():
+    sizer = AdaptiveChunkSize(chunk_size=100)
+    sizer.record(100, 10.0)
+
+    assert sizer.next_size() == 100
+
+
+def test_chunk_size_follows_measured_cost():
+    sizer = AdaptiveChunkSize(target_batch_seconds=1.0)
+    assert sizer.next_size() == DEFAULT_INITIAL_CHUNK_SIZE
+
+    sizer.record(10, 0.1)  # 10 ms per pair
+
+    assert sizer.next_size() == 100
+
+
+def test_map_batches_covers_every_pair_once():
+    pairs = np.arange(2000, dtype=np.int64).reshape(-1, 2)
+
+    def echo(batch: np.ndarray) -> BatchResult:
+        return BatchResult(clashes=batch, pair_count=len(batch), elapsed=1e-6)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(map_batches(executor, echo, pairs, max_workers=2))
+
+    seen = np.concatenate([result.clashes for result in results])
+    assert len(results) > 1
+    assert sorted(seen[:, 0].tolist()) == pairs[:, 0].tolist()
@@ -0,0 +1,113 @@
+"""Unit tests for the array-backed geometry store."""
+import os
+import pickle
+
+import numpy as np
+import trimesh
+
+from Geometry.element import Element
+from Geometry.model_cache import ReferenceModelCache
+from Geometry.store import GeometryStore, PackedModel
+
+
+def make_elements():
+    box = trimesh.creation.box(extents=[1, 1, 1])
+    cylinder = trimesh.creation.cylinder(radius=0.5, height=2.0)
+    cylinder.apply_translation([5, 0, 0])
+    return [
+        Element("first", [box]),
+        Element("empty", []),
+        Element("second", [box.copy(), cylinder]),
+    ]
+
+
+def test_store_round_trips_meshes():
+    elements = make_elements()
+    store = GeometryStore.from_elements(elements)
+
+    assert len(store) == 3
+    assert store.mesh_count == 3
+    assert list(store.element_mesh_indices(1)) == []
+
+    vertices, faces = store.mesh(store.element_mesh_indices(2)[1])
+    np.testing.assert_allclose(vertices, elements[2].meshes[1].vertices)
+    np.testing.assert_array_equal(faces, elements[2].meshes[1].faces)
+    np.testing.assert_allclose(store.element_bounds[2], elements[2].bounds)
+
+
+def test_shared_store_is_attached_by_name():
+    with GeometryStore.from_elements(make_elements()).share() as shared:
+        attached = pickle.loads(pickle.dumps(shared))
+
+        assert len(pickle.dumps(shared)) < shared.nbytes
+        np.testing.assert_array_equal(attached.vertices, shared.vertices)
+
+        shared.vertices[0, 0] = 42.0
+        assert attached.vertices[0, 0] == 42.0
+        attached.close()
+
+
+def test_cached_model_is_mapped_from_disk(tmp_path):
+    model = PackedModel.from_elements(make_elements())
+    cache = ReferenceModelCache(str(tmp_path))
+
+    assert cache.load("version") is None
+    cache.save("version", model)
+    cached = cache.load("version")
+
+    assert cached.ids == ["first", "empty", "second"]
+    assert isinstance(cached.store.vertices, np.memmap)
+    np.testing.assert_array_equal(cached.store.faces, model.store.faces)
+    np.testing.assert_array_equal(cached.index.orders, model.index.orders)
+
+    # Workers re-map the files instead of receiving the arrays.
+    assert len(pickle.dumps(cached.store)) < 1000
+
+
+def test_model_cache_evicts_least_recently_used_entries(tmp_path):
+    model = PackedModel.from_elements(make_elements())
+    writer = ReferenceModelCache(str(tmp_path))
+    for age, key in enumerate(["old/ducts", "recent/ducts", "new/ducts"]):
+        writer.save(key, model)
+        # Older entries were last used further in the past.
+        timestamp = 1000.0 * (age + 1)
+        os.utime(os.path.join(writer.path(key), "model.json"), (timestamp, timestamp))
+    os.makedirs(tmp_path / "v1" / "stale")
+    entry_size = writer.entries()[0][1]
+
+    cache = ReferenceModelCache(str(tmp_path), max_bytes=2 * entry_size)
+    cache.load("old/ducts")
+    cache.evict()
+
+    assert cache.evictions == 1
+    assert cache.load("recent/ducts") is None
+    assert cache.load("old/ducts") is not None
+    assert cache.load("new/ducts") is not None
+    assert not os.path.exists(tmp_path / "v1")
+
+
+def test_instances_share_geometry():
+    box = trimesh.creation.box(extents=[1, 2, 3])
+    rotation = trimesh.transformations.rotation_matrix(np.pi / 4, [0, 0, 1])
+    placement = trimesh.transformations.translation_matrix([10, 0, 0]) @ rotation
+    elements = [Element("a", [box]), Element("b", [box], transforms=[placement])]
+    store = GeometryStore.from_elements(elements)
+
+    assert store.mesh_count == 2
+    assert store.geometry_count == 1
+    assert len(store.vertices) == len(box.vertices)
+
+    vertices, _ = store.mesh(1)
+    placed = box.copy().apply_transform(placement)
+    np.testing.assert_allclose(vertices, placed.vertices)
+    np.testing.assert_allclose(store.mesh_bounds[1], placed.bounds)
+    np.testing.assert_allclose(store.element_bounds[1], placed.bounds)
+
+
+def test_shared_model_is_attached_not_copied():
+    with PackedModel.from_elements(make_elements()).share() as shared:
+        with shared.store.share() as attached:
+            attached.vertices[0, 0] = 42.0
+            assert shared.store.vertices[0, 0] == 42.0
+        # Closing the attached store leaves the blocks of the model alive.
+        assert shared.store.vertices[0, 0] == 42.0
@@ -0,0 +1,73 @@
+"""Unit tests for the type-dispatched traversal engine."""
+from specklepy.objects import Base
+from specklepy.objects.geometry import Mesh
+from specklepy.objects.other import BlockDefinition, BlockInstance, Transform
+
+from Rules.traversal import TraversalEngine, prune_type_prefixes
+
+
+def named(name: str, **members) -> Base:
+    base = Base(name=name)
+    for key, value in members.items():
+        base[key] = value
+    return base
+
+
+def test_traversal_order_instances_and_containers():
+    definition = BlockDefinition()
+    definition["elements"] = [named("in block")]
+    transform = Transform(value=[1, 0, 0, 5, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1])
+    root = named(
+        "root",
+        elements=[named("a", elements=[named("a1")]), named("b")],
+        **{"@Walls": named("walls", elements=[named("w")])},
+    )
+    root["elements"].append(BlockInstance(definition=definition, transform=transform))
+
+    visited = [
+        (getattr(base, "name", None), len(transforms))
+        for base, _, transforms in TraversalEngine().traverse(root)
+    ]
+
+    assert visited == [
+        ("root", 0), ("a", 0), ("a1", 0), ("b", 0),
+        (None, 1), ("in block", 1), ("walls", 0), ("w", 0),
+    ]
+
+
+def test_deep_trees_do_not_hit_the_recursion_limit():
+    root = node = Base()
+    for _ in range(5000):
+        node["elements"] = [Base()]
+        node = node["elements"][0]
+
+    assert len(list(TraversalEngine().traverse(root))) == 5001
+
+
+def test_pruned_types_are_yielded_without_their_children():
+    mesh = Mesh()
+    mesh["elements"] = [named("hidden")]
+    root = named("root", elements=[mesh])
+    engine = TraversalEngine(prune_type_prefixes("Objects.Geometry."))
+
+    assert [base for base, _, _ in engine.traverse(root)] == [root, mesh]
+    assert engine.rule(mesh).descend is False
+
+
+def test_objects_in_instances_report_their_outermost_instance():
+    inner = BlockDefinition()
+    inner["elements"] = [named("nested part")]
+    outer = BlockDefinition()
+    outer["elements"] = [named("part"), BlockInstance(definition=inner, transform=None)]
+    instance = BlockInstance(definition=outer, transform=None)
+    instance.id = "instance"
+    root = named("root", elements=[instance])
+
+    groups = {
+        getattr(base, "name", None): group
+        for base, _, _, group in TraversalEngine().traverse(root, groups=True)
+    }
+
+    assert groups == {
+        "root": None, None: "instance", "part": "instance", "nested part": "instance"
+    }